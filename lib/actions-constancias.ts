@@ -15,6 +15,7 @@ import { createServerClient } from '@supabase/ssr';
 import { cookies } from 'next/headers';
 import { createReport } from 'docx-templates';
 import JSZip from 'jszip';
+import { createHash } from 'crypto';
 import {
   numeroALetras,
   fechaALetras,
@@ -26,6 +27,14 @@ import {
 // INTERFACES
 // ============================================================================
 
+// Imagen para el comando {IMAGE logo} del encabezado (ancho y alto en cm)
+interface LogoConstancia {
+  width: number;
+  height: number;
+  data: Buffer;
+  extension: '.png';
+}
+
 interface ConstanciaSeparacionData {
   razon_social: string;
   ruc: string;
@@ -53,11 +62,13 @@ interface ConstanciaSeparacionData {
     moneda: string;
     numero_operacion: string;
   }>;
+  total_depositos: string;
   plazo_dias: string;
   fecha_vencimiento: string;
   fecha_emision: string;
   firma_nombre: string;
   firma_cargo: string;
+  logo: LogoConstancia | null;
 }
 
 interface ConstanciaAbonoData {
@@ -77,6 +88,7 @@ interface ConstanciaAbonoData {
   fecha_emision: string;
   firma_nombre: string;
   firma_cargo: string;
+  logo: LogoConstancia | null;
 }
 
 interface ConstanciaCancelacionData {
@@ -100,9 +112,11 @@ interface ConstanciaCancelacionData {
     monto: string;
     numero_operacion: string;
   }>;
+  total_depositos: string;
   fecha_emision: string;
   firma_nombre: string;
   firma_cargo: string;
+  logo: LogoConstancia | null;
 }
 
 // ============================================================================
@@ -126,6 +140,108 @@ function formatMonto(num: number): string {
   return round2(num).toFixed(2);
 }
 
+// Desde esta cantidad de depósitos se usa la variante '-tabla' del template:
+// una fila por depósito más una fila de total, en vez de un párrafo por depósito.
+// Valor tomado de docs/benchmarks/constancias-depositos.json: la tabla ocupa más
+// alto que la lista y pasa a 2 páginas con 12 (separación) o 13 (cancelación)
+// depósitos, la lista recién con 17 y 18. Desde 18 las dos variantes ya ocupan
+// 2 páginas en ambos templates, así que la tabla no agrega una hoja a una
+// constancia que cabía en una. El tiempo no decide: en los renderizadores de
+// Python ambas variantes hacen 10.000 depósitos en menos de 60 ms (docx) y
+// 2,1 s (PDF); scripts/benchmark-constancias.js mide docx-templates.
+const DEPOSITOS_TABLA_MIN = 18;
+
+function templateConDepositos(nombre: string, cantidadDepositos: number): string {
+  return cantidadDepositos >= DEPOSITOS_TABLA_MIN
+    ? `constancia-${nombre}-tabla.docx`
+    : `constancia-${nombre}.docx`;
+}
+
+// Fila TOTAL de las variantes '-tabla' (docx-templates la lee como campo)
+function totalDepositos(depositos: Array<{ monto: string }>): string {
+  return formatMonto(depositos.reduce((total, deposito) => total + Number(deposito.monto), 0));
+}
+
+// ============================================================================
+// LOGO DEL PROYECTO
+// ============================================================================
+
+// Caja del logo en el encabezado (cm) y resolución a la que se prepara;
+// igual que LOGO_CM y LOGO_DPI de scripts/constancias_layout.py (354x118 px)
+const LOGO_CM = { width: 4.5, height: 1.5 };
+const LOGO_DPI = 200;
+const LOGO_PX = {
+  width: Math.round((LOGO_CM.width / 2.54) * LOGO_DPI),
+  height: Math.round((LOGO_CM.height / 2.54) * LOGO_DPI),
+};
+
+const PNG_FIRMA = Buffer.from([0x89, 0x50, 0x4e, 0x47, 0x0d, 0x0a, 0x1a, 0x0a]);
+
+// Logos ya preparados, por logo_url; los que quedan con los mismos bytes
+// comparten un solo objeto (por sha256). Duran lo que la instancia del servidor.
+const logosPorUrl = new Map<string, Promise<LogoConstancia | null>>();
+const logosPorHash = new Map<string, LogoConstancia>();
+
+type SupabaseServer = ReturnType<typeof createServerClient>;
+
+function cargarLogo(supabase: SupabaseServer, logoUrl: string | null): Promise<LogoConstancia | null> {
+  if (!logoUrl) {
+    return Promise.resolve(null);
+  }
+  let logo = logosPorUrl.get(logoUrl);
+  if (!logo) {
+    logo = prepararLogo(supabase, logoUrl);
+    logosPorUrl.set(logoUrl, logo);
+  }
+  return logo;
+}
+
+// El logo subido (logos-proyectos, PNG a resolución completa) se pide ya
+// reducido a la caja del encabezado con la transformación de imágenes de
+// Storage, así cada constancia lleva unos pocos KB en vez del original
+async function prepararLogo(supabase: SupabaseServer, logoUrl: string): Promise<LogoConstancia | null> {
+  try {
+    const marca = '/logos-proyectos/';
+    const inicio = logoUrl.indexOf(marca);
+    if (inicio < 0) {
+      console.warn('Logo fuera del bucket logos-proyectos, se omite:', logoUrl);
+      return null;
+    }
+    const { data: urlData } = supabase.storage
+      .from('logos-proyectos')
+      .getPublicUrl(logoUrl.slice(inicio + marca.length), {
+        transform: { width: LOGO_PX.width, height: LOGO_PX.height, resize: 'contain', format: 'origin' },
+      });
+
+    const response = await fetch(urlData.publicUrl);
+    if (!response.ok) {
+      throw new Error(`HTTP ${response.status}`);
+    }
+    const png = Buffer.from(await response.arrayBuffer());
+    if (!png.subarray(0, 8).equals(PNG_FIRMA)) {
+      throw new Error('El logo preparado no es PNG');
+    }
+
+    const sha256 = createHash('sha256').update(png).digest('hex');
+    const existente = logosPorHash.get(sha256);
+    if (existente) {
+      return existente;
+    }
+    // Tan grande como entre en la caja, manteniendo la proporción (IHDR)
+    const anchoPx = png.readUInt32BE(16);
+    const altoPx = png.readUInt32BE(20);
+    const escala = Math.min(LOGO_CM.width / anchoPx, LOGO_CM.height / altoPx);
+    const logo: LogoConstancia = { width: anchoPx * escala, height: altoPx * escala, data: png, extension: '.png' };
+    logosPorHash.set(sha256, logo);
+    return logo;
+  } catch (error) {
+    console.error('Error preparando logo del proyecto:', error);
+    // Sin logo esta vez; se reintenta en la próxima constancia
+    logosPorUrl.delete(logoUrl);
+    return null;
+  }
+}
+
 // ============================================================================
 // POST-PROCESSING: Remove empty paragraphs from generated docx
 // ============================================================================
@@ -253,7 +369,7 @@ export async function generateConstanciaSeparacion(
     try {
       const { data: fileData, error: downloadError } = await supabase.storage
         .from('constancias-templates')
-        .download('constancia-separacion.docx');
+        .download(templateConDepositos('separacion', (abonosSeparacion || []).length));
 
       if (downloadError || !fileData) {
         console.error('Error downloading template:', downloadError);
@@ -327,11 +443,13 @@ export async function generateConstanciaSeparacion(
       local_nivel: local.nivel || '',
       proyecto_nombre: proyecto.nombre || '',
       depositos,
+      total_depositos: totalDepositos(depositos),
       plazo_dias: diasVigencia.toString(),
       fecha_vencimiento: formatearFecha(fechaVencimiento),
       fecha_emision: formatearFecha(fechaHoy),
       firma_nombre: primerRepresentante.nombre,
       firma_cargo: primerRepresentante.cargo,
+      logo: await cargarLogo(supabase, proyecto.logo_url),
     };
 
     // 8. Generar documento Word
@@ -508,6 +626,7 @@ export async function generateConstanciaAbono(
       fecha_emision: formatearFecha(fechaHoy),
       firma_nombre: primerRepresentante.nombre,
       firma_cargo: primerRepresentante.cargo,
+      logo: await cargarLogo(supabase, proyecto.logo_url),
     };
 
     // 9. Generar documento Word
@@ -640,7 +759,7 @@ export async function generateConstanciaCancelacion(
     try {
       const { data: fileData, error: downloadError } = await supabase.storage
         .from('constancias-templates')
-        .download('constancia-cancelacion.docx');
+        .download(templateConDepositos('cancelacion', (abonos || []).length));
 
       if (downloadError || !fileData) {
         console.error('Error downloading template:', downloadError);
@@ -715,9 +834,11 @@ export async function generateConstanciaCancelacion(
       local_area: formatMonto(local.area || controlPago.metraje || 0),
       proyecto_nombre: proyecto.nombre || '',
       depositos,
+      total_depositos: totalDepositos(depositos),
       fecha_emision: formatearFecha(fechaHoy),
       firma_nombre: primerRepresentante.nombre,
       firma_cargo: primerRepresentante.cargo,
+      logo: await cargarLogo(supabase, proyecto.logo_url),
     };
 
     // 9. Generar documento Word
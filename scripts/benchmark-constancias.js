@@ -0,0 +1,205 @@
+#!/usr/bin/env node
+/**
+ * Benchmark del motor real de las constancias (docx-templates createReport)
+ * Ejecutar: node scripts/benchmark-constancias.js [--sizes 10 1000 10000] [--repeat 3] [--output bench.json]
+ *
+ * Llena los templates de templates/constancias/ igual que lib/actions-constancias.ts
+ * (createReport con cmdDelimiter ['{', '}'] y luego la limpieza de parrafos
+ * vacios) con 10, 1.000 y 10.000 depositos. Reporta por template y cantidad
+ * el tiempo de createReport, el de la limpieza y el total (mejor y mediana de
+ * --repeat corridas, en ms), el tamano del .docx y si el total entra en el
+ * presupuesto de la server action (--budget-ms, 10 s por defecto).
+ *
+ * benchmark_constancias.py mide el renderizador precompilado de Python, que
+ * no es el que corre en produccion; el veredicto de presupuesto sale de aqui.
+ */
+
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const { performance } = require('perf_hooks');
+const { createReport } = require('docx-templates');
+const JSZip = require('jszip');
+
+const TEMPLATES_DIR = path.join(__dirname, '..', 'templates', 'constancias');
+const TEMPLATES = ['separacion', 'separacion-tabla', 'cancelacion', 'cancelacion-tabla'];
+
+// Presupuesto por defecto de una server action en Vercel sin maxDuration (10 s)
+const BUDGET_MS = 10000;
+
+function parseArgs(argv) {
+  const args = { sizes: [10, 1000, 10000], templates: TEMPLATES, repeat: 3, budgetMs: BUDGET_MS, output: null };
+  const flags = [];
+  for (const arg of argv) {
+    if (arg.startsWith('--')) {
+      flags.push([arg, []]);
+    } else if (flags.length) {
+      flags[flags.length - 1][1].push(arg);
+    } else {
+      console.error(`Argumento desconocido: ${arg}`);
+      process.exit(2);
+    }
+  }
+  for (const [flag, values] of flags) {
+    if (flag === '--sizes') args.sizes = values.map(Number);
+    else if (flag === '--templates') args.templates = values;
+    else if (flag === '--repeat') args.repeat = Number(values[0]);
+    else if (flag === '--budget-ms') args.budgetMs = Number(values[0]);
+    else if (flag === '--output') args.output = values[0];
+    else {
+      console.error(`Argumento desconocido: ${flag}`);
+      process.exit(2);
+    }
+  }
+  for (const name of args.templates) {
+    if (!TEMPLATES.includes(name)) {
+      console.error(`Template desconocido: ${name} (opciones: ${TEMPLATES.join(', ')})`);
+      process.exit(2);
+    }
+  }
+  return args;
+}
+
+// Mismo payload de ejemplo que sample_data() de render_constancias.py
+function sampleData(name, depositos) {
+  const data = {
+    razon_social: 'ECO PLAZA INMOBILIARIA S.A.C.',
+    ruc: '20601234567',
+    direccion_empresa: 'Av. Javier Prado Este 1234, San Isidro, Lima',
+    cliente_nombre: 'MARIA ELENA GARCIA TORRES',
+    cliente_dni: '07714994',
+    tiene_conyuge: false,
+    conyuge_nombre: '',
+    conyuge_dni: '',
+    local_codigo: 'A-101',
+    local_rubro: 'Abarrotes',
+    local_area: '12.50',
+    local_nivel: '1',
+    proyecto_nombre: 'Centro Comercial Eco Plaza',
+    fecha_emision: '15 de enero de 2025',
+    firma_nombre: 'JUAN PEREZ RAMIREZ',
+    firma_cargo: 'Gerente General',
+    logo: null,
+  };
+  const numero = (n) => String(n).padStart(8, '0');
+  if (name.startsWith('separacion')) {
+    Object.assign(data, {
+      monto_usd: '1000.00', monto_usd_letras: 'MIL CON 00/100 DOLARES AMERICANOS',
+      monto_pen: '3800.00', monto_pen_letras: 'TRES MIL OCHOCIENTOS CON 00/100 SOLES',
+      tipo_cambio: '3.80', tipo_cambio_letras: 'TRES CON 80/100',
+      plazo_dias: '5', fecha_vencimiento: '20 de enero de 2025',
+      depositos: Array.from({ length: depositos }, (_, i) => ({
+        fecha: '10 de enero de 2025', monto: '500.00',
+        monto_letras: 'QUINIENTOS CON 00/100 DOLARES AMERICANOS',
+        moneda: 'US$', numero_operacion: numero(1000 + i),
+      })),
+    });
+  } else {
+    Object.assign(data, {
+      monto_total_usd: '45000.00',
+      monto_total_usd_letras: 'CUARENTA Y CINCO MIL CON 00/100 DOLARES AMERICANOS',
+      depositos: Array.from({ length: depositos }, (_, i) => ({
+        tipo: i === 0 ? 'Separación' : `Cuota ${i}`, fecha: '10 de enero de 2025',
+        monto: '1500.00', numero_operacion: numero(2000 + i),
+      })),
+    });
+  }
+  data.total_depositos = data.depositos.reduce((total, d) => total + Number(d.monto), 0).toFixed(2);
+  return data;
+}
+
+// Copia de removeEmptyParagraphs() de lib/actions-constancias.ts (mantener igual)
+async function removeEmptyParagraphs(docxBuffer) {
+  const zip = await JSZip.loadAsync(docxBuffer);
+  const documentXml = await zip.file('word/document.xml')?.async('string');
+  if (!documentXml) {
+    return docxBuffer;
+  }
+
+  let cleanedXml = documentXml.replace(/<w:p[^>]*\/>/g, '');
+  cleanedXml = cleanedXml.replace(/<w:p[^>]*>(?:(?!<w:r[ >])[\s\S])*?<\/w:p>/g, (match) => {
+    if (!match.includes('<w:r') && !match.includes('<w:t')) {
+      return '';
+    }
+    return match;
+  });
+  cleanedXml = cleanedXml.replace(/<w:p[^>]*>(?:\s*<w:pPr>[\s\S]*?<\/w:pPr>)?\s*<w:r[^>]*>\s*<w:t[^>]*>\s*<\/w:t>\s*<\/w:r>\s*<\/w:p>/g, '');
+
+  zip.file('word/document.xml', cleanedXml);
+  return zip.generateAsync({ type: 'nodebuffer' });
+}
+
+function median(values) {
+  const sorted = [...values].sort((a, b) => a - b);
+  const middle = Math.floor(sorted.length / 2);
+  return sorted.length % 2 ? sorted[middle] : (sorted[middle - 1] + sorted[middle]) / 2;
+}
+
+const round3 = (ms) => Math.round(ms * 1000) / 1000;
+
+async function measure(template, data, repeat) {
+  const report = [];
+  const cleanup = [];
+  const total = [];
+  let bytes = 0;
+  for (let i = 0; i < repeat; i++) {
+    const start = performance.now();
+    const output = await createReport({ template, data, cmdDelimiter: ['{', '}'] });
+    const middle = performance.now();
+    const cleaned = await removeEmptyParagraphs(Buffer.from(output));
+    const end = performance.now();
+    report.push(middle - start);
+    cleanup.push(end - middle);
+    total.push(end - start);
+    bytes = cleaned.length;
+  }
+  return {
+    create_report_ms: round3(median(report)),
+    limpieza_ms: round3(median(cleanup)),
+    render_ms: round3(Math.min(...total)),
+    render_ms_mediana: round3(median(total)),
+    bytes,
+  };
+}
+
+function docxTemplatesVersion() {
+  try {
+    return require('docx-templates/package.json').version;
+  } catch {
+    return null;
+  }
+}
+
+async function main() {
+  const args = parseArgs(process.argv.slice(2));
+  const results = [];
+  for (const name of args.templates) {
+    const template = fs.readFileSync(path.join(TEMPLATES_DIR, `constancia-${name}.docx`));
+    for (const size of args.sizes) {
+      const result = await measure(template, sampleData(name, size), args.repeat);
+      results.push({
+        template: name, motor: 'docx-templates', depositos: size, ...result,
+        dentro_presupuesto: result.render_ms_mediana <= args.budgetMs,
+      });
+      console.error(`${name.padEnd(18)} ${String(size).padStart(6)} depositos: ` +
+        `${result.render_ms_mediana.toFixed(1).padStart(9)} ms  ${result.bytes.toLocaleString('en-US').padStart(11)} bytes`);
+    }
+  }
+
+  const report = {
+    config: { sizes: args.sizes, repeat: args.repeat, budget_ms: args.budgetMs },
+    entorno: { node: process.version, docx_templates: docxTemplatesVersion(), plataforma: `${os.platform()} ${os.release()}` },
+    resultados: results,
+  };
+  const text = JSON.stringify(report, null, 2);
+  if (args.output) {
+    fs.writeFileSync(args.output, text + '\n', 'utf8');
+  } else {
+    console.log(text);
+  }
+}
+
+main().catch((error) => {
+  console.error('Error:', error);
+  process.exit(1);
+});
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Render benchmark of the Python constancia backends with long payment histories.
+
+Fills the paragraph-loop templates (separacion, cancelacion) and their
+table-row variants (separacion-tabla, cancelacion-tabla) with 10, 1,000 and
+10,000 deposits and reports, per template and size, the render time (best
+and median of --repeat runs, in ms) and the output size. With --pdf the PDF
+backend is measured too (requires reportlab), with its page count.
+
+This measures render_constancias.py, not the server action: production fills
+the templates with docx-templates createReport, which evaluates every command
+as JavaScript, so these timings say nothing about the server-action time
+budget. benchmark-constancias.js runs createReport on the same templates and
+payloads and reports that.
+
+Usage: python benchmark_constancias.py --output bench-constancias.json
+       python benchmark_constancias.py --sizes 10 1000 --pdf
+"""
+import argparse
+import json
+import platform
+import re
+import statistics
+import sys
+import time
+
+from render_constancias import load_template, sample_data
+
+TEMPLATES = ['separacion', 'separacion-tabla', 'cancelacion', 'cancelacion-tabla']
+
+
+def measure(render, data, repeat):
+    """(best ms, median ms, output) of `repeat` renders"""
+    times = []
+    output = b''
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = render(data)
+        times.append((time.perf_counter() - start) * 1000)
+    return round(min(times), 3), round(statistics.median(times), 3), output
+
+
+def pdf_pages(pdf):
+    """Page objects in a PDF written by reportlab"""
+    return len(re.findall(rb'/Type /Page\b(?!s)', pdf))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark constancia rendering with long deposit lists')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 10000],
+                        help='Numbers of deposits to render (default: 10 1000 10000)')
+    parser.add_argument('--templates', nargs='+', choices=TEMPLATES, default=TEMPLATES)
+    parser.add_argument('--repeat', type=int, default=3, help='Renders per measurement (default: 3)')
+    parser.add_argument('--pdf', action='store_true', help='Also measure the PDF backend (requires reportlab)')
+    parser.add_argument('--output', default=None, help='Write the JSON here (default: stdout)')
+    args = parser.parse_args()
+
+    backends = {'docx': lambda name: load_template(name).render}
+    if args.pdf:
+        from constancias_pdf import load_pdf_template
+        backends['pdf'] = lambda name: load_pdf_template(name).render
+
+    results = []
+    for name in args.templates:
+        for backend, loader in backends.items():
+            render = loader(name)
+            for size in args.sizes:
+                best, median, output = measure(render, sample_data(name, depositos=size), args.repeat)
+                output_bytes = len(output)
+                results.append({
+                    'template': name, 'backend': backend, 'depositos': size,
+                    'render_ms': best, 'render_ms_mediana': median, 'bytes': output_bytes,
+                })
+                if backend == 'pdf':
+                    results[-1]['paginas'] = pdf_pages(output)
+                print(f'{name:18} {backend:4} {size:>6} depositos: {median:9.1f} ms  {output_bytes:>11,} bytes',
+                      file=sys.stderr)
+
+    report = {
+        'config': {'sizes': args.sizes, 'repeat': args.repeat},
+        'entorno': {'python': platform.python_version(), 'plataforma': platform.platform()},
+        'resultados': results,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
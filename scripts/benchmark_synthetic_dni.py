@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Benchmark de throughput del generador de DNI sinteticos
+=======================================================
+Corre el generador con seed y cantidad fijas y reporta en JSON:
+
+- `muestreo`: tiempo del muestreo de datos. Es columnar por bloques de
+  BLOQUE_MUESTREO identidades, asi que se reporta por bloque (cantidad,
+  total y media) y no como percentiles por tarjeta.
+- `etapas`: tiempo por etapa medido tarjeta a tarjeta en un solo hilo
+  (capa estatica, texto, codigo de barras, codificacion y escritura), con
+  total, media, p50 y p95 en milisegundos.
+- `latencia_ms`: p50/p95 por tarjeta (una tarjeta = una cara), sin el muestreo.
+- `pipeline`: tarjetas/s de punta a punta con el pipeline real
+  (generar_en_paralelo, workers y pool de codificacion).
+- `limpio_vs_aumentado` (solo con --augment): tarjetas/s del pipeline sin
+  aumentar, con el formato por defecto del generador (PNG) salvo --format,
+  y la relacion aumentado / limpio.
+
+Como en el generador, --format vale png por defecto y jpeg con --augment.
+
+Con --baseline compara contra un JSON anterior y sale con codigo 1 si el
+throughput del pipeline cae mas de --max-regression. Solo compara corridas
+con la misma `config` (count, seed, workers, layout, encoder, hilos y
+aumentacion); si difiere sale con codigo 2 indicando que claves cambian.
+
+Uso: python benchmark_synthetic_dni.py --count 500 --output bench.json
+     python benchmark_synthetic_dni.py --count 500 --baseline bench.json --max-regression 0.10
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import PIL
+
+from dni_encoders import FORMATOS, Encoder
+from dni_layouts import LAYOUTS, plan_layout
+from dni_manifest import version_generador
+from dni_sampler import BLOQUE_MUESTREO, MuestreadorIdentidades
+from generate_synthetic_dni import (
+    MODULOS_RENDER,
+    OpcionesGeneracion,
+    generar_en_paralelo,
+    nombre_archivo,
+)
+
+ETAPAS = ('capa_estatica', 'texto', 'codigo_barras', 'codificacion', 'escritura')
+
+
+def _ms(segundos):
+    return round(segundos * 1000, 4)
+
+
+def resumir(valores):
+    """Total, media, p50 y p95 (ms) de una lista de duraciones en segundos"""
+    if len(valores) > 1:
+        cortes = statistics.quantiles(valores, n=100, method='inclusive')
+        p50, p95 = cortes[49], cortes[94]
+    else:
+        p50 = p95 = valores[0]
+    return {
+        'total_ms': _ms(sum(valores)),
+        'media_ms': _ms(statistics.fmean(valores)),
+        'p50_ms': _ms(p50),
+        'p95_ms': _ms(p95),
+    }
+
+
+def medir_etapas(count, seed, layout, encoder, directorio):
+    """Recorre el render tarjeta a tarjeta cronometrando cada etapa.
+
+    Devuelve (tiempos por etapa, latencias por tarjeta, duracion de cada
+    bloque de muestreo); el muestreo no entra en las latencias.
+    """
+    plan = plan_layout(layout)
+    reloj = time.perf_counter
+    tiempos = {etapa: [] for etapa in ETAPAS}
+    latencias = []
+
+    muestreador = MuestreadorIdentidades(seed)
+    bloques = []
+    identidades = []
+    while len(identidades) < count:
+        t0 = reloj()
+        lote = muestreador.siguiente_lote()
+        registros = lote.registros(0, min(len(lote), count - len(identidades)))
+        bloques.append(reloj() - t0)
+        identidades.extend(enumerate(registros, lote.inicio))
+
+    for index, data in identidades:
+        for cara, plan_cara in plan.items():
+            t0 = reloj()
+            img = plan_cara.lienzo()
+            t1 = reloj()
+            plan_cara.dibujar_textos(img, data, {})
+            t2 = reloj()
+            plan_cara.dibujar_codigo(img, data, {})
+            t3 = reloj()
+            contenido = encoder.encode(img)
+            t4 = reloj()
+            with open(os.path.join(directorio, nombre_archivo(index, cara, encoder.extension)), 'wb') as f:
+                f.write(contenido)
+            t5 = reloj()
+            plan_cara.liberar(img)
+
+            for etapa, duracion in zip(ETAPAS, (t1 - t0, t2 - t1, t3 - t2, t4 - t3, t5 - t4)):
+                tiempos[etapa].append(duracion)
+            latencias.append(t5 - t0)
+
+    return tiempos, latencias, bloques
+
+
+def medir_pipeline(count, workers, opciones):
+    """Tarjetas/s de punta a punta con el pipeline real del generador"""
+    inicio = time.perf_counter()
+    identidades = MuestreadorIdentidades(opciones.seed).muestrear(count)
+    pares = sum(1 for _ in generar_en_paralelo(identidades, workers, opciones))
+    elapsed = time.perf_counter() - inicio
+    return {'pares': pares, 'segundos': round(elapsed, 4),
+            'tarjetas_por_segundo': round(2 * pares / elapsed, 2)}
+
+
+def diferencias_config(resultado, baseline):
+    """Claves de `config` que difieren entre la corrida y el baseline"""
+    actual, referencia = resultado['config'], baseline.get('config', {})
+    return sorted(k for k in actual.keys() | referencia.keys() if actual.get(k) != referencia.get(k))
+
+
+def comparar(resultado, baseline, max_regression):
+    """Devuelve (ok, mensaje) comparando el throughput del pipeline contra el baseline"""
+    actual = resultado['pipeline']['tarjetas_por_segundo']
+    referencia = baseline['pipeline']['tarjetas_por_segundo']
+    cambio = actual / referencia - 1
+    mensaje = (f"pipeline: {actual:.1f} tarjetas/s vs baseline {referencia:.1f} "
+               f"({cambio:+.1%}, umbral -{max_regression:.0%})")
+    return cambio >= -max_regression, mensaje
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark del generador de DNI sinteticos')
+    parser.add_argument('--count', type=int, default=200,
+                        help='Pares a generar en cada medicion (default: 200)')
+    parser.add_argument('--seed', type=int, default=12345, help='Semilla fija (default: 12345)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Procesos para la medicion del pipeline; 0 usa todos los nucleos (default: 1)')
+    parser.add_argument('--layout', choices=sorted(LAYOUTS), default='clasico')
+    parser.add_argument('--format', choices=sorted(FORMATOS), default=None,
+                        help='Formato de salida (default: png, o jpeg con --augment)')
+    parser.add_argument('--png-compress-level', type=int, default=6, choices=range(10), metavar='0-9')
+    parser.add_argument('--quality', type=int, default=90)
+    parser.add_argument('--encode-threads', type=int, default=2)
+    parser.add_argument('--augment', action='store_true',
+                        help='Incluye la aumentacion en la medicion del pipeline')
+    parser.add_argument('--output', default=None, help='Escribe el JSON en esta ruta (default: stdout)')
+    parser.add_argument('--baseline', default=None, help='JSON de una corrida anterior para comparar')
+    parser.add_argument('--max-regression', type=float, default=0.10,
+                        help='Caida maxima tolerada de tarjetas/s contra el baseline (default: 0.10)')
+    args = parser.parse_args(argv)
+    args.format_limpio = args.format or 'png'
+    if args.format is None:
+        args.format = 'jpeg' if args.augment else 'png'
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Se lee antes de medir: con --output igual a --baseline se compararia contra si misma
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    workers = args.workers or os.cpu_count() or 1
+    encoder = Encoder(args.format, compress_level=args.png_compress_level, quality=args.quality)
+
+    inicio = time.perf_counter()
+    plan_layout(args.layout)
+    compilacion = time.perf_counter() - inicio
+
+    with tempfile.TemporaryDirectory(prefix='bench-dni-') as directorio:
+        tiempos, latencias, bloques = medir_etapas(args.count, args.seed, args.layout, encoder, directorio)
+        opciones = OpcionesGeneracion(
+            seed=args.seed,
+            output_dir=directorio,
+            layout=args.layout,
+            encoder=encoder,
+            hilos_encoder=args.encode_threads,
+            aumentar=args.augment,
+        )
+        pipeline = medir_pipeline(args.count, workers, opciones)
+        comparacion = None
+        if args.augment:
+            limpio = Encoder(args.format_limpio, compress_level=args.png_compress_level, quality=args.quality)
+            opciones.encoder, opciones.aumentar = limpio, False
+            comparacion = {
+                'limpio': {**medir_pipeline(args.count, workers, opciones), 'encoder': limpio.settings()},
+                'aumentado': {**pipeline, 'encoder': encoder.settings()},
+            }
+            comparacion['relacion'] = round(comparacion['aumentado']['tarjetas_por_segundo']
+                                            / comparacion['limpio']['tarjetas_por_segundo'], 3)
+
+    total_etapas = sum(latencias) + sum(bloques)
+    resultado = {
+        'config': {
+            'count': args.count, 'seed': args.seed, 'workers': workers, 'layout': args.layout,
+            'encoder': encoder.settings(), 'encode_threads': args.encode_threads,
+            'augment': args.augment,
+        },
+        'entorno': {
+            'python': platform.python_version(), 'pillow': PIL.__version__,
+            'plataforma': platform.platform(), 'cpus': os.cpu_count(),
+            'version_generador': version_generador(MODULOS_RENDER),
+        },
+        'compilacion_layout_ms': _ms(compilacion),
+        'tarjetas': len(latencias),
+        'tarjetas_por_segundo': round(len(latencias) / total_etapas, 2),
+        'muestreo': {
+            'bloques': len(bloques),
+            'tamano_bloque': BLOQUE_MUESTREO,
+            'total_ms': _ms(sum(bloques)),
+            'por_bloque_ms': _ms(statistics.fmean(bloques)),
+        },
+        'latencia_ms': {k: v for k, v in resumir(latencias).items() if k != 'total_ms'},
+        'etapas': {etapa: resumir(valores) for etapa, valores in tiempos.items()},
+        'pipeline': pipeline,
+    }
+    if comparacion is not None:
+        resultado['limpio_vs_aumentado'] = comparacion
+
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(texto + '\n')
+    else:
+        print(texto)
+
+    if baseline is not None:
+        diferentes = diferencias_config(resultado, baseline)
+        if diferentes:
+            for clave in diferentes:
+                print(f"config.{clave}: {resultado['config'].get(clave)!r} vs baseline "
+                      f"{baseline.get('config', {}).get(clave)!r}", file=sys.stderr)
+            print(f"ERROR el baseline {args.baseline} no es comparable: config distinta en "
+                  f"{', '.join(diferentes)}", file=sys.stderr)
+            sys.exit(2)
+        ok, mensaje = comparar(resultado, baseline, args.max_regression)
+        print(("OK " if ok else "REGRESION ") + mensaje, file=sys.stderr)
+        if not ok:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Shared layout description of the constancias.
+
+The three constancias share the same frame (margins, header table, title,
+"SE HACE CONSTAR:", signature and footer) and differ only in their numbered
+clauses. Both backends read this description:
+
+- generate_constancias_templates.py compiles it to the .docx templates
+  (with docx-templates `{...}` commands).
+- constancias_pdf.py renders it straight to PDF, filling the same
+  `{...}` commands with the payload.
+
+Runs are (text, style) pairs with style '' (plain), 'b' (bold) or 'i'
+(italic). Body blocks are dicts:
+
+    {'tipo': 'clausula', 'runs': [...]}        numbered paragraph ("1. ", "2. ", ...)
+    {'tipo': 'lista', 'var': v, 'en': lista, 'runs': [...]}
+                                               one bullet per item of `lista`
+    {'tipo': 'tabla', 'filas': [(label, value), ...]}
+                                               two-column grid, bold labels
+    {'tipo': 'tabla_lista', 'var': v, 'en': lista,
+     'columnas': [(header, cell), ...], 'totales': [cell, ...]}
+                                               grid with one row per item of `lista`
+                                               plus a header and a totals row
+
+A blank paragraph separates consecutive blocks.
+
+The '-tabla' variants of separacion and cancelacion list the deposits as
+table rows instead of bullet paragraphs, for long payment histories; they
+also need `total_depositos` in the payload for the totals row. The server
+action (lib/actions-constancias.ts) switches to them from DEPOSITOS_TABLA_MIN
+deposits on and always sends `total_depositos`.
+"""
+
+# Page margins in cm: top, bottom, left, right
+MARGENES_CM = (2, 2, 2.5, 2.5)
+
+# Logo cell of the header: a docx-templates IMAGE command that the server
+# action fills with the prepared project logo (`logo` in its payload). The
+# Python renderers put their own logo there from `logo_url`, or leave the
+# cell empty.
+LOGO = '{IMAGE logo}'
+
+# Header logo box (width, height in cm) and the resolution the logos are prepared at
+LOGO_CM = (4.5, 1.5)
+LOGO_DPI = 200
+
+ENCABEZADO = [('{razon_social}', 'b'), ('RUC: {ruc}', ''), ('{direccion_empresa}', '')]
+
+INTRO = 'SE HACE CONSTAR:'
+
+LINEA_FIRMA = '_' * 40
+
+FIRMA = [('{firma_nombre}', 'b'), ('{firma_cargo}', '')]
+
+PIE = 'Lima, {fecha_emision}'
+
+NOTA_FINAL = [('Se emite la presente constancia a solicitud del interesado para los fines que '
+               'estime conveniente.', '')]
+
+
+def _cliente(accion):
+    return [('Que el(la) Sr(a). ', ''), ('{cliente_nombre}', 'b'), (', identificado(a) con DNI N° ', ''),
+            ('{cliente_dni}', 'b'), (accion, '')]
+
+
+def _inmueble(con_nivel=False):
+    return [('Local comercial ', ''), ('{local_codigo}', 'b'), (' ({local_rubro}) con un area de ', ''),
+            ('{local_area} m²', 'b'),
+            (', nivel {local_nivel}, ubicado en el proyecto ' if con_nivel else ', ubicado en el proyecto ', ''),
+            ('{proyecto_nombre}', 'b'), ('.', '')]
+
+
+def _clausula(*runs):
+    return {'tipo': 'clausula', 'runs': list(runs)}
+
+
+CONSTANCIAS = {
+    'separacion': {
+        'titulo': 'CONSTANCIA DE SEPARACION',
+        'bloques': [
+            _clausula(*_cliente(', ha realizado la separacion del siguiente bien inmueble:')),
+            _clausula(*_inmueble(con_nivel=True)),
+            _clausula(('El monto de separacion asciende a ', ''), ('US$ {monto_usd}', 'b'), (' (', ''),
+                      ('{monto_usd_letras}', 'i'), (') o su equivalente en soles S/ ', ''),
+                      ('{monto_pen}', 'b'), (' ({monto_pen_letras}) al tipo de cambio S/ {tipo_cambio}.', '')),
+            _clausula(('Deposito(s) realizado(s):', '')),
+            {'tipo': 'lista', 'var': 'deposito', 'en': 'depositos',
+             'runs': [('{$deposito.fecha} - Op. {$deposito.numero_operacion} - '
+                       '{$deposito.moneda} {$deposito.monto}', '')]},
+            _clausula(('La presente constancia tiene vigencia de {plazo_dias} dias, hasta el ', ''),
+                      ('{fecha_vencimiento}', 'b'),
+                      (', fecha en la cual el cliente debera completar el pago de la cuota inicial.', '')),
+            _clausula(*NOTA_FINAL),
+        ],
+    },
+    'abono': {
+        'titulo': 'CONSTANCIA DE ABONO',
+        'bloques': [
+            _clausula(*_cliente(', ha realizado un abono correspondiente al siguiente bien inmueble:')),
+            _clausula(*_inmueble()),
+            _clausula(('El abono realizado corresponde a:', '')),
+            {'tipo': 'tabla', 'filas': [
+                ('Monto USD:', 'US$ {monto_usd} ({monto_usd_letras})'),
+                ('Fecha de deposito:', '{fecha_deposito}'),
+                ('Operacion bancaria:', '{numero_operacion}'),
+                ('Tipo:', 'Abono a cuenta'),
+            ]},
+            _clausula(*NOTA_FINAL),
+        ],
+    },
+    'cancelacion': {
+        'titulo': 'CONSTANCIA DE CANCELACION',
+        'bloques': [
+            _clausula(*_cliente(', ha CANCELADO en su totalidad el siguiente bien inmueble:')),
+            _clausula(*_inmueble()),
+            _clausula(('Monto total cancelado: ', ''), ('US$ {monto_total_usd}', 'b'),
+                      (' ({monto_total_usd_letras}).', '')),
+            _clausula(('Historial de pagos realizados:', '')),
+            {'tipo': 'lista', 'var': 'deposito', 'en': 'depositos',
+             'runs': [('{$deposito.fecha} - {$deposito.tipo} - US$ {$deposito.monto} - '
+                       'Op. {$deposito.numero_operacion}', '')]},
+            _clausula(('Se certifica que el cliente ha cumplido con el pago total del bien inmueble, quedando ', ''),
+                      ('LIBRE DE CUALQUIER OBLIGACION DE PAGO PENDIENTE', 'b'), ('.', '')),
+            _clausula(*NOTA_FINAL),
+        ],
+    },
+}
+
+
+def _con_tabla(nombre, columnas, totales):
+    """Variant of a constancia with its deposit list as a table-row loop"""
+    bloques = []
+    for bloque in CONSTANCIAS[nombre]['bloques']:
+        if bloque['tipo'] == 'lista':
+            bloque = {'tipo': 'tabla_lista', 'var': bloque['var'], 'en': bloque['en'],
+                      'columnas': columnas, 'totales': totales}
+        bloques.append(bloque)
+    return {'titulo': CONSTANCIAS[nombre]['titulo'], 'bloques': bloques}
+
+
+CONSTANCIAS['separacion-tabla'] = _con_tabla(
+    'separacion',
+    [('Fecha', '{$deposito.fecha}'), ('Operacion', '{$deposito.numero_operacion}'),
+     ('Moneda', '{$deposito.moneda}'), ('Monto', '{$deposito.monto}')],
+    ['TOTAL', '', '', '{total_depositos}'],
+)
+
+CONSTANCIAS['cancelacion-tabla'] = _con_tabla(
+    'cancelacion',
+    [('Fecha', '{$deposito.fecha}'), ('Concepto', '{$deposito.tipo}'),
+     ('Monto US$', '{$deposito.monto}'), ('Operacion', '{$deposito.numero_operacion}')],
+    ['TOTAL', '', '{total_depositos}', ''],
+)
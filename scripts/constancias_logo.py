@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Project logos for the constancias, prepared once and cached (requires Pillow).
+
+The header of every constancia has a logo box of LOGO_CM at LOGO_DPI. A
+project's logo (proyectos.logo_url, sent as `logo_url` in the payload) is
+downscaled to fit that box, flattened to RGB when it has no transparency and
+re-encoded as an optimized PNG without metadata, so each constancia carries
+a few KB of image instead of the full-resolution upload.
+
+LogoCache keys the prepared logos by the sha256 of the source bytes: in memory
+per process and, with CONSTANCIAS_LOGO_CACHE (or --logo-cache of
+export_constancias.py), as <sha256>-<w>x<h>.png files shared between
+processes and runs; the box size in the name keeps a change of LOGO_CM or
+LOGO_DPI from reusing stale files. URLs are downloaded once per process.
+Sources that prepare to the same bytes share one Logo object, so the
+renderers keep one media part per logo.
+
+Usage: python constancias_logo.py logo-proyecto.png --output logo-header.png
+"""
+import argparse
+import hashlib
+import io
+import os
+import struct
+import urllib.request
+
+from constancias_layout import LOGO_CM, LOGO_DPI
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    raise SystemExit('Project logos require Pillow: pip install pillow')
+
+EMU_PER_CM = 360000
+
+# Seconds to wait for a logo download
+DOWNLOAD_TIMEOUT = 20
+
+
+def box_pixels():
+    """(width, height) in pixels of the header logo box"""
+    width_cm, height_cm = LOGO_CM
+    return round(width_cm / 2.54 * LOGO_DPI), round(height_cm / 2.54 * LOGO_DPI)
+
+
+class Logo:
+    """A prepared logo: PNG bytes plus its pixel and display size"""
+    __slots__ = ('png', 'sha256', 'width', 'height', 'width_cm', 'height_cm')
+
+    def __init__(self, png):
+        if png[:8] != b'\x89PNG\r\n\x1a\n':
+            raise ValueError('Prepared logo is not a PNG')
+        self.png = png
+        self.sha256 = hashlib.sha256(png).hexdigest()
+        self.width, self.height = struct.unpack('>2L', png[16:24])
+        # Displayed as large as fits in the box, keeping the aspect ratio
+        width_cm, height_cm = LOGO_CM
+        scale = min(width_cm / self.width, height_cm / self.height)
+        self.width_cm = self.width * scale
+        self.height_cm = self.height * scale
+
+    @property
+    def width_emu(self):
+        return round(self.width_cm * EMU_PER_CM)
+
+    @property
+    def height_emu(self):
+        return round(self.height_cm * EMU_PER_CM)
+
+
+def prepare_logo(source):
+    """Downscale and re-encode the source image bytes for the header box"""
+    with Image.open(io.BytesIO(source)) as image:
+        image = ImageOps.exif_transpose(image)
+        image = image.convert('RGBA')
+    if image.getextrema()[3][0] == 255:
+        image = image.convert('RGB')
+    image.thumbnail(box_pixels(), Image.LANCZOS)
+    output = io.BytesIO()
+    image.save(output, 'PNG', optimize=True)
+    return Logo(output.getvalue())
+
+
+def read_source(location):
+    """Bytes of a logo given as a local path or an http(s) URL"""
+    if location.startswith(('http://', 'https://')):
+        with urllib.request.urlopen(location, timeout=DOWNLOAD_TIMEOUT) as response:
+            return response.read()
+    with open(location, 'rb') as f:
+        return f.read()
+
+
+class LogoCache:
+    """Prepared logos by source sha256, in memory and optionally on disk"""
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self._by_source = {}
+        self._by_location = {}
+        self._by_output = {}
+
+    def get(self, location):
+        """Prepared logo for a path or URL; each location is read once per process"""
+        logo = self._by_location.get(location)
+        if logo is None:
+            logo = self.get_bytes(read_source(location))
+            self._by_location[location] = logo
+        return logo
+
+    def get_bytes(self, source):
+        """Prepared logo for the source image bytes"""
+        key = hashlib.sha256(source).hexdigest()
+        logo = self._by_source.get(key)
+        if logo is not None:
+            return logo
+        width, height = box_pixels()
+        path = os.path.join(self.directory, f'{key}-{width}x{height}.png') if self.directory else None
+        if path and os.path.exists(path):
+            with open(path, 'rb') as f:
+                logo = Logo(f.read())
+        else:
+            logo = prepare_logo(source)
+            if path:
+                os.makedirs(self.directory, exist_ok=True)
+                temporary = f'{path}.{os.getpid()}.tmp'
+                with open(temporary, 'wb') as f:
+                    f.write(logo.png)
+                os.replace(temporary, path)
+        logo = self._by_output.setdefault(logo.sha256, logo)
+        self._by_source[key] = logo
+        return logo
+
+
+_CACHE = None
+
+
+def load_logo(location):
+    """Prepared logo from the process-wide cache (on disk under CONSTANCIAS_LOGO_CACHE if set)"""
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = LogoCache(os.environ.get('CONSTANCIAS_LOGO_CACHE') or None)
+    return _CACHE.get(location)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prepare a project logo for the constancia header')
+    parser.add_argument('logo', help='Path or URL of the project logo')
+    parser.add_argument('--output', help='Write the prepared PNG here')
+    args = parser.parse_args()
+
+    source = read_source(args.logo)
+    logo = prepare_logo(source)
+    if args.output:
+        with open(args.output, 'wb') as f:
+            f.write(logo.png)
+        print(f'Logo generado: {args.output}')
+    print(f'Original: {len(source):,} bytes')
+    print(f'Preparado: {logo.width}x{logo.height} px, {len(logo.png):,} bytes '
+          f'({logo.width_cm:.2f} x {logo.height_cm:.2f} cm, sha256 {logo.sha256[:12]})')
+
+
+if __name__ == '__main__':
+    main()
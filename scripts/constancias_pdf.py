@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Direct PDF backend for the constancias (requires reportlab).
+
+Renders the shared layout of constancias_layout.py straight to PDF, filling
+the same `{...}` commands as the .docx templates, without going through Word
+or LibreOffice. Each layout is compiled once into reportlab paragraph markup
+with the commands split out (the same field lookup as render_constancias.py),
+so a document is a substitution plus a platypus build: a few milliseconds.
+With `logo_url` in the payload the header shows the project logo prepared by
+constancias_logo.py, sized to the same box as in the .docx.
+
+Usage: python constancias_pdf.py separacion --data payload.json --output constancia.pdf
+       python constancias_pdf.py cancelacion --bench 500
+"""
+import argparse
+from functools import lru_cache
+import io
+import json
+import re
+import time
+from xml.sax.saxutils import escape
+
+from constancias_layout import (
+    CONSTANCIAS,
+    ENCABEZADO,
+    FIRMA,
+    INTRO,
+    LINEA_FIRMA,
+    MARGENES_CM,
+    PIE,
+)
+from render_constancias import Field, sample_data
+
+try:
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.lib.units import cm, inch
+    from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+except ImportError:
+    raise SystemExit('The PDF backend requires reportlab: pip install reportlab')
+
+COMMAND_RE = re.compile(r'\{(\$?\w+(?:\.\w+)*)\}')
+
+# One blank line of the .docx (Calibri 11 in the python-docx default template)
+BLANK = 14
+
+STYLES = {
+    'body': ParagraphStyle('body', fontName='Helvetica', fontSize=11, leading=14),
+    'bullet': ParagraphStyle('bullet', fontName='Helvetica', fontSize=11, leading=14,
+                             leftIndent=18, bulletIndent=6),
+    'title': ParagraphStyle('title', fontName='Helvetica-Bold', fontSize=14, leading=18, alignment=TA_CENTER),
+    'intro': ParagraphStyle('intro', fontName='Helvetica-Bold', fontSize=12, leading=15, alignment=TA_CENTER),
+    'center': ParagraphStyle('center', fontName='Helvetica', fontSize=11, leading=14, alignment=TA_CENTER),
+    'right': ParagraphStyle('right', fontName='Helvetica', fontSize=11, leading=14, alignment=TA_RIGHT),
+}
+
+# Rows per platypus Table in the table-row loops
+ROWS_PER_TABLE = 50
+
+
+class Markup:
+    """Paragraph markup with its `{...}` commands precompiled into Field nodes.
+
+    With markup=False the text is kept plain (no escaping, no <b>/<i>), for
+    table cells drawn as plain strings.
+    """
+    __slots__ = ('nodes', 'markup')
+
+    def __init__(self, runs, markup=True):
+        self.markup = markup
+        if markup:
+            markup = ''.join(_run_markup(text, style) for text, style in runs)
+        else:
+            markup = ''.join(text for text, _ in runs)
+        self.nodes = []
+        position = 0
+        for match in COMMAND_RE.finditer(markup):
+            self.nodes.append(markup[position:match.start()])
+            self.nodes.append(Field(match.group(1)))
+            position = match.end()
+        self.nodes.append(markup[position:])
+
+    def fill(self, data, scope):
+        out = []
+        for node in self.nodes:
+            if node.__class__ is str:
+                out.append(node)
+            else:
+                value = node.value(data, scope)
+                if value is None:
+                    continue
+                if self.markup:
+                    out.append(escape(str(value)).replace('\n', '<br/>'))
+                else:
+                    out.append(str(value))
+        return ''.join(out)
+
+
+def _run_markup(text, style):
+    text = escape(text)
+    if style == 'b':
+        return f'<b>{text}</b>'
+    if style == 'i':
+        return f'<i>{text}</i>'
+    return text
+
+
+class PdfConstancia:
+    """A constancia layout compiled for the PDF backend"""
+
+    def __init__(self, name):
+        layout = CONSTANCIAS[name]
+        self.name = name
+        self.title = layout['titulo']
+        self.header = [Markup([run]) for run in ENCABEZADO]
+        self.signature = [Markup([run]) for run in FIRMA]
+        self.footer = Markup([(PIE, '')])
+        self.blocks = []
+        number = 0
+        for block in layout['bloques']:
+            if block['tipo'] == 'clausula':
+                number += 1
+                self.blocks.append(('clausula', Markup([(f'{number}. ', 'b'), *block['runs']])))
+            elif block['tipo'] == 'lista':
+                self.blocks.append(('lista', (block['var'], Field(block['en']), Markup(block['runs']))))
+            elif block['tipo'] == 'tabla':
+                self.blocks.append(('tabla', [(Markup([(label, 'b')]), Markup([(value, '')]))
+                                              for label, value in block['filas']]))
+            elif block['tipo'] == 'tabla_lista':
+                self.blocks.append(('tabla_lista', (
+                    block['var'], Field(block['en']),
+                    [Markup([(header, '')], markup=False) for header, _ in block['columnas']],
+                    [Markup([(cell, '')], markup=False) for _, cell in block['columnas']],
+                    [Markup([(cell, '')], markup=False) for cell in block['totales']],
+                )))
+            else:
+                raise ValueError(f"Unknown block type: {block['tipo']}")
+
+    def story(self, data):
+        """Platypus flowables of the filled constancia"""
+        header = '<br/>'.join(m.fill(data, {}) for m in self.header)
+        header_table = Table([[self._logo(data), Paragraph(header, STYLES['right'])]],
+                             colWidths=[2 * inch, 4 * inch])
+        header_table.setStyle(TableStyle([('VALIGN', (0, 0), (-1, -1), 'TOP')]))
+        story = [
+            header_table,
+            Spacer(1, BLANK),
+            Paragraph(escape(self.title), STYLES['title']),
+            Spacer(1, BLANK),
+            Paragraph(escape(INTRO), STYLES['intro']),
+            Spacer(1, BLANK),
+        ]
+        for i, (kind, block) in enumerate(self.blocks):
+            if i:
+                story.append(Spacer(1, BLANK))
+            if kind == 'clausula':
+                story.append(Paragraph(block.fill(data, {}), STYLES['body']))
+            elif kind == 'lista':
+                var, items, item = block
+                for value in items.value(data, {}) or ():
+                    story.append(Paragraph(item.fill(data, {var: value}), STYLES['bullet'], bulletText='•'))
+            elif kind == 'tabla_lista':
+                story.extend(self._row_loop_tables(block, data))
+            else:
+                rows = [[Paragraph(label.fill(data, {}), STYLES['body']),
+                         Paragraph(value.fill(data, {}), STYLES['body'])] for label, value in block]
+                table = Table(rows, colWidths=[5 * cm, 11 * cm])
+                table.setStyle(TableStyle([('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+                                           ('VALIGN', (0, 0), (-1, -1), 'TOP')]))
+                story.append(table)
+
+        story.append(Spacer(1, 2 * BLANK))
+        story.append(Paragraph(LINEA_FIRMA, STYLES['center']))
+        story.extend(Paragraph(m.fill(data, {}), STYLES['center']) for m in self.signature)
+        story.append(Spacer(1, 2 * BLANK))
+        story.append(Paragraph(self.footer.fill(data, {}), STYLES['right']))
+        return story
+
+    def _logo(self, data):
+        """The project logo of the payload, or an empty cell"""
+        if not data.get('logo_url'):
+            return Paragraph('', STYLES['body'])
+        from constancias_logo import load_logo
+        logo = load_logo(data['logo_url'])
+        return Image(io.BytesIO(logo.png), width=logo.width_cm * cm, height=logo.height_cm * cm, hAlign='LEFT')
+
+    def _row_loop_tables(self, block, data):
+        """One row per item plus header and totals, as plain-string cells.
+
+        The rows are cut into tables of ROWS_PER_TABLE so that platypus only
+        ever splits small tables across pages; one big Table with Paragraph
+        cells made 10,000 deposits take ~20 s instead of ~1.5 s.
+        """
+        var, items, headers, cells, totals = block
+        rows = [[m.fill(data, {}) for m in headers]]
+        for value in items.value(data, {}) or ():
+            scope = {var: value}
+            rows.append([m.fill(data, scope) for m in cells])
+        rows.append([m.fill(data, {}) for m in totals])
+
+        top, bottom, left, right = MARGENES_CM
+        widths = [(A4[0] - (left + right) * cm) / len(headers)] * len(headers)
+        tables = []
+        for start in range(0, len(rows), ROWS_PER_TABLE):
+            chunk = rows[start:start + ROWS_PER_TABLE]
+            commands = [('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+                        ('FONT', (0, 0), (-1, -1), 'Helvetica', 9)]
+            if start == 0:
+                commands.append(('FONT', (0, 0), (-1, 0), 'Helvetica-Bold', 9))
+            if start + ROWS_PER_TABLE >= len(rows):
+                commands.append(('FONT', (0, -1), (-1, -1), 'Helvetica-Bold', 9))
+            table = Table(chunk, colWidths=widths)
+            table.setStyle(TableStyle(commands))
+            tables.append(table)
+        return tables
+
+    def render(self, data, output=None):
+        """Write the PDF to `output` (path or file object); return bytes if omitted"""
+        target = output if output is not None else io.BytesIO()
+        top, bottom, left, right = MARGENES_CM
+        doc = SimpleDocTemplate(target, pagesize=A4, topMargin=top * cm, bottomMargin=bottom * cm,
+                                leftMargin=left * cm, rightMargin=right * cm, title=self.title,
+                                invariant=True)
+        doc.build(self.story(data))
+        if output is None:
+            return target.getvalue()
+
+
+@lru_cache(maxsize=None)
+def load_pdf_template(name):
+    """Compiled PDF layout of a constancia by name, cached per process"""
+    return PdfConstancia(name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render constancias directly to PDF')
+    parser.add_argument('template', choices=sorted(CONSTANCIAS))
+    parser.add_argument('--data', help='JSON file with the template data (default: sample data)')
+    parser.add_argument('--output', help='Output .pdf path')
+    parser.add_argument('--logo', help='Path or URL of the project logo (sets logo_url; requires Pillow)')
+    parser.add_argument('--bench', type=int, default=0, metavar='N',
+                        help='Render N documents in memory and report documents per second')
+    args = parser.parse_args()
+
+    template = load_pdf_template(args.template)
+    if args.data:
+        with open(args.data, encoding='utf-8') as f:
+            data = json.load(f)
+    else:
+        data = sample_data(args.template)
+    if args.logo:
+        data['logo_url'] = args.logo
+
+    if args.output:
+        template.render(data, args.output)
+        print(f'Constancia generada: {args.output}')
+
+    if args.bench:
+        start = time.perf_counter()
+        size = 0
+        for _ in range(args.bench):
+            size = len(template.render(data))
+        elapsed = time.perf_counter() - start
+        print(f'PDF: {args.bench / elapsed:,.0f} docs/s ({elapsed / args.bench * 1000:.1f} ms por documento, '
+              f'{size:,} bytes)')
+
+
+if __name__ == '__main__':
+    main()
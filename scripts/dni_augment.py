@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Aumentacion foto-realista por lotes para DNI sinteticos
+=======================================================
+Convierte los renders planos en algo parecido a una foto de celular:
+perspectiva, rotacion, desenfoque, ruido, brillo (glare) y recompresion JPEG.
+
+Las transformaciones geometricas se combinan en una sola homografia por
+muestra y se aplican a todo el lote con NumPy (un solo muestreo bilineal
+para N imagenes). Las muestras desenfocadas se muestrean a media resolucion
+(sobre el original reducido 2x2) y se vuelven a ampliar: la ampliacion
+bilineal es el desenfoque de radio 1 y el de radio 2 suma una caja de 3x3 a
+media resolucion, con un cuarto de los pixeles. Glare y ruido operan sobre
+el lote completo, en enteros (uint16/int16) y sobre pixeles RGBX de 4 bytes
+contiguos; el ruido sale de unos pocos campos precalculados, desplazados y
+escalados por muestra. La recompresion JPEG es por imagen y no toca el
+lote: recomprimir_jpeg() la hace el pool de codificacion del generador, en
+paralelo con el lote siguiente (o es la propia escritura si la salida es
+JPEG). Los parametros de cada muestra salen de su propio RNG derivado de
+(seed, indice, cara), asi que el resultado no depende de como se agrupen
+los lotes, y se devuelven para registrarlos junto a la muestra.
+"""
+
+from functools import lru_cache
+import io
+
+import numpy as np
+from PIL import Image
+
+# Identificador numerico de cada cara para derivar RNG independientes
+CARAS = {'frente': 0, 'reverso': 1}
+
+
+def rng_aumentacion(seed, index, cara):
+    """RNG de NumPy propio de una cara de un indice"""
+    if seed is None:
+        return np.random.default_rng()
+    return np.random.default_rng([seed, index, CARAS[cara]])
+
+
+def muestrear_parametros(rng, width, height):
+    """Sortea los parametros de aumentacion de una muestra"""
+    escala = rng.uniform(0.80, 0.92)
+    jitter = rng.uniform(-0.04, 0.04, size=(4, 2)) * (width, height)
+    glare = rng.random() < 0.5
+    return {
+        'rotacion_grados': float(rng.uniform(-7, 7)),
+        'escala': float(escala),
+        'desplazamiento': [float(v) for v in rng.uniform(-0.03, 0.03, size=2) * (width, height)],
+        'perspectiva': jitter.round(2).tolist(),
+        'fondo': int(rng.integers(30, 140)),
+        'desenfoque_radio': int(rng.choice([0, 1, 1, 2])),
+        'ruido_sigma': float(rng.uniform(2, 12)),
+        'semilla_ruido': int(rng.integers(2 ** 63)),
+        'glare': {
+            'centro': [float(rng.uniform(0, width)), float(rng.uniform(0, height))],
+            'radio': float(rng.uniform(0.15, 0.45) * width),
+            'intensidad': float(rng.uniform(0.2, 0.6)) if glare else 0.0,
+        },
+        'jpeg_quality': int(rng.integers(45, 90)),
+    }
+
+
+def _esquinas_destino(params, width, height):
+    """Esquinas de la tarjeta en la foto: rotada, escalada, desplazada y con perspectiva"""
+    esquinas = np.array([[0, 0], [width, 0], [width, height], [0, height]], dtype=np.float64)
+    centro = np.array([width / 2, height / 2])
+    theta = np.deg2rad(params['rotacion_grados'])
+    rot = np.array([[np.cos(theta), -np.sin(theta)], [np.sin(theta), np.cos(theta)]])
+    destino = (esquinas - centro) @ rot.T * params['escala'] + centro
+    return destino + params['desplazamiento'] + np.array(params['perspectiva'])
+
+
+def homografias(origen, destino):
+    """Resuelve en lote las homografias (N, 3, 3) que llevan `origen` a `destino` (N, 4, 2)"""
+    n = len(origen)
+    x, y = origen[..., 0], origen[..., 1]
+    u, v = destino[..., 0], destino[..., 1]
+    a = np.zeros((n, 8, 8))
+    a[:, 0::2, 0], a[:, 0::2, 1], a[:, 0::2, 2] = x, y, 1
+    a[:, 0::2, 6], a[:, 0::2, 7] = -x * u, -y * u
+    a[:, 1::2, 3], a[:, 1::2, 4], a[:, 1::2, 5] = x, y, 1
+    a[:, 1::2, 6], a[:, 1::2, 7] = -x * v, -y * v
+    b = np.empty((n, 8))
+    b[:, 0::2], b[:, 1::2] = u, v
+    h = np.linalg.solve(a, b[..., None])[..., 0]
+    return np.concatenate([h, np.ones((n, 1))], axis=1).reshape(n, 3, 3)
+
+
+def aplicar_homografia(h, puntos):
+    """Transforma puntos (K, 2) con una homografia (3, 3)"""
+    pts = np.hstack([np.asarray(puntos, dtype=np.float64), np.ones((len(puntos), 1))]) @ h.T
+    return pts[:, :2] / pts[:, 2:]
+
+
+@lru_cache(maxsize=4)
+def _malla(height, width):
+    ys, xs = np.mgrid[0:height, 0:width].astype(np.float32)
+    return np.stack([xs.ravel(), ys.ravel(), np.ones(height * width, dtype=np.float32)])
+
+
+def _empaquetar(rgbx):
+    """Vista uint32 (N, H, W) de un lote RGBX, un pixel por elemento"""
+    n, height, width, _ = rgbx.shape
+    return np.ascontiguousarray(rgbx).reshape(-1).view(np.uint32).reshape(n, height, width)
+
+
+def _desempaquetar(empaquetado):
+    """Inversa de _empaquetar: lote RGBX (N, H, W, 4) sobre los mismos bytes"""
+    n, height, width = empaquetado.shape
+    return empaquetado.reshape(-1).view(np.uint8).reshape(n, height, width, 4)
+
+
+# Mascara de los canales R y B de un pixel empaquetado 0x00BBGGRR
+_MASCARA_RB = np.uint32(0x00FF00FF)
+
+
+def _lerp_empaquetado(a, b, peso):
+    """Interpola pixeles empaquetados en uint32 (SWAR: R y B juntos, luego G)"""
+    inverso = 256 - peso
+    rb = (((a & _MASCARA_RB) * inverso + (b & _MASCARA_RB) * peso) >> 8) & _MASCARA_RB
+    g = ((((a >> 8) & _MASCARA_RB) * inverso + ((b >> 8) & _MASCARA_RB) * peso)) & ~_MASCARA_RB
+    return rb | g
+
+
+# Bits de cada byte salvo el mas bajo, para que >> 1 no cruce de un canal a otro
+_MASCARA_MEDIA = np.uint32(0xFEFEFEFE)
+
+
+def _media_empaquetada(a, b, arriba=False):
+    """Promedio por canal de pixeles empaquetados, redondeando hacia abajo (o hacia arriba)"""
+    mitad = ((a ^ b) & _MASCARA_MEDIA) >> 1
+    return (a | b) - mitad if arriba else (a & b) + mitad
+
+
+# Elementos procesados por bloque de filas en el warp (mantiene los temporales en cache)
+ELEMENTOS_POR_BLOQUE = 1 << 17
+
+
+def _warp(rgbx, inversas, fondos, height, width):
+    """Muestreo bilineal de todo el lote con las homografias inversas.
+
+    Cada pixel RGBX (N, h, w, 4) del origen es un uint32 para que cada vecino
+    sea un solo `np.take`, y la mezcla se hace en punto fijo (pesos de 8 bits)
+    sobre los enteros empaquetados. Las coordenadas de origen se pasan a punto
+    fijo 8.8: la parte entera es el vecino y los 8 bits bajos el peso. Se
+    recorre por bloques de filas de todo el lote. Devuelve el lote RGBX
+    (N, height, width, 4) contiguo; el cuarto byte no se usa.
+    """
+    n, alto_origen, ancho_origen, _ = rgbx.shape
+    empaquetado = _empaquetar(rgbx).reshape(-1)
+
+    malla = _malla(height, width)
+    inversas = inversas.astype(np.float32)
+    base = np.arange(n, dtype=np.intp)[:, None] * (alto_origen * ancho_origen)
+    fondo = (fondos.astype(np.uint32) * np.uint32(0x010101))[:, None]
+    salida = np.empty((n, height * width), dtype=np.uint32)
+    # Ultima coordenada 8.8 con los cuatro vecinos dentro de la imagen
+    max_x = np.float32(256 * (ancho_origen - 1) - 1)
+    max_y = np.float32(256 * (alto_origen - 1) - 1)
+
+    filas = max(1, ELEMENTOS_POR_BLOQUE // (n * width))
+    for y in range(0, height, filas):
+        bloque = slice(y * width, min(height, y + filas) * width)
+        src = inversas @ malla[:, bloque]
+        w = 256 / src[:, 2]
+        sx = src[:, 0]
+        sx *= w
+        sy = src[:, 1]
+        sy *= w
+        fuera = (sx < 0) | (sx > max_x) | (sy < 0) | (sy > max_y)
+
+        fx = np.clip(sx, 0, max_x).astype(np.int32)
+        fy = np.clip(sy, 0, max_y).astype(np.int32)
+        wx = (fx & 255).view(np.uint32)
+        wy = (fy & 255).view(np.uint32)
+        fx >>= 8
+        fy >>= 8
+        i00 = fy.astype(np.intp)
+        i00 *= ancho_origen
+        i00 += fx
+        i00 += base
+
+        arriba = _lerp_empaquetado(np.take(empaquetado, i00), np.take(empaquetado, i00 + 1), wx)
+        i00 += ancho_origen
+        abajo = _lerp_empaquetado(np.take(empaquetado, i00), np.take(empaquetado, i00 + 1), wx)
+        salida[:, bloque] = np.where(fuera, fondo, _lerp_empaquetado(arriba, abajo, wy))
+
+    return salida.view(np.uint8).reshape(n, height, width, 4)
+
+
+def _reducir(rgbx):
+    """Promedio de cada bloque de 2x2 pixeles de un lote RGBX (H y W pares).
+
+    Promedia por filas redondeando hacia abajo y luego entre filas hacia
+    arriba, asi el redondeo no oscurece la imagen.
+    """
+    p = _empaquetar(rgbx)
+    arriba = _media_empaquetada(p[:, 0::2, 0::2], p[:, 0::2, 1::2])
+    abajo = _media_empaquetada(p[:, 1::2, 0::2], p[:, 1::2, 1::2])
+    return _desempaquetar(_media_empaquetada(arriba, abajo, arriba=True))
+
+
+def _ampliar(rgbx):
+    """Duplica alto y ancho de un lote RGBX con interpolacion bilineal.
+
+    Cada pixel de salida cae a un cuarto de pixel de uno de entrada: pesos 3/4
+    y 1/4 con su vecino por eje, como la media del pixel con la media de ambos
+    (redondeos alternados), sobre los pixeles empaquetados y por bloques de
+    filas como el warp.
+    """
+    def tres_cuartos(centro, vecina, arriba):
+        return _media_empaquetada(centro, _media_empaquetada(centro, vecina, not arriba), arriba)
+
+    n, height, width, _ = rgbx.shape
+    p = _empaquetar(np.pad(rgbx, [(0, 0), (1, 1), (1, 1), (0, 0)], mode='edge'))
+    salida = np.empty((n, height, 2, width, 2), dtype=np.uint32)
+    filas = max(1, ELEMENTOS_POR_BLOQUE // (4 * n * width))
+    for y in range(0, height, filas):
+        hasta = min(height, y + filas)
+        centro = p[:, y + 1:hasta + 1]
+        for k, vecina in enumerate((p[:, y:hasta], p[:, y + 2:hasta + 2])):
+            fila = tres_cuartos(centro, vecina, True)
+            medio = fila[:, :, 1:-1]
+            salida[:, y:hasta, k, :, 0] = tres_cuartos(medio, fila[:, :, :-2], False)
+            salida[:, y:hasta, k, :, 1] = tres_cuartos(medio, fila[:, :, 2:], False)
+    return _desempaquetar(salida.reshape(n, 2 * height, 2 * width))
+
+
+# Homografias entre pixeles de resolucion completa y de media resolucion
+# (centro de un pixel chico = centro de su bloque de 2x2)
+_A_MEDIA = np.array([[0.5, 0, -0.25], [0, 0.5, -0.25], [0, 0, 1]])
+_DESDE_MEDIA = np.linalg.inv(_A_MEDIA)
+
+
+def _warp_media_resolucion(rgbx, inversas, fondos, radios, height, width):
+    """Warp de las muestras desenfocadas a media resolucion, ampliado a (height, width) pares.
+
+    La ampliacion bilineal equivale al desenfoque de radio 1; el radio 2 suma
+    una caja de 3x3 a media resolucion antes de ampliar.
+    """
+    alto, ancho = height // 2, width // 2
+    inversas = _A_MEDIA @ inversas @ _DESDE_MEDIA
+    chico = _warp(_reducir(rgbx), inversas, fondos, alto, ancho)
+    mas = radios > 1
+    if mas.any():
+        chico[mas] = _box_blur(chico[mas], 1)
+    return _ampliar(chico)
+
+
+def _box_blur(lote, radio):
+    """Desenfoque de caja separable sobre (N, H, W, C) en uint16.
+
+    Suma vistas desplazadas del lote con borde extendido, primero en vertical y
+    luego en horizontal (a lo sumo 25 * 255, cabe en uint16), y divide una sola
+    vez por el area de la caja.
+    """
+    _, height, width, _ = lote.shape
+    k = 2 * radio + 1
+    ext = np.pad(lote, [(0, 0), (radio, radio), (radio, radio), (0, 0)], mode='edge')
+    columnas = ext[:, :height].astype(np.uint16)
+    for d in range(1, k):
+        columnas += ext[:, d:d + height]
+    suma = columnas[:, :, :width].copy()
+    for d in range(1, k):
+        suma += columnas[:, :, d:d + width]
+    suma //= k * k
+    return suma.astype(np.uint8)
+
+
+# Bits de los pesos de glare en punto fijo (los de _lerp_empaquetado)
+BITS_GLARE = 8
+
+# Pixel empaquetado hacia el que tira el glare
+_BLANCO = np.uint32(0x00FFFFFF)
+
+# Ruido: suma de bytes uniformes, su desvio estandar y los bits del factor de escala
+# (con sigma <= 12 el producto cabe en int16)
+RUIDO_TERMINOS = 4
+RUIDO_DESVIO = (RUIDO_TERMINOS * (256 ** 2 - 1) / 12) ** 0.5
+BITS_RUIDO = 9
+
+
+# Campos de ruido precalculados por tamano; cada muestra usa uno desplazado
+RUIDO_CAMPOS = 4
+
+
+def _bytes_aleatorios(semilla, forma):
+    """Bytes uniformes tomados de la salida cruda del generador (mas barato que integers)"""
+    total = int(np.prod(forma))
+    crudos = np.random.default_rng(semilla).bit_generator.random_raw(-(-total // 8))
+    return crudos.view(np.uint8)[:total].reshape(forma)
+
+
+@lru_cache(maxsize=4)
+def _campos_ruido(height, width):
+    """RUIDO_CAMPOS campos (aplanados) de suma de RUIDO_TERMINOS bytes uniformes, centrados, en int16"""
+    bytes_ = _bytes_aleatorios([height, width], (RUIDO_TERMINOS, RUIDO_CAMPOS, height * width))
+    suma = bytes_[0].astype(np.int16)
+    for termino in bytes_[1:]:
+        suma += termino
+    suma -= RUIDO_TERMINOS * 255 // 2
+    suma.flags.writeable = False
+    return suma
+
+
+def _fotometria(lote, params):
+    """Glare radial y ruido de luminancia por muestra, por bloques de filas.
+
+    El glare gaussiano es separable: se calcula un factor por columna y otro por
+    fila (con la intensidad) en punto fijo y su producto da el peso de cada
+    pixel, sin un exp por pixel; la mezcla hacia blanco es sobre los pixeles
+    empaquetados. El ruido es la suma de RUIDO_TERMINOS bytes uniformes
+    (Irwin-Hall, casi normal) reescalada a `ruido_sigma` y sumada en int16;
+    `semilla_ruido` elige uno de los campos precalculados y su desplazamiento
+    circular, asi cada muestra solo copia y escala.
+    """
+    n, height, width, _ = lote.shape
+    uno = 1 << BITS_GLARE
+
+    def columna(valores):
+        return np.array(valores, dtype=np.float32)[:, None]
+
+    cx = columna([p['glare']['centro'][0] for p in params])
+    cy = columna([p['glare']['centro'][1] for p in params])
+    escala = columna([-1 / (2 * p['glare']['radio'] ** 2) for p in params])
+    intensidad = columna([p['glare']['intensidad'] for p in params])
+
+    gx = np.rint(np.exp((np.arange(width, dtype=np.float32) - cx) ** 2 * escala) * uno).astype(np.uint32)
+    gy = np.rint(intensidad * np.exp((np.arange(height, dtype=np.float32) - cy) ** 2 * escala) * uno)
+    gx, gy = gx[:, None, :], gy.astype(np.uint32)[:, :, None]
+
+    # Ruido de luminancia del sensor (un canal, igual en R, G y B)
+    campos = _campos_ruido(height, width)
+    ruido = np.empty((n, height * width), dtype=np.int16)
+    for i, p in enumerate(params):
+        campo, desplazamiento = divmod(p['semilla_ruido'] % (RUIDO_CAMPOS * height * width), height * width)
+        suma = ruido[i]
+        suma[:desplazamiento] = campos[campo, -desplazamiento:] if desplazamiento else ()
+        suma[desplazamiento:] = campos[campo, :height * width - desplazamiento]
+        suma *= round(p['ruido_sigma'] / RUIDO_DESVIO * (1 << BITS_RUIDO))
+        suma += 1 << (BITS_RUIDO - 1)
+        suma >>= BITS_RUIDO
+    ruido = ruido.reshape(n, height, width)
+
+    empaquetado = _empaquetar(lote)
+    salida = np.empty_like(lote)
+    filas = max(1, ELEMENTOS_POR_BLOQUE // (n * width))
+    for y in range(0, height, filas):
+        bloque = slice(y, min(height, y + filas))
+        peso = gy[:, bloque] * gx
+        peso >>= BITS_GLARE
+        x = _desempaquetar(_lerp_empaquetado(empaquetado[:, bloque], _BLANCO, peso)).astype(np.int16)
+        x += ruido[:, bloque, :, None]
+        np.clip(x, 0, 255, out=x)
+        salida[:, bloque] = x
+    return salida
+
+
+def recomprimir_jpeg(img, quality):
+    """Ida y vuelta por JPEG con la calidad sorteada (`jpeg_quality`); devuelve RGB"""
+    buffer = io.BytesIO()
+    img.save(buffer, 'JPEG', quality=quality)
+    buffer.seek(0)
+    return Image.open(buffer).convert('RGB')
+
+
+def aumentar_lote(imagenes, params):
+    """Aplica la aumentacion a un lote de imagenes RGB del mismo tamano.
+
+    `params` es la lista de parametros por muestra (ver muestrear_parametros);
+    el ruido se genera con `semilla_ruido` de cada muestra. Devuelve
+    (imagenes aumentadas, homografias directas (N, 3, 3)). Las imagenes son
+    RGBX sobre el lote y todavia sin la recompresion JPEG: falta pasar cada
+    una por recomprimir_jpeg() con su `jpeg_quality`, o guardarla como JPEG
+    con esa calidad. Los desenfoques de radio 1 y 2 se aproximan muestreando
+    a media resolucion (ver _warp_media_resolucion) cuando alto y ancho son
+    pares.
+    """
+    rgbx = np.stack([np.asarray(img.convert('RGBX')) for img in imagenes])
+    n, height, width, _ = rgbx.shape
+
+    origen = np.broadcast_to(
+        np.array([[0, 0], [width, 0], [width, height], [0, height]], dtype=np.float64), (n, 4, 2))
+    destino = np.stack([_esquinas_destino(p, width, height) for p in params])
+    directas = homografias(origen, destino)
+    fondos = np.array([p['fondo'] for p in params])
+
+    inversas = np.linalg.inv(directas)
+
+    radios = np.array([p['desenfoque_radio'] for p in params])
+    desenfocadas = radios > 0
+    if height % 2 or width % 2:
+        # Sin media resolucion exacta: warp completo y caja del radio sorteado
+        salida = _warp(rgbx, inversas, fondos, height, width)
+        for radio in set(radios.tolist()) - {0}:
+            sel = radios == radio
+            salida[sel] = _box_blur(salida[sel], radio)
+    elif not desenfocadas.any():
+        salida = _warp(rgbx, inversas, fondos, height, width)
+    else:
+        salida = np.empty_like(rgbx)
+        salida[desenfocadas] = _warp_media_resolucion(rgbx[desenfocadas], inversas[desenfocadas],
+                                                      fondos[desenfocadas], radios[desenfocadas], height, width)
+        nitidas = ~desenfocadas
+        if nitidas.any():
+            salida[nitidas] = _warp(rgbx[nitidas], inversas[nitidas], fondos[nitidas], height, width)
+
+    salida = _fotometria(salida, params)
+    aumentadas = [Image.frombuffer('RGBX', (width, height), arr, 'raw', 'RGBX', 0, 1) for arr in salida]
+    return aumentadas, directas
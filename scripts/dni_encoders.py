@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Codificadores de salida y escritura en hilos para el generador de DNI
+====================================================================
+Permite elegir el formato de las imagenes generadas (PNG con nivel de
+compresion, JPEG o WebP con calidad, o RGB crudo) y saca la codificacion y la
+escritura a disco del hilo de renderizado. Pillow libera el GIL mientras
+codifica, asi que un pool de hilos pequeno solapa la codificacion con el
+dibujo de la siguiente tarjeta.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import io
+import threading
+
+FORMATOS = {
+    'png': '.png',
+    'jpeg': '.jpg',
+    'webp': '.webp',
+    'raw': '.rgb',
+}
+
+
+class Encoder:
+    """Codifica imagenes PIL en el formato y con los parametros elegidos"""
+
+    def __init__(self, formato='png', compress_level=6, quality=90):
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato no soportado: {formato} (opciones: {', '.join(FORMATOS)})")
+        self.formato = formato
+        self.compress_level = compress_level
+        self.quality = quality
+
+    @property
+    def extension(self):
+        return FORMATOS[self.formato]
+
+    def settings(self):
+        """Parametros que afectan los bytes de salida"""
+        if self.formato == 'png':
+            return {'formato': 'png', 'compress_level': self.compress_level}
+        if self.formato in ('jpeg', 'webp'):
+            return {'formato': self.formato, 'quality': self.quality}
+        return {'formato': 'raw'}
+
+    def encode(self, img):
+        """Devuelve los bytes codificados de la imagen"""
+        if self.formato == 'raw':
+            return img.tobytes()
+        buffer = io.BytesIO()
+        self._save(img, buffer)
+        return buffer.getvalue()
+
+    def save(self, img, filename):
+        """Codifica y escribe la imagen en `filename`"""
+        if self.formato == 'raw':
+            with open(filename, 'wb') as f:
+                f.write(img.tobytes())
+            return
+        self._save(img, filename)
+
+    def _save(self, img, destino):
+        if self.formato == 'png':
+            img.save(destino, 'PNG', compress_level=self.compress_level)
+        elif self.formato == 'jpeg':
+            img.save(destino, 'JPEG', quality=self.quality, optimize=False)
+        else:
+            img.save(destino, 'WEBP', quality=self.quality, method=0)
+
+
+class EscritorAsincrono:
+    """Pool de hilos acotado: `submit` bloquea si ya hay `max_pendientes` tareas en vuelo"""
+
+    def __init__(self, hilos=2, max_pendientes=None):
+        self._executor = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix='encoder')
+        self._cupos = threading.BoundedSemaphore(max_pendientes or hilos * 2)
+
+    def submit(self, fn, *args):
+        self._cupos.acquire()
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._cupos.release()
+            raise
+        future.add_done_callback(lambda _: self._cupos.release())
+        return future
+
+    def close(self):
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Layouts declarativos de DNI y su compilacion a planes de render
+===============================================================
+Cada cara de un DNI se describe como datos: tamano, color de fondo,
+decoraciones estaticas (bandas, recuadros, etiquetas) y campos variables
+(clave en `data`, posicion, fuente y color). `plan_layout(nombre)` compila
+cada cara una sola vez por proceso en un PlanCara:
+
+- las fuentes quedan resueltas y cacheadas,
+- toda la capa estatica (incluidas las etiquetas, ya medidas y ancladas)
+  queda pintada en una imagen base,
+- el render por tarjeta solo copia la base y dibuja los valores.
+
+Para corridas grandes, `render_en_lienzo` dibuja sobre un lienzo reutilizado
+de un pool por cara (se resetea con un paste in-place de la base) en lugar de
+crear una imagen nueva por tarjeta; el lienzo vuelve al pool con `liberar`.
+
+Agregar una variante (p. ej. el DNI electronico) es agregar una entrada a
+LAYOUTS, sin copiar funciones de dibujo.
+
+Tipos de decoracion: 'rect' (caja, fill, outline, width, radio) y 'texto'
+(xy, texto, fuente, familia, fill, anchor). Un campo toma su valor de
+`clave` (data[clave]), de `formato` (str.format sobre data) o de `derivado`
+(funcion registrada en DERIVADOS).
+"""
+
+from collections import deque
+from functools import lru_cache
+
+from PIL import Image, ImageDraw, ImageFont
+
+from dni_barcode import code128_imagen
+
+# Fuentes candidatas por familia, en orden de preferencia
+FUENTES = {
+    'sans': ["arial.ttf", "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"],
+    'negrita': ["arialbd.ttf", "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"],
+    'mono': ["cour.ttf", "/usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf"],
+}
+
+AZUL = (0, 51, 102)
+GRIS = (100, 100, 100)
+NEGRO = (0, 0, 0)
+
+LAYOUTS = {
+    # Diseno original del generador (DNI azul)
+    'clasico': {
+        'frente': {
+            'tamano': (856, 540),
+            'fondo': (240, 248, 255),
+            'decoraciones': [
+                {'tipo': 'rect', 'caja': [0, 0, 856, 80], 'fill': AZUL},
+                {'tipo': 'texto', 'xy': [428, 20], 'texto': "REPUBLICA DEL PERU", 'fuente': 24,
+                 'fill': 'white', 'anchor': 'mt'},
+                {'tipo': 'texto', 'xy': [428, 50], 'texto': "DOCUMENTO NACIONAL DE IDENTIDAD",
+                 'fuente': 14, 'fill': 'white', 'anchor': 'mt'},
+                {'tipo': 'rect', 'caja': [40, 100, 220, 320], 'fill': (200, 200, 200),
+                 'outline': GRIS, 'width': 2},
+                {'tipo': 'texto', 'xy': [130, 210], 'texto': "FOTO", 'fuente': 24, 'fill': GRIS,
+                 'anchor': 'mm'},
+                {'tipo': 'rect', 'caja': [250, 100, 816, 150], 'fill': (255, 255, 220), 'outline': AZUL},
+                {'tipo': 'texto', 'xy': [260, 105], 'texto': "DNI", 'fuente': 14, 'fill': AZUL},
+                {'tipo': 'texto', 'xy': [250, 160], 'texto': "APELLIDO PATERNO", 'fuente': 14, 'fill': GRIS},
+                {'tipo': 'texto', 'xy': [250, 205], 'texto': "APELLIDO MATERNO", 'fuente': 14, 'fill': GRIS},
+                {'tipo': 'texto', 'xy': [250, 250], 'texto': "NOMBRES", 'fuente': 14, 'fill': GRIS},
+                {'tipo': 'texto', 'xy': [250, 295], 'texto': "FECHA DE NACIMIENTO", 'fuente': 14,
+                 'fill': GRIS},
+                {'tipo': 'texto', 'xy': [250, 340], 'texto': "SEXO", 'fuente': 14, 'fill': GRIS},
+                {'tipo': 'rect', 'caja': [0, 500, 856, 540], 'fill': AZUL},
+                {'tipo': 'texto', 'xy': [428, 520],
+                 'texto': "REGISTRO NACIONAL DE IDENTIFICACION Y ESTADO CIVIL", 'fuente': 14,
+                 'fill': 'white', 'anchor': 'mm'},
+            ],
+            'campos': [
+                {'clave': 'dni', 'xy': [310, 108], 'fuente': 32, 'fill': AZUL},
+                {'clave': 'apellido_paterno', 'xy': [250, 175], 'fuente': 18, 'fill': NEGRO},
+                {'clave': 'apellido_materno', 'xy': [250, 220], 'fuente': 18, 'fill': NEGRO},
+                {'clave': 'nombres', 'xy': [250, 265], 'fuente': 18, 'fill': NEGRO},
+                {'clave': 'fecha_nacimiento', 'xy': [250, 310], 'fuente': 18, 'fill': NEGRO},
+                {'clave': 'sexo', 'xy': [250, 355], 'fuente': 18, 'fill': NEGRO},
+            ],
+        },
+        'reverso': {
+            'tamano': (856, 540),
+            'fondo': (255, 253, 245),
+            'decoraciones': [
+                {'tipo': 'rect', 'caja': [0, 0, 856, 50], 'fill': AZUL},
+                {'tipo': 'texto', 'xy': [428, 25], 'texto': "DIRECCION DOMICILIARIA", 'fuente': 20,
+                 'fill': 'white', 'anchor': 'mm'},
+                {'tipo': 'texto', 'xy': [40, 70], 'texto': "UBIGEO", 'fuente': 12, 'fill': GRIS},
+                {'tipo': 'texto', 'xy': [40, 125], 'texto': "DEPARTAMENTO", 'fuente': 12, 'fill': GRIS},
+                {'tipo': 'texto', 'xy': [40, 180], 'texto': "PROVINCIA", 'fuente': 12, 'fill': GRIS},
+                {'tipo': 'texto', 'xy': [40, 235], 'texto': "DISTRITO", 'fuente': 12, 'fill': GRIS},
+                {'tipo': 'texto', 'xy': [40, 290], 'texto': "DIRECCION", 'fuente': 12, 'fill': GRIS},
+                {'tipo': 'rect', 'caja': [40, 365, 816, 425], 'fill': 'white', 'outline': NEGRO},
+                {'tipo': 'rect', 'caja': [0, 500, 856, 540], 'fill': AZUL},
+                {'tipo': 'texto', 'xy': [428, 520], 'texto': "RENIEC", 'fuente': 20, 'fill': 'white',
+                 'anchor': 'mm'},
+            ],
+            'campos': [
+                {'clave': 'ubigeo', 'xy': [40, 85], 'fuente': 16, 'fill': NEGRO},
+                {'clave': 'departamento', 'xy': [40, 140], 'fuente': 16, 'fill': NEGRO},
+                {'clave': 'provincia', 'xy': [40, 195], 'fuente': 16, 'fill': NEGRO},
+                {'clave': 'distrito', 'xy': [40, 250], 'fuente': 16, 'fill': NEGRO},
+                {'clave': 'direccion', 'xy': [40, 305], 'fuente': 16, 'fill': NEGRO},
+            ],
+            'codigo_barras': {'clave': 'dni', 'caja': [50, 370, 806, 420]},
+        },
+    },
+
+    # DNI electronico (DNIe): CUI arriba a la derecha, chip y zona MRZ en el reverso
+    'electronico': {
+        'frente': {
+            'tamano': (856, 540),
+            'fondo': (232, 238, 236),
+            'decoraciones': [
+                {'tipo': 'rect', 'caja': [40, 20, 120, 80], 'fill': (200, 16, 46), 'radio': 10},
+                {'tipo': 'texto', 'xy': [140, 16], 'texto': "REPUBLICA DEL PERU", 'fuente': 28,
+                 'familia': 'negrita', 'fill': (60, 60, 60)},
+                {'tipo': 'texto', 'xy': [140, 52], 'texto': "REGISTRO NACIONAL DE IDENTIFICACION Y ESTADO CIVIL",
+                 'fuente': 12, 'familia': 'negrita', 'fill': GRIS},
+                {'tipo': 'texto', 'xy': [140, 68], 'texto': "DOCUMENTO NACIONAL DE IDENTIDAD",
+                 'fuente': 12, 'familia': 'negrita', 'fill': GRIS},
+                {'tipo': 'texto', 'xy': [816, 16], 'texto': "CUI", 'fuente': 14, 'fill': GRIS,
+                 'anchor': 'ra'},
+                {'tipo': 'rect', 'caja': [40, 110, 270, 400], 'fill': (190, 190, 190), 'radio': 12},
+                {'tipo': 'texto', 'xy': [155, 255], 'texto': "FOTO", 'fuente': 24, 'fill': GRIS,
+                 'anchor': 'mm'},
+                {'tipo': 'rect', 'caja': [720, 110, 800, 200], 'fill': (215, 220, 218), 'radio': 6},
+                {'tipo': 'rect', 'caja': [730, 230, 810, 270], 'fill': (200, 16, 46), 'radio': 4},
+                {'tipo': 'rect', 'caja': [730, 244, 810, 256], 'fill': 'white'},
+                {'tipo': 'texto', 'xy': [300, 100], 'texto': "Primer Apellido", 'fuente': 14,
+                 'familia': 'negrita', 'fill': (40, 70, 140)},
+                {'tipo': 'texto', 'xy': [300, 175], 'texto': "Segundo Apellido", 'fuente': 14,
+                 'familia': 'negrita', 'fill': (40, 70, 140)},
+                {'tipo': 'texto', 'xy': [300, 250], 'texto': "Prenombres", 'fuente': 14,
+                 'familia': 'negrita', 'fill': (40, 70, 140)},
+                {'tipo': 'texto', 'xy': [440, 345], 'texto': "Sexo", 'fuente': 14,
+                 'familia': 'negrita', 'fill': (40, 70, 140)},
+                {'tipo': 'texto', 'xy': [510, 345], 'texto': "Nacionalidad", 'fuente': 14,
+                 'familia': 'negrita', 'fill': (40, 70, 140)},
+                {'tipo': 'texto', 'xy': [510, 367], 'texto': "PER", 'fuente': 22,
+                 'familia': 'negrita', 'fill': (30, 30, 30)},
+                {'tipo': 'texto', 'xy': [650, 345], 'texto': "Fecha de Nacimiento", 'fuente': 14,
+                 'familia': 'negrita', 'fill': (40, 70, 140)},
+            ],
+            'campos': [
+                {'formato': "{dni}-{digito_verificacion}", 'nombre': 'dni', 'xy': [816, 36], 'fuente': 34,
+                 'fill': (30, 30, 30), 'anchor': 'ra'},
+                {'clave': 'apellido_paterno', 'xy': [300, 122], 'fuente': 24, 'familia': 'negrita',
+                 'fill': (30, 30, 30)},
+                {'clave': 'apellido_materno', 'xy': [300, 197], 'fuente': 24, 'familia': 'negrita',
+                 'fill': (30, 30, 30)},
+                {'clave': 'nombres', 'xy': [300, 272], 'fuente': 24, 'familia': 'negrita',
+                 'fill': (30, 30, 30)},
+                {'clave': 'sexo', 'xy': [440, 367], 'fuente': 22, 'familia': 'negrita',
+                 'fill': (30, 30, 30)},
+                {'clave': 'fecha_nacimiento', 'xy': [650, 367], 'fuente': 22, 'familia': 'negrita', 'fill': (30, 30, 30)},
+            ],
+        },
+        'reverso': {
+            'tamano': (856, 540),
+            'fondo': (232, 238, 236),
+            'decoraciones': [
+                {'tipo': 'rect', 'caja': [60, 15, 200, 85], 'outline': (150, 150, 150)},
+                {'tipo': 'rect', 'caja': [200, 15, 340, 85], 'outline': (150, 150, 150)},
+                {'tipo': 'rect', 'caja': [340, 15, 480, 85], 'outline': (150, 150, 150)},
+                {'tipo': 'rect', 'caja': [480, 15, 620, 85], 'outline': (150, 150, 150)},
+                {'tipo': 'texto', 'xy': [130, 50], 'texto': "Constancia de Sufragio", 'fuente': 11,
+                 'fill': (150, 150, 150), 'anchor': 'mm'},
+                {'tipo': 'texto', 'xy': [270, 50], 'texto': "Constancia de Sufragio", 'fuente': 11,
+                 'fill': (150, 150, 150), 'anchor': 'mm'},
+                {'tipo': 'texto', 'xy': [410, 50], 'texto': "Constancia de Sufragio", 'fuente': 11,
+                 'fill': (150, 150, 150), 'anchor': 'mm'},
+                {'tipo': 'texto', 'xy': [550, 50], 'texto': "Constancia de Sufragio", 'fuente': 11,
+                 'fill': (150, 150, 150), 'anchor': 'mm'},
+                {'tipo': 'rect', 'caja': [90, 170, 230, 290], 'fill': (201, 164, 84),
+                 'outline': (150, 120, 60), 'width': 2, 'radio': 16},
+                {'tipo': 'texto', 'xy': [300, 110], 'texto': "Ubigeo", 'fuente': 12,
+                 'familia': 'negrita', 'fill': GRIS},
+                {'tipo': 'texto', 'xy': [300, 150], 'texto': "Direccion", 'fuente': 12,
+                 'familia': 'negrita', 'fill': GRIS},
+                {'tipo': 'texto', 'xy': [300, 200], 'texto': "Departamento/Provincia/Distrito",
+                 'fuente': 12, 'familia': 'negrita', 'fill': GRIS},
+            ],
+            'campos': [
+                {'clave': 'ubigeo', 'xy': [380, 108], 'fuente': 16, 'familia': 'negrita', 'fill': NEGRO},
+                {'clave': 'direccion', 'xy': [300, 166], 'fuente': 18, 'familia': 'negrita', 'fill': NEGRO},
+                {'formato': "/{departamento}/{provincia}/{distrito}", 'nombre': 'ubicacion',
+                 'xy': [300, 216], 'fuente': 18, 'familia': 'negrita', 'fill': NEGRO},
+                {'derivado': 'mrz_1', 'xy': [60, 370], 'fuente': 34, 'familia': 'mono', 'fill': (40, 40, 40)},
+                {'derivado': 'mrz_2', 'xy': [60, 418], 'fuente': 34, 'familia': 'mono', 'fill': (40, 40, 40)},
+                {'derivado': 'mrz_3', 'xy': [60, 466], 'fuente': 34, 'familia': 'mono', 'fill': (40, 40, 40)},
+            ],
+            'codigo_barras': {'clave': 'dni', 'caja': [300, 270, 820, 320]},
+        },
+    },
+}
+
+
+# --- Zona de lectura mecanica (MRZ TD1, ICAO 9303) --------------------------
+
+# Caducidad fija para el MRZ sintetico (YYMMDD)
+MRZ_CADUCIDAD = '330101'
+
+
+def mrz_digito_control(texto):
+    """Digito de control ICAO: pesos 7-3-1, letras A=10..Z=35, '<'=0"""
+    total = 0
+    for i, c in enumerate(texto):
+        if c.isdigit():
+            valor = int(c)
+        elif c.isalpha():
+            valor = ord(c) - ord('A') + 10
+        else:
+            valor = 0
+        total += valor * (7, 3, 1)[i % 3]
+    return str(total % 10)
+
+
+def _mrz_nombre(texto):
+    return '<'.join(texto.split())
+
+
+@lru_cache(maxsize=4096)
+def _mrz_td1(dni, fecha_nacimiento, sexo, apellido_paterno, apellido_materno, nombres):
+    documento = dni.ljust(9, '<')
+    linea1 = ('I<PER' + documento + mrz_digito_control(documento)).ljust(30, '<')
+
+    dia, mes, anio = fecha_nacimiento.split('/')
+    nacimiento = anio[2:] + mes + dia
+    linea2 = (nacimiento + mrz_digito_control(nacimiento) + sexo
+              + MRZ_CADUCIDAD + mrz_digito_control(MRZ_CADUCIDAD) + 'PER').ljust(29, '<')
+    compuesto = linea1[5:30] + linea2[0:7] + linea2[8:15] + linea2[18:29]
+    linea2 += mrz_digito_control(compuesto)
+
+    apellidos = _mrz_nombre(apellido_paterno) + '<' + _mrz_nombre(apellido_materno)
+    linea3 = (apellidos + '<<' + _mrz_nombre(nombres)).ljust(30, '<')[:30]
+    return linea1, linea2, linea3
+
+
+def _mrz(data):
+    return _mrz_td1(data['dni'], data['fecha_nacimiento'], data['sexo'],
+                    data['apellido_paterno'], data['apellido_materno'], data['nombres'])
+
+
+DERIVADOS = {
+    'mrz_1': lambda data: _mrz(data)[0],
+    'mrz_2': lambda data: _mrz(data)[1],
+    'mrz_3': lambda data: _mrz(data)[2],
+}
+
+
+# --- Fuentes -----------------------------------------------------------------
+
+@lru_cache(maxsize=None)
+def _resolver_fuente(familia):
+    """Busca una sola vez por proceso la primera fuente TrueType disponible de la familia"""
+    for candidata in FUENTES[familia]:
+        try:
+            ImageFont.truetype(candidata, 10)
+            return candidata
+        except OSError:
+            continue
+    return None
+
+
+@lru_cache(maxsize=None)
+def get_font(size=20, familia='sans'):
+    """Obtiene fuente, usa default si no hay fuentes del sistema (cacheada por tamano)"""
+    ruta = _resolver_fuente(familia)
+    if ruta is None:
+        return ImageFont.load_default()
+    return ImageFont.truetype(ruta, size)
+
+
+# Lienzos libres que guarda cada cara compilada; los que sobran se descartan
+MAX_LIENZOS_LIBRES = 16
+
+
+# --- Compilacion -------------------------------------------------------------
+
+class PlanCara:
+    """Cara de DNI compilada: imagen base cacheada y campos con fuentes resueltas"""
+
+    def __init__(self, spec):
+        self.tamano = tuple(spec['tamano'])
+        self.fondo = self._pintar_fondo(spec)
+        self.campos = [self._compilar_campo(c) for c in spec['campos']]
+        barras = spec.get('codigo_barras')
+        self.codigo_barras = (barras['clave'], tuple(barras['caja'])) if barras else None
+        # Pool de lienzos reutilizables; deque es segura entre hilos para append/pop
+        self._libres = deque()
+
+    def _pintar_fondo(self, spec):
+        img = Image.new('RGB', self.tamano, color=tuple(spec['fondo']))
+        draw = ImageDraw.Draw(img)
+        for deco in spec['decoraciones']:
+            if deco['tipo'] == 'rect':
+                kwargs = {'fill': deco.get('fill'), 'outline': deco.get('outline'),
+                          'width': deco.get('width', 1)}
+                if deco.get('radio'):
+                    draw.rounded_rectangle(deco['caja'], radius=deco['radio'], **kwargs)
+                else:
+                    draw.rectangle(deco['caja'], **kwargs)
+            elif deco['tipo'] == 'texto':
+                draw.text(tuple(deco['xy']), deco['texto'], fill=deco['fill'],
+                          font=get_font(deco['fuente'], deco.get('familia', 'sans')),
+                          anchor=deco.get('anchor'))
+            else:
+                raise ValueError(f"Tipo de decoracion desconocido: {deco['tipo']}")
+        return img
+
+    @staticmethod
+    def _compilar_campo(campo):
+        if 'clave' in campo:
+            clave = campo['clave']
+            nombre, valor = clave, (lambda data, clave=clave: data[clave])
+        elif 'formato' in campo:
+            formato = campo['formato']
+            nombre, valor = campo['nombre'], (lambda data, formato=formato: formato.format(**data))
+        else:
+            nombre, valor = campo['derivado'], DERIVADOS[campo['derivado']]
+        font = get_font(campo['fuente'], campo.get('familia', 'sans'))
+        return nombre, valor, tuple(campo['xy']), font, campo['fill'], campo.get('anchor')
+
+    def render(self, data, cajas=None):
+        """Copia la base y dibuja los valores de `data`; llena `cajas` si se pasa un dict"""
+        img = self.fondo.copy()
+        self.dibujar_textos(img, data, cajas)
+        self.dibujar_codigo(img, data, cajas)
+        return img
+
+    def render_en_lienzo(self, data, cajas=None):
+        """Como `render`, pero sobre un lienzo del pool: devolverlo con `liberar` al terminar"""
+        img = self.lienzo()
+        self.dibujar_textos(img, data, cajas)
+        self.dibujar_codigo(img, data, cajas)
+        return img
+
+    def lienzo(self):
+        """Lienzo del pool (o nuevo) ya reseteado a la capa estatica"""
+        try:
+            img = self._libres.pop()
+            img.paste(self.fondo, (0, 0))
+        except IndexError:
+            img = self.fondo.copy()
+        return img
+
+    def liberar(self, img):
+        """Devuelve al pool un lienzo obtenido con `render_en_lienzo`"""
+        if len(self._libres) < MAX_LIENZOS_LIBRES:
+            self._libres.append(img)
+
+    def dibujar_textos(self, img, data, cajas=None):
+        """Dibuja los campos de texto variables"""
+        draw = ImageDraw.Draw(img)
+        for nombre, valor, xy, font, fill, anchor in self.campos:
+            texto = valor(data)
+            if cajas is not None:
+                cajas[nombre] = list(draw.textbbox(xy, texto, font=font, anchor=anchor))
+            draw.text(xy, texto, fill=fill, font=font, anchor=anchor)
+
+    def dibujar_codigo(self, img, data, cajas=None):
+        """Pega el codigo de barras (si la cara tiene uno)"""
+        if self.codigo_barras:
+            clave, (x0, y0, x1, y1) = self.codigo_barras
+            img.paste(code128_imagen(data[clave], x1 - x0, y1 - y0), (x0, y0))
+            if cajas is not None:
+                cajas['codigo_barras'] = [x0, y0, x1, y1]
+
+
+@lru_cache(maxsize=None)
+def plan_layout(nombre='clasico'):
+    """Compila (una vez por proceso) las caras del layout: {'frente': PlanCara, 'reverso': PlanCara}"""
+    if nombre not in LAYOUTS:
+        raise ValueError(f"Layout desconocido: {nombre} (opciones: {', '.join(LAYOUTS)})")
+    return {cara: PlanCara(spec) for cara, spec in LAYOUTS[nombre].items()}
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Manifest de ground truth para corpus sinteticos
+===============================================
+Escribe un registro por muestra mientras corre la generacion, sin acumular
+la corrida en memoria:
+
+    {"indice": 1, "seed": 42, "data": {...}, "archivos": {"frente": ..., "reverso": ...},
+     "shards": {...}, "cajas": {"frente": {"dni": [x0, y0, x1, y1], ...}, ...},
+     "aumentacion": {...}, "cajas_foto": {...}}
+
+El formato principal es JSONL. Opcionalmente se escribe tambien un Parquet
+(requiere pyarrow) por lotes de filas: los campos de `data` van como columnas
+y las estructuras anidadas como JSON.
+
+Cada registro lleva un `hash` de todo lo que determina sus bytes (version del
+generador, layout, seed, indice, encoder, aumentacion). ManifestPrevio indexa
+el manifest de la corrida anterior para regenerar solo lo que cambio.
+"""
+
+import hashlib
+import json
+import os
+
+# Filas acumuladas antes de volcar un row group al Parquet
+FILAS_POR_LOTE_PARQUET = 4096
+
+# Columnas anidadas que se guardan como texto JSON en el Parquet
+COLUMNAS_JSON = ('archivos', 'shards', 'cajas', 'aumentacion', 'cajas_foto')
+
+
+class ManifestWriter:
+    """Escribe el manifest JSONL (y opcionalmente Parquet) registro a registro"""
+
+    def __init__(self, ruta_jsonl, ruta_parquet=None):
+        self.ruta_jsonl = ruta_jsonl
+        self.ruta_parquet = ruta_parquet
+        self.total = 0
+        self._jsonl = open(ruta_jsonl, 'w', encoding='utf-8')
+        self._filas = []
+        self._parquet = None
+        if ruta_parquet:
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise SystemExit("El manifest Parquet requiere pyarrow: pip install pyarrow")
+
+    def write(self, registro):
+        self._jsonl.write(json.dumps(registro, ensure_ascii=False, separators=(',', ':')) + '\n')
+        self.total += 1
+        if self.ruta_parquet:
+            self._filas.append(_fila_plana(registro))
+            if len(self._filas) >= FILAS_POR_LOTE_PARQUET:
+                self._volcar_parquet()
+
+    def _volcar_parquet(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if not self._filas:
+            return
+        if self._parquet is None:
+            tabla = pa.Table.from_pylist(self._filas)
+            self._parquet = pq.ParquetWriter(self.ruta_parquet, tabla.schema)
+        else:
+            tabla = pa.Table.from_pylist(self._filas, schema=self._parquet.schema)
+        self._parquet.write_table(tabla)
+        self._filas = []
+
+    def close(self):
+        self._jsonl.close()
+        if self.ruta_parquet:
+            self._volcar_parquet()
+            if self._parquet is not None:
+                self._parquet.close()
+
+
+def _fila_plana(registro):
+    fila = {'indice': registro['indice'], 'seed': registro.get('seed')}
+    fila.update({k: str(v) for k, v in registro['data'].items()})
+    for columna in COLUMNAS_JSON:
+        valor = registro.get(columna)
+        fila[columna] = json.dumps(valor, separators=(',', ':')) if valor is not None else None
+    return fila
+
+
+def version_generador(rutas):
+    """Hash del codigo fuente que influye en los bytes generados"""
+    digest = hashlib.sha256()
+    for ruta in sorted(rutas):
+        digest.update(os.path.basename(ruta).encode())
+        with open(ruta, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def hash_muestra(**partes):
+    """Hash estable de los parametros que determinan una muestra"""
+    texto = json.dumps(partes, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(texto.encode()).hexdigest()
+
+
+class ManifestPrevio:
+    """Manifest de la corrida anterior, indexado por indice -> (hash, offset de la linea).
+
+    Se renombra a `<ruta>.prev` para que la corrida nueva pueda escribir el
+    manifest en la misma ruta; los registros que se saltan se copian desde ahi
+    leyendo solo su linea. Solo se guardan en memoria el hash y el offset.
+    """
+
+    def __init__(self, ruta_jsonl):
+        self.ruta = ruta_jsonl + '.prev'
+        self._indice = {}
+        self._archivo = None
+        if not os.path.exists(ruta_jsonl):
+            return
+        os.replace(ruta_jsonl, self.ruta)
+        self._archivo = open(self.ruta, 'rb')
+        offset = 0
+        for linea in self._archivo:
+            if linea.strip():
+                registro = json.loads(linea)
+                if 'hash' in registro:
+                    self._indice[registro['indice']] = (registro['hash'], offset)
+            offset += len(linea)
+
+    def __len__(self):
+        return len(self._indice)
+
+    def hash(self, indice):
+        entrada = self._indice.get(indice)
+        return entrada[0] if entrada else None
+
+    def registro(self, indice):
+        """Relee el registro completo de `indice` desde el manifest anterior"""
+        self._archivo.seek(self._indice[indice][1])
+        return json.loads(self._archivo.readline())
+
+    def close(self):
+        """Cierra y borra el manifest anterior (ya quedo copiado en el nuevo)"""
+        if self._archivo is not None:
+            self._archivo.close()
+            os.remove(self.ruta)
+            self._archivo = None
+
+
+def leer_manifest(ruta_jsonl):
+    """Itera los registros de un manifest JSONL"""
+    with open(ruta_jsonl, encoding='utf-8') as f:
+        for linea in f:
+            if linea.strip():
+                yield json.loads(linea)
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Muestreo columnar de identidades para DNI sinteticos
+====================================================
+Sortea columnas completas de identidades con NumPy (sexo, nombres, apellidos,
+fecha de nacimiento, direccion, ubigeo y numero de DNI) en bloques fijos de
+BLOQUE_MUESTREO indices, en lugar de una persona a la vez con `random`.
+
+La ubicacion sale de la tabla de ubigeos con un sorteo alias ponderado por
+poblacion (ver dni_ubigeo.py), asi ubigeo, departamento, provincia y
+distrito siempre son consistentes.
+
+Los numeros de DNI son unicos en toda la corrida: un bitset de 1 bit por
+numero del espacio de 8 digitos (~11 MiB) descarta repetidos y se vuelve a
+sortear solo lo descartado. Cada DNI lleva su digito de verificacion real
+(el que RENIEC imprime junto al numero, p. ej. 07714994-1).
+
+El muestreo corre en el proceso principal, en orden de indice: el bloque k usa
+un RNG derivado de (seed, k) y siempre se sortea completo, asi los datos de un
+indice no dependen de cuantos workers haya ni de cuantos pares se pidan.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+
+from dni_ubigeo import cargar_tabla
+
+# Datos ficticios para generar DNIs variados
+NOMBRES_MASCULINOS = [
+    "CARLOS ALBERTO", "JOSE LUIS", "MIGUEL ANGEL", "JUAN PABLO",
+    "ROBERTO CARLOS", "PEDRO ANTONIO"
+]
+
+NOMBRES_FEMENINOS = [
+    "MARIA ELENA", "ANA LUCIA", "ROSA MARIA", "CARMEN JULIA",
+    "LUCIA FERNANDA", "PATRICIA ISABEL"
+]
+
+APELLIDOS = [
+    "GARCIA", "RODRIGUEZ", "MARTINEZ", "LOPEZ", "GONZALEZ",
+    "HERNANDEZ", "PEREZ", "SANCHEZ", "RAMIREZ", "TORRES",
+    "FLORES", "RIVERA", "MORALES", "ORTIZ", "CHAVEZ",
+    "CASTILLO", "VASQUEZ", "ROJAS", "MENDOZA", "SILVA"
+]
+
+CALLES = ["AV. LARCO", "JR. PUNO", "CALLE LOS OLIVOS", "AV. AREQUIPA",
+          "JR. CUSCO", "AV. BRASIL", "CALLE LIMA", "JR. TACNA",
+          "AV. JAVIER PRADO", "CALLE SAN MARTIN"]
+
+# Fecha fija para calcular edades: asi los bytes no dependen del dia de ejecucion
+FECHA_REFERENCIA = datetime(2025, 1, 1)
+
+# Rango de numeros de DNI sorteados
+DNI_MIN, DNI_MAX = 10000000, 99999999
+
+# Indices por bloque de muestreo (cada bloque tiene su propio RNG)
+BLOQUE_MUESTREO = 4096
+
+# Digito de verificacion del DNI: pesos por posicion y tabla de resultado
+PESOS_VERIFICACION = np.array([3, 2, 7, 6, 5, 4, 3, 2], dtype=np.int64)
+TABLA_VERIFICACION = np.array([6, 7, 8, 9, 0, 1, 1, 2, 3, 4, 5], dtype=np.int64)
+
+# Etiqueta del flujo de RNG de identidades (distinto del de aumentacion)
+_FLUJO_IDENTIDADES = 2
+
+
+def digito_verificacion(dnis):
+    """Digito de verificacion de uno o varios numeros de DNI (vectorizado)"""
+    numeros = np.asarray(dnis, dtype=np.int64)
+    digitos = (numeros[..., None] // 10 ** np.arange(7, -1, -1, dtype=np.int64)) % 10
+    resto = 11 - (digitos @ PESOS_VERIFICACION) % 11
+    return TABLA_VERIFICACION[np.where(resto == 11, 0, resto)]
+
+
+class BitsetDNI:
+    """Conjunto de numeros de DNI ya usados: un bit por numero del rango"""
+
+    def __init__(self, minimo=DNI_MIN, maximo=DNI_MAX):
+        self.minimo = minimo
+        self.capacidad = maximo - minimo + 1
+        self.bits = np.zeros((self.capacidad + 7) // 8, dtype=np.uint8)
+        self.ocupados = 0
+
+    def reservar(self, candidatos):
+        """Marca los candidatos libres y devuelve la mascara de aceptados.
+
+        Se rechazan los ya usados y, dentro del mismo arreglo, las repeticiones
+        posteriores a la primera aparicion.
+        """
+        offset = np.asarray(candidatos, dtype=np.int64) - self.minimo
+        libres = ((self.bits[offset >> 3] >> (offset & 7).astype(np.uint8)) & 1) == 0
+        primeros = np.zeros(len(offset), dtype=bool)
+        primeros[np.unique(offset, return_index=True)[1]] = True
+        aceptados = libres & primeros
+        elegidos = offset[aceptados]
+        np.bitwise_or.at(self.bits, elegidos >> 3, (1 << (elegidos & 7)).astype(np.uint8))
+        self.ocupados += len(elegidos)
+        return aceptados
+
+
+@dataclass
+class LoteIdentidades:
+    """Bloque columnar de identidades: columnas NumPy alineadas por posicion"""
+    inicio: int
+    columnas: dict
+
+    def __len__(self):
+        return len(self.columnas['dni'])
+
+    def registros(self, desde=0, hasta=None):
+        """Convierte las filas [desde, hasta) al dict `data` que consume el renderizado"""
+        c = {k: v[desde:hasta].tolist() for k, v in self.columnas.items()}
+        return [
+            {
+                'dni': dni,
+                'digito_verificacion': digito,
+                'nombres': nombres,
+                'apellido_paterno': paterno,
+                'apellido_materno': materno,
+                'fecha_nacimiento': f"{dia:02d}/{mes:02d}/{anio}",
+                'sexo': sexo,
+                'departamento': departamento,
+                'provincia': provincia,
+                'distrito': distrito,
+                'direccion': f"{calle} {numero}",
+                'ubigeo': ubigeo,
+            }
+            for (dni, digito, nombres, paterno, materno, dia, mes, anio, sexo, departamento,
+                 provincia, distrito, calle, numero, ubigeo)
+            in zip(c['dni'], c['digito_verificacion'], c['nombres'], c['apellido_paterno'],
+                   c['apellido_materno'], c['dia'], c['mes'], c['anio'], c['sexo'], c['departamento'],
+                   c['provincia'], c['distrito'], c['calle'], c['numero'], c['ubigeo'])
+        ]
+
+
+class MuestreadorIdentidades:
+    """Sortea bloques columnares de identidades con DNI unicos en la corrida"""
+
+    def __init__(self, seed=None, bloque=BLOQUE_MUESTREO, tabla_ubigeo=None):
+        self.seed = seed
+        self.bloque = bloque
+        self.tabla_ubigeo = tabla_ubigeo or cargar_tabla()
+        self.bitset = BitsetDNI()
+        self._siguiente = 0
+        self._nombres = np.array(NOMBRES_MASCULINOS + NOMBRES_FEMENINOS)
+        self._apellidos = np.array(APELLIDOS)
+
+    def _rng(self, numero):
+        if self.seed is None:
+            return np.random.default_rng()
+        return np.random.default_rng([self.seed, numero, _FLUJO_IDENTIDADES])
+
+    def _dnis(self, rng, n):
+        if self.bitset.ocupados + n > self.bitset.capacidad // 2:
+            raise ValueError(f"Demasiados DNI unicos pedidos ({self.bitset.ocupados + n})")
+        dnis = np.empty(n, dtype=np.int64)
+        faltan = np.arange(n)
+        while len(faltan):
+            candidatos = rng.integers(DNI_MIN, DNI_MAX + 1, size=len(faltan))
+            aceptados = self.bitset.reservar(candidatos)
+            dnis[faltan[aceptados]] = candidatos[aceptados]
+            faltan = faltan[~aceptados]
+        return dnis
+
+    def siguiente_lote(self):
+        """Sortea el siguiente bloque completo de identidades"""
+        numero = self._siguiente
+        self._siguiente += 1
+        rng = self._rng(numero)
+        n = self.bloque
+
+        sexo = rng.integers(0, 2, size=n)  # 0 = M, 1 = F
+        n_masc, n_fem = len(NOMBRES_MASCULINOS), len(NOMBRES_FEMENINOS)
+        nombre = (rng.random(n) * np.where(sexo == 0, n_masc, n_fem)).astype(np.int64) + sexo * n_masc
+        paterno = rng.integers(0, len(APELLIDOS), size=n)
+        materno = rng.integers(0, len(APELLIDOS) - 1, size=n)
+        materno += materno >= paterno
+
+        ubicacion = self.tabla_ubigeo.columnas(self.tabla_ubigeo.muestrear(rng, n))
+        edad = rng.integers(18, 71, size=n)
+        dnis = self._dnis(rng, n)
+
+        columnas = {
+            'dni': dnis.astype('U8'),
+            'digito_verificacion': digito_verificacion(dnis).astype('U1'),
+            'nombres': self._nombres[nombre],
+            'apellido_paterno': self._apellidos[paterno],
+            'apellido_materno': self._apellidos[materno],
+            'anio': FECHA_REFERENCIA.year - edad,
+            'mes': rng.integers(1, 13, size=n),
+            'dia': rng.integers(1, 29, size=n),
+            'sexo': np.array(['M', 'F'])[sexo],
+            'departamento': ubicacion['departamento'],
+            'provincia': ubicacion['provincia'],
+            'distrito': ubicacion['distrito'],
+            'calle': np.array(CALLES)[rng.integers(0, len(CALLES), size=n)],
+            'numero': rng.integers(100, 2001, size=n),
+            'ubigeo': ubicacion['ubigeo'],
+        }
+        return LoteIdentidades(inicio=numero * n + 1, columnas=columnas)
+
+    def muestrear(self, count):
+        """Itera (indice, data) de los siguientes `count` indices (1..count en un muestreador nuevo)"""
+        entregados = 0
+        while entregados < count:
+            lote = self.siguiente_lote()
+            tomar = min(len(lote), count - entregados)
+            for desplazamiento, data in enumerate(lote.registros(0, tomar)):
+                yield lote.inicio + desplazamiento, data
+            entregados += tomar
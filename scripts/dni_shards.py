@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Shards tar con indice de offsets para corpus sinteticos
+=======================================================
+Empaqueta muchos archivos pequenos en archivos tar de tamano fijo, en lugar
+de crear cientos de miles de PNG sueltos. Junto a cada shard se escribe un
+indice JSONL con el offset y tamano de cada registro, para que un consumidor
+pueda leer cualquier registro con un solo seek sin recorrer el tar.
+
+    shard-00000.tar        <- registros (tar estandar, legible con `tar -tf`)
+    shard-00000.idx.jsonl  <- {"nombre": ..., "offset": ..., "bytes": ...} por linea
+
+Uso como consumidor:
+    for entrada in leer_indice('dni-sintetico-00000.idx.jsonl'):
+        png = leer_registro('dni-sintetico-00000.tar', entrada)
+"""
+
+import io
+import json
+import os
+import tarfile
+
+BLOQUE_TAR = tarfile.BLOCKSIZE
+# Al cerrar, tarfile agrega dos bloques vacios y rellena hasta un RECORDSIZE
+CIERRE_TAR = tarfile.RECORDSIZE
+
+
+class ShardWriter:
+    """Escribe registros en shards tar rotando al superar `max_bytes`"""
+
+    def __init__(self, output_dir, prefijo, max_bytes):
+        self.output_dir = output_dir
+        self.prefijo = prefijo
+        self.max_bytes = max_bytes
+        self.shards = []
+        self._tar = None
+        self._indice = None
+        self._registros_en_shard = 0
+
+    def _ruta(self, numero, extension):
+        return os.path.join(self.output_dir, f'{self.prefijo}-{numero:05d}.{extension}')
+
+    def _abrir_siguiente(self):
+        self._cerrar_actual()
+        numero = len(self.shards)
+        ruta_tar = self._ruta(numero, 'tar')
+        self._tar = tarfile.open(ruta_tar, 'w', format=tarfile.GNU_FORMAT)
+        self._indice = open(self._ruta(numero, 'idx.jsonl'), 'w', encoding='utf-8')
+        self._registros_en_shard = 0
+        self.shards.append(ruta_tar)
+
+    def _cerrar_actual(self):
+        if self._tar is not None:
+            self._tar.close()
+            self._indice.close()
+            self._tar = None
+            self._indice = None
+
+    def _tamano_en_tar(self, contenido):
+        # Cabecera + datos rellenos al siguiente bloque de 512 bytes
+        return BLOQUE_TAR + -(-len(contenido) // BLOQUE_TAR) * BLOQUE_TAR
+
+    def add(self, nombre, contenido):
+        """Agrega un registro y devuelve su ubicacion {shard, offset, bytes}"""
+        if self._tar is None:
+            self._abrir_siguiente()
+        elif (self._registros_en_shard > 0
+              and self._tar.offset + self._tamano_en_tar(contenido) + CIERRE_TAR > self.max_bytes):
+            self._abrir_siguiente()
+
+        info = tarfile.TarInfo(nombre)
+        info.size = len(contenido)
+        info.mode = 0o644
+        info.mtime = 0  # fijo para que los shards sean reproducibles
+        self._tar.addfile(info, io.BytesIO(contenido))
+
+        # Tras addfile el offset queda al final de los datos rellenados
+        offset = self._tar.offset - -(-len(contenido) // BLOQUE_TAR) * BLOQUE_TAR
+        ubicacion = {
+            'shard': os.path.basename(self.shards[-1]),
+            'nombre': nombre,
+            'offset': offset,
+            'bytes': len(contenido),
+        }
+        self._indice.write(json.dumps(ubicacion) + '\n')
+        self._registros_en_shard += 1
+        return ubicacion
+
+    def close(self):
+        self._cerrar_actual()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def leer_indice(ruta_indice):
+    """Itera las entradas del indice de un shard sin cargarlo completo"""
+    with open(ruta_indice, encoding='utf-8') as f:
+        for linea in f:
+            if linea.strip():
+                yield json.loads(linea)
+
+
+def leer_registro(ruta_shard, entrada):
+    """Lee un registro del shard con un seek directo a su offset"""
+    with open(ruta_shard, 'rb') as f:
+        f.seek(entrada['offset'])
+        return f.read(entrada['bytes'])
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Tabla de ubigeos y muestreo ponderado por poblacion
+===================================================
+Carga una tabla INEI de distritos (ubigeo, departamento, provincia, distrito,
+poblacion) una sola vez en arreglos compactos: el codigo como texto de 6
+caracteres y los nombres como indices a listas de categorias. Sobre los pesos
+de poblacion se arma una tabla alias de Vose, asi cada sorteo de una tupla
+consistente (ubigeo, departamento, provincia, distrito) es O(1), tanto en
+lote con NumPy como de a uno con `random`.
+
+La tabla incluida (dni_ubigeo.csv) tiene los 1893 distritos con codigo INEI
+vigente, nombres en mayusculas sin tildes. La poblacion es la del Censo 2017
+para las capitales de departamento, Lima Metropolitana, el Callao y los
+distritos urbanos principales de Arequipa, Cusco, Trujillo y Piura
+(estimada = 0). En el resto (estimada = 1) es lo que queda de la poblacion
+censada del departamento repartido en partes iguales entre esos distritos,
+asi que cada departamento pesa lo que dice el censo pero el peso de cada
+distrito es, en su gran mayoria (1795 de 1893), una estimacion y no el censo.
+
+Con --ubigeo-csv se reemplaza por otro CSV, por ejemplo el de INEI con la
+poblacion de cada distrito (se aceptan columnas en cualquier orden y
+mayusculas; sin columna de poblacion el peso es uniforme). La poblacion
+admite separadores de miles ("1,038,495" o "1 038 495"); un valor que no
+se puede leer es un ValueError con la fila.
+"""
+
+import csv
+import hashlib
+from functools import lru_cache
+import math
+import os
+
+import numpy as np
+
+UBIGEO_CSV = os.path.join(os.path.dirname(__file__), 'dni_ubigeo.csv')
+
+COLUMNAS = ('ubigeo', 'departamento', 'provincia', 'distrito')
+COLUMNAS_POBLACION = ('poblacion', 'poblacion_2017', 'habitantes')
+
+
+def tabla_alias(pesos):
+    """Tabla alias de Vose: (probabilidad, alias) para sorteos O(1)"""
+    pesos = np.asarray(pesos, dtype=np.float64)
+    n = len(pesos)
+    escalados = pesos * n / pesos.sum()
+    probabilidad = np.ones(n)
+    alias = np.arange(n)
+    pequenos = [i for i in range(n) if escalados[i] < 1]
+    grandes = [i for i in range(n) if escalados[i] >= 1]
+    while pequenos and grandes:
+        menor, mayor = pequenos.pop(), grandes.pop()
+        probabilidad[menor] = escalados[menor]
+        alias[menor] = mayor
+        escalados[mayor] -= 1 - escalados[menor]
+        (pequenos if escalados[mayor] < 1 else grandes).append(mayor)
+    return probabilidad, alias
+
+
+def _categorias(valores):
+    """Codifica una columna de texto como (nombres, indices uint16)"""
+    nombres = sorted(set(valores))
+    posicion = {v: i for i, v in enumerate(nombres)}
+    return nombres, np.array([posicion[v] for v in valores], dtype=np.uint16)
+
+
+class TablaUbigeo:
+    """Distritos de la tabla como columnas compactas mas su tabla alias"""
+
+    def __init__(self, filas, huella):
+        self.huella = huella
+        self.ubigeos = np.array([f[0] for f in filas], dtype='U6')
+        self.departamentos, self._departamento = _categorias([f[1] for f in filas])
+        self.provincias, self._provincia = _categorias([f[2] for f in filas])
+        self.distritos, self._distrito = _categorias([f[3] for f in filas])
+        self.poblacion = np.array([f[4] for f in filas], dtype=np.float64)
+        self._probabilidad, self._alias = tabla_alias(self.poblacion)
+        # Copias en listas para el camino escalar (evita escalares NumPy)
+        self._probabilidad_lista = self._probabilidad.tolist()
+        self._alias_lista = self._alias.tolist()
+
+    def __len__(self):
+        return len(self.ubigeos)
+
+    def muestrear(self, rng, n):
+        """Sortea `n` filas (indices) con un Generator de NumPy"""
+        columna = rng.integers(0, len(self), size=n)
+        return np.where(rng.random(n) < self._probabilidad[columna], columna, self._alias[columna])
+
+    def muestrear_uno(self, rng):
+        """Sortea una fila (indice) con un random.Random"""
+        columna = rng.randrange(len(self))
+        return columna if rng.random() < self._probabilidad_lista[columna] else self._alias_lista[columna]
+
+    def columnas(self, filas):
+        """Columnas ubigeo, departamento, provincia y distrito de las filas elegidas"""
+        return {
+            'ubigeo': self.ubigeos[filas],
+            'departamento': np.array(self.departamentos)[self._departamento[filas]],
+            'provincia': np.array(self.provincias)[self._provincia[filas]],
+            'distrito': np.array(self.distritos)[self._distrito[filas]],
+        }
+
+    def fila(self, i):
+        """Tupla (ubigeo, departamento, provincia, distrito) de una fila"""
+        return (str(self.ubigeos[i]), self.departamentos[self._departamento[i]],
+                self.provincias[self._provincia[i]], self.distritos[self._distrito[i]])
+
+
+def _poblacion(texto, ruta, linea):
+    """Poblacion de una fila: sin separadores de miles, vacia = 0"""
+    limpio = texto.strip().replace(',', '').replace(' ', '').replace('\u00a0', '')
+    try:
+        poblacion = float(limpio or 0)
+    except ValueError:
+        poblacion = None
+    if poblacion is None or not math.isfinite(poblacion) or poblacion < 0:
+        raise ValueError(f"{ruta}, linea {linea}: poblacion invalida {texto!r}")
+    return poblacion
+
+
+def _leer_csv(ruta):
+    with open(ruta, encoding='utf-8-sig', newline='') as f:
+        lector = csv.DictReader(f)
+        campos = {c.strip().lower(): c for c in lector.fieldnames or []}
+        faltan = [c for c in COLUMNAS if c not in campos]
+        if faltan:
+            raise ValueError(f"{ruta}: faltan columnas {', '.join(faltan)}")
+        columna_poblacion = next((campos[c] for c in COLUMNAS_POBLACION if c in campos), None)
+
+        filas = []
+        for registro in lector:
+            ubigeo = registro[campos['ubigeo']].strip().zfill(6)
+            if len(ubigeo) != 6 or ubigeo.endswith('00'):
+                continue  # filas de departamento o provincia
+            poblacion = (_poblacion(registro[columna_poblacion] or '', ruta, lector.line_num)
+                         if columna_poblacion else 1.0)
+            filas.append((ubigeo, *(registro[campos[c]].strip().upper() for c in COLUMNAS[1:]),
+                          max(poblacion, 1.0)))
+    if not filas:
+        raise ValueError(f"{ruta}: la tabla de ubigeos esta vacia")
+    return filas
+
+
+def cargar_tabla(ruta=None):
+    """Carga (una vez por proceso) la tabla de ubigeos; sin ruta usa la incluida"""
+    return _cargar_tabla(os.path.abspath(ruta or UBIGEO_CSV))
+
+
+@lru_cache(maxsize=None)
+def _cargar_tabla(ruta):
+    with open(ruta, 'rb') as f:
+        huella = hashlib.sha256(f.read()).hexdigest()[:16]
+    return TablaUbigeo(_leer_csv(ruta), huella)
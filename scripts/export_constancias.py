@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Bulk export of constancias from a JSONL stream of payloads.
+
+Each input line is one constancia:
+
+    {"tipo": "separacion", "archivo": "opcional.docx", "data": {...}}
+
+`data` carries the same fields lib/actions-constancias.ts sends to the
+templates (razon_social, cliente_*, local_*, montos, depositos[], firma_*).
+A line without "data" is taken as the payload itself, with "tipo" inside.
+With --format pdf the documents are rendered by constancias_pdf.py instead
+(requires reportlab). Payloads with `logo_url` get the project logo; each
+worker prepares a logo once, and with --logo-cache the prepared logos are
+also kept on disk for the other workers and later runs.
+
+Records are rendered in a process pool with the precompiled templates of
+render_constancias.py and each finished document is written straight into
+the output ZIP (or directory), so memory does not grow with the batch. A bad
+record only fails itself: its line number and error go to an errors JSONL
+and the job goes on.
+
+Usage: python export_constancias.py payloads.jsonl --output constancias-2025-01.zip --workers 4
+       python export_constancias.py - --output out/ < payloads.jsonl
+"""
+import argparse
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+import json
+import os
+import re
+import sys
+import time
+import zipfile
+
+from render_constancias import TEMPLATES, load_template
+
+# Records sent to a worker per task
+BATCH_SIZE = 16
+
+# Fixed timestamp for the ZIP entries
+ZIP_DATE_TIME = (2025, 1, 1, 0, 0, 0)
+
+
+def output_name(line_number, tipo, data, extension='.docx'):
+    """File name for a record, following CONSTANCIA_<TIPO>_<local>_... of the server action"""
+    local = re.sub(r'[^\w.-]+', '_', str(data.get('local_codigo') or 'SIN-LOCAL'))
+    return f'CONSTANCIA_{tipo.upper()}_{local}_{line_number:06d}{extension}'
+
+
+def _renderer(tipo, output_format):
+    if output_format == 'pdf':
+        from constancias_pdf import load_pdf_template
+        return load_pdf_template(tipo)
+    return load_template(tipo)
+
+
+def render_record(line_number, line, output_format='docx'):
+    """Render one input line; returns (name, document bytes)"""
+    record = json.loads(line)
+    data = record.get('data', record)
+    tipo = record.get('tipo') or data.get('tipo')
+    if tipo not in TEMPLATES:
+        raise ValueError(f"Unknown tipo {tipo!r} (expected one of {', '.join(TEMPLATES)})")
+    name = record.get('archivo') or output_name(line_number, tipo, data, f'.{output_format}')
+    return os.path.basename(name), _renderer(tipo, output_format).render(data)
+
+
+def render_batch(batch, output_format='docx'):
+    """Render [(line_number, line), ...] in a worker, isolating errors per record.
+
+    Returns [(line_number, name, content, error)] with content None on error.
+    """
+    results = []
+    for line_number, line in batch:
+        try:
+            name, content = render_record(line_number, line, output_format)
+            results.append((line_number, name, content, None))
+        except Exception as e:
+            results.append((line_number, None, None, f'{type(e).__name__}: {e}'))
+    return results
+
+
+def read_batches(handle, size):
+    """Split non-empty input lines into batches of (line_number, line)"""
+    lines = ((n, line) for n, line in enumerate(handle, 1) if line.strip())
+    while batch := list(islice(lines, size)):
+        yield batch
+
+
+def render_in_pool(batches, workers, output_format='docx'):
+    """Yield finished batches as they complete, with at most `workers * 4` in flight"""
+    if workers <= 1:
+        for batch in batches:
+            yield render_batch(batch, output_format)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for batch in batches:
+            pending.add(executor.submit(render_batch, batch, output_format))
+            if len(pending) >= workers * 4:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in pending:
+            yield future.result()
+
+
+class ZipSink:
+    """Writes each rendered document as a stored entry (.docx and .pdf are already compressed)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._zip = zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED, allowZip64=True)
+        self._names = set()
+
+    def write(self, name, content):
+        name = _unique(name, self._names)
+        self._zip.writestr(zipfile.ZipInfo(name, date_time=ZIP_DATE_TIME), content)
+
+    def close(self):
+        self._zip.close()
+
+
+class DirectorySink:
+    """Writes each rendered document as a file in a directory"""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._names = set()
+
+    def write(self, name, content):
+        name = _unique(name, self._names)
+        with open(os.path.join(self.path, name), 'wb') as f:
+            f.write(content)
+
+    def close(self):
+        pass
+
+
+def _unique(name, used):
+    base, extension = os.path.splitext(name)
+    candidate, n = name, 1
+    while candidate in used:
+        n += 1
+        candidate = f'{base}-{n}{extension}'
+    used.add(candidate)
+    return candidate
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render many constancias into a ZIP or a directory')
+    parser.add_argument('input', help="JSONL file with one payload per line ('-' for stdin)")
+    parser.add_argument('--output', required=True, help='Output .zip file or directory')
+    parser.add_argument('--format', choices=['docx', 'pdf'], default='docx',
+                        help='Output format; pdf requires reportlab (default: docx)')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes; 0 uses all cores (default: 1)')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help=f'Records per worker task (default: {BATCH_SIZE})')
+    parser.add_argument('--logo-cache', default=None, metavar='DIR',
+                        help='Directory for the prepared project logos (sets CONSTANCIAS_LOGO_CACHE)')
+    parser.add_argument('--errors', default=None,
+                        help='Errors JSONL path (default: next to the output, <output>.errors.jsonl)')
+    parser.add_argument('--progress-every', type=int, default=500,
+                        help='Print progress every N records (default: 500)')
+    args = parser.parse_args()
+
+    workers = args.workers or os.cpu_count() or 1
+    if args.logo_cache:
+        # Read by constancias_logo in each worker process
+        os.environ['CONSTANCIAS_LOGO_CACHE'] = args.logo_cache
+    if args.format == 'pdf':
+        import constancias_pdf  # noqa: F401 - fails early if reportlab is missing
+    sink = ZipSink(args.output) if args.output.lower().endswith('.zip') else DirectorySink(args.output)
+    errors_path = args.errors or args.output.rstrip('/\\') + '.errors.jsonl'
+    handle = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+
+    print(f'Exportando constancias: {args.input} -> {args.output} ({workers} workers)')
+    done = failed = size = 0
+    next_report = args.progress_every
+    start = time.perf_counter()
+    with open(errors_path, 'w', encoding='utf-8') as errors:
+        try:
+            for results in render_in_pool(read_batches(handle, args.batch_size), workers, args.format):
+                for line_number, name, content, error in results:
+                    if error is None:
+                        sink.write(name, content)
+                        size += len(content)
+                        done += 1
+                    else:
+                        errors.write(json.dumps({'linea': line_number, 'error': error}, ensure_ascii=False) + '\n')
+                        failed += 1
+                if args.progress_every and done + failed >= next_report:
+                    elapsed = time.perf_counter() - start
+                    print(f'  {done + failed} registros ({done} ok, {failed} con error), '
+                          f'{(done + failed) / elapsed:.0f} docs/s', file=sys.stderr)
+                    next_report += args.progress_every
+        finally:
+            sink.close()
+            if handle is not sys.stdin:
+                handle.close()
+    elapsed = time.perf_counter() - start
+
+    print('=' * 50)
+    print(f'Constancias generadas: {done} ({size / 1024 / 1024:.1f} MB) en {elapsed:.1f}s')
+    if failed:
+        print(f'Registros con error: {failed} (ver {errors_path})')
+    else:
+        os.remove(errors_path)
+    print('=' * 50)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,14 @@
 """
 Generate Word templates for constancias using docx-templates syntax.
 These templates use {variable} placeholders that docx-templates will replace.
+The content of each constancia comes from the shared layout in constancias_layout.py.
+
+Builds are reproducible: ZIP entries get a fixed timestamp and order, so the
+same layout always gives the same bytes. A file is only rewritten when its
+sha256 changes, and templates/constancias/manifest.json keeps the hash of
+each template for upload-constancias-templates.js.
+
+Usage: python scripts/generate_constancias_templates.py [separacion abono cancelacion]
 """
 from docx import Document
 from docx.shared import Inches, Pt, Cm
@@ -9,7 +17,30 @@ from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.table import WD_TABLE_ALIGNMENT
 from docx.oxml.ns import qn
 from docx.oxml import OxmlElement
+import argparse
+import hashlib
+import io
+import json
 import os
+import zipfile
+
+from constancias_layout import (
+    CONSTANCIAS,
+    ENCABEZADO,
+    FIRMA,
+    INTRO,
+    LINEA_FIRMA,
+    LOGO,
+    MARGENES_CM,
+    PIE,
+)
+
+TEMPLATES_DIR = 'templates/constancias'
+MANIFEST_PATH = os.path.join(TEMPLATES_DIR, 'manifest.json')
+
+# Fixed ZIP metadata so that builds are byte-for-byte reproducible
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+ZIP_FIRST_ENTRY = '[Content_Types].xml'
 
 def set_cell_margins(cell, top=0, bottom=0, left=100, right=100):
     """Set cell margins"""
@@ -23,29 +54,42 @@ def set_cell_margins(cell, top=0, bottom=0, left=100, right=100):
         tcMar.append(node)
     tcPr.append(tcMar)
 
+def add_run(paragraph, text, style=''):
+    """Add a run with the layout style ('' plain, 'b' bold, 'i' italic)"""
+    run = paragraph.add_run(text)
+    if style == 'b':
+        run.bold = True
+    elif style == 'i':
+        run.italic = True
+    return run
+
 def create_header_table(doc):
-    """Create header with logo placeholder and company info"""
+    """Create header with the logo command and company info.
+
+    The logo run is bold so that it keeps a run property when docx-templates
+    leaves it empty (project without logo) and removeEmptyParagraphs() does
+    not drop the only paragraph of the cell.
+    """
     table = doc.add_table(rows=1, cols=2)
     table.autofit = False
 
-    # Left cell - Logo placeholder
+    # Left cell - Logo (IMAGE command of docx-templates)
     left_cell = table.cell(0, 0)
     left_cell.width = Inches(2)
     p = left_cell.paragraphs[0]
-    p.add_run('[LOGO]')  # Placeholder - will be replaced with actual image
+    p.add_run(LOGO).bold = True
 
     # Right cell - Company info
     right_cell = table.cell(0, 1)
     right_cell.width = Inches(4)
     p = right_cell.paragraphs[0]
     p.alignment = WD_ALIGN_PARAGRAPH.RIGHT
-    run = p.add_run('{razon_social}')
-    run.bold = True
-    run.font.size = Pt(11)
-    p.add_run('\n')
-    p.add_run('RUC: {ruc}')
-    p.add_run('\n')
-    p.add_run('{direccion_empresa}')
+    for i, (text, style) in enumerate(ENCABEZADO):
+        if i:
+            p.add_run('\n')
+        run = add_run(p, text, style)
+        if i == 0:
+            run.font.size = Pt(11)
 
     return table
 
@@ -63,7 +107,7 @@ def add_constancia_intro(doc):
     """Add SE HACE CONSTAR section"""
     p = doc.add_paragraph()
     p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    run = p.add_run('SE HACE CONSTAR:')
+    run = p.add_run(INTRO)
     run.bold = True
     run.font.size = Pt(12)
     doc.add_paragraph()
@@ -76,18 +120,13 @@ def add_signature_area(doc):
     # Signature line
     p = doc.add_paragraph()
     p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    p.add_run('_' * 40)
+    p.add_run(LINEA_FIRMA)
 
-    # Name
-    p2 = doc.add_paragraph()
-    p2.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    run = p2.add_run('{firma_nombre}')
-    run.bold = True
-
-    # Title
-    p3 = doc.add_paragraph()
-    p3.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    p3.add_run('{firma_cargo}')
+    # Name and title
+    for text, style in FIRMA:
+        p = doc.add_paragraph()
+        p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        add_run(p, text, style)
 
 def add_footer(doc):
     """Add footer with date and location"""
@@ -95,307 +134,104 @@ def add_footer(doc):
     doc.add_paragraph()
     p = doc.add_paragraph()
     p.alignment = WD_ALIGN_PARAGRAPH.RIGHT
-    p.add_run('Lima, {fecha_emision}')
-
-def create_constancia_separacion():
-    """Create template for Constancia de Separacion"""
-    doc = Document()
-
-    # Set margins
-    sections = doc.sections
-    for section in sections:
-        section.top_margin = Cm(2)
-        section.bottom_margin = Cm(2)
-        section.left_margin = Cm(2.5)
-        section.right_margin = Cm(2.5)
+    p.add_run(PIE)
 
-    # Header
-    create_header_table(doc)
-
-    # Title
-    add_title(doc, 'CONSTANCIA DE SEPARACION')
-
-    # Intro
-    add_constancia_intro(doc)
-
-    # Clause 1 - Client info
-    p1 = doc.add_paragraph()
-    p1.add_run('1. ').bold = True
-    p1.add_run('Que el(la) Sr(a). ')
-    run = p1.add_run('{cliente_nombre}')
-    run.bold = True
-    p1.add_run(', identificado(a) con DNI N° ')
-    run = p1.add_run('{cliente_dni}')
-    run.bold = True
-    p1.add_run(', ha realizado la separacion del siguiente bien inmueble:')
-
-    doc.add_paragraph()
-
-    # Clause 2 - Property info
-    p2 = doc.add_paragraph()
-    p2.add_run('2. ').bold = True
-    p2.add_run('Local comercial ')
-    run = p2.add_run('{local_codigo}')
-    run.bold = True
-    p2.add_run(' ({local_rubro}) con un area de ')
-    run = p2.add_run('{local_area} m²')
-    run.bold = True
-    p2.add_run(', nivel {local_nivel}, ubicado en el proyecto ')
-    run = p2.add_run('{proyecto_nombre}')
-    run.bold = True
-    p2.add_run('.')
-
-    doc.add_paragraph()
-
-    # Clause 3 - Payment info
-    p3 = doc.add_paragraph()
-    p3.add_run('3. ').bold = True
-    p3.add_run('El monto de separacion asciende a ')
-    run = p3.add_run('US$ {monto_usd}')
-    run.bold = True
-    p3.add_run(' (')
-    run = p3.add_run('{monto_usd_letras}')
-    run.italic = True
-    p3.add_run(') o su equivalente en soles S/ ')
-    run = p3.add_run('{monto_pen}')
-    run.bold = True
-    p3.add_run(' ({monto_pen_letras}) al tipo de cambio S/ {tipo_cambio}.')
-
-    doc.add_paragraph()
-
-    # Clause 4 - Deposits (using FOR loop for docx-templates)
-    p4 = doc.add_paragraph()
-    p4.add_run('4. ').bold = True
-    p4.add_run('Deposito(s) realizado(s):')
-
-    doc.add_paragraph()
+def add_clause(doc, number, runs):
+    """Add a numbered clause"""
+    p = doc.add_paragraph()
+    p.add_run(f'{number}. ').bold = True
+    for text, style in runs:
+        add_run(p, text, style)
 
-    # FOR loop for deposits using docx-templates syntax: FOR...IN...END-FOR
+def add_list_loop(doc, block):
+    """Add a bullet item repeated with docx-templates syntax: FOR...IN...END-FOR"""
     p_for = doc.add_paragraph()
-    p_for.add_run('{FOR deposito IN depositos}')
+    p_for.add_run(f"{{FOR {block['var']} IN {block['en']}}}")
 
     p_item = doc.add_paragraph()
     p_item.style = 'List Bullet'
-    p_item.add_run('{$deposito.fecha} - Op. {$deposito.numero_operacion} - {$deposito.moneda} {$deposito.monto}')
+    for text, style in block['runs']:
+        add_run(p_item, text, style)
 
     p_end = doc.add_paragraph()
-    p_end.add_run('{END-FOR deposito}')
-
-    doc.add_paragraph()
-
-    # Clause 5 - Validity
-    p5 = doc.add_paragraph()
-    p5.add_run('5. ').bold = True
-    p5.add_run('La presente constancia tiene vigencia de {plazo_dias} dias, hasta el ')
-    run = p5.add_run('{fecha_vencimiento}')
-    run.bold = True
-    p5.add_run(', fecha en la cual el cliente debera completar el pago de la cuota inicial.')
-
-    doc.add_paragraph()
-
-    # Clause 6 - Notes
-    p6 = doc.add_paragraph()
-    p6.add_run('6. ').bold = True
-    p6.add_run('Se emite la presente constancia a solicitud del interesado para los fines que estime conveniente.')
-
-    # Signature
-    add_signature_area(doc)
-
-    # Footer
-    add_footer(doc)
-
-    # Save
-    output_path = 'templates/constancias/constancia-separacion.docx'
-    doc.save(output_path)
-    print(f'Template generado: {output_path}')
-    return output_path
-
-def create_constancia_abono():
-    """Create template for Constancia de Abono"""
-    doc = Document()
-
-    # Set margins
-    sections = doc.sections
-    for section in sections:
-        section.top_margin = Cm(2)
-        section.bottom_margin = Cm(2)
-        section.left_margin = Cm(2.5)
-        section.right_margin = Cm(2.5)
-
-    # Header
-    create_header_table(doc)
-
-    # Title
-    add_title(doc, 'CONSTANCIA DE ABONO')
-
-    # Intro
-    add_constancia_intro(doc)
-
-    # Clause 1 - Client info
-    p1 = doc.add_paragraph()
-    p1.add_run('1. ').bold = True
-    p1.add_run('Que el(la) Sr(a). ')
-    run = p1.add_run('{cliente_nombre}')
-    run.bold = True
-    p1.add_run(', identificado(a) con DNI N° ')
-    run = p1.add_run('{cliente_dni}')
-    run.bold = True
-    p1.add_run(', ha realizado un abono correspondiente al siguiente bien inmueble:')
-
-    doc.add_paragraph()
-
-    # Clause 2 - Property info
-    p2 = doc.add_paragraph()
-    p2.add_run('2. ').bold = True
-    p2.add_run('Local comercial ')
-    run = p2.add_run('{local_codigo}')
-    run.bold = True
-    p2.add_run(' ({local_rubro}) con un area de ')
-    run = p2.add_run('{local_area} m²')
-    run.bold = True
-    p2.add_run(', ubicado en el proyecto ')
-    run = p2.add_run('{proyecto_nombre}')
-    run.bold = True
-    p2.add_run('.')
-
-    doc.add_paragraph()
+    p_end.add_run(f"{{END-FOR {block['var']}}}")
 
-    # Clause 3 - Abono info
-    p3 = doc.add_paragraph()
-    p3.add_run('3. ').bold = True
-    p3.add_run('El abono realizado corresponde a:')
-
-    doc.add_paragraph()
-
-    # Abono details table
-    table = doc.add_table(rows=4, cols=2)
+def add_label_table(doc, rows):
+    """Add a two-column table with bold labels"""
+    table = doc.add_table(rows=len(rows), cols=2)
     table.style = 'Table Grid'
 
-    rows_data = [
-        ('Monto USD:', 'US$ {monto_usd} ({monto_usd_letras})'),
-        ('Fecha de deposito:', '{fecha_deposito}'),
-        ('Operacion bancaria:', '{numero_operacion}'),
-        ('Tipo:', 'Abono a cuenta'),
-    ]
-
-    for i, (label, value) in enumerate(rows_data):
+    for i, (label, value) in enumerate(rows):
         table.cell(i, 0).text = label
         table.cell(i, 0).paragraphs[0].runs[0].bold = True
         table.cell(i, 1).text = value
 
-    doc.add_paragraph()
-
-    # Clause 4 - Notes
-    p4 = doc.add_paragraph()
-    p4.add_run('4. ').bold = True
-    p4.add_run('Se emite la presente constancia a solicitud del interesado para los fines que estime conveniente.')
+def add_row_loop_table(doc, block):
+    """Add a table with one row per item: the FOR and END-FOR commands go alone in
+    their own rows, around the row to repeat, followed by a totals row.
 
-    # Signature
-    add_signature_area(doc)
-
-    # Footer
-    add_footer(doc)
-
-    # Save
-    output_path = 'templates/constancias/constancia-abono.docx'
-    doc.save(output_path)
-    print(f'Template generado: {output_path}')
-    return output_path
+    Empty cells get an empty bold run: removeEmptyParagraphs() in the server
+    action drops bare <w:p/> paragraphs, and a cell without a paragraph is
+    invalid OOXML.
+    """
+    columns = block['columnas']
+    table = doc.add_table(rows=5, cols=len(columns))
+    table.style = 'Table Grid'
 
-def create_constancia_cancelacion():
-    """Create template for Constancia de Cancelacion"""
+    for i, (header, cell) in enumerate(columns):
+        table.cell(0, i).text = header
+        table.cell(0, i).paragraphs[0].runs[0].bold = True
+        table.cell(2, i).text = cell
+    table.cell(1, 0).text = f"{{FOR {block['var']} IN {block['en']}}}"
+    table.cell(3, 0).text = f"{{END-FOR {block['var']}}}"
+    for i, total in enumerate(block['totales']):
+        table.cell(4, i).text = total
+    for row in table.rows:
+        for cell in row.cells:
+            paragraph = cell.paragraphs[0]
+            if not paragraph.runs:
+                paragraph.add_run().bold = True
+    for cell in table.rows[4].cells:
+        cell.paragraphs[0].runs[0].bold = True
+
+def create_constancia(name):
+    """Create the template of a constancia described in constancias_layout.CONSTANCIAS"""
+    layout = CONSTANCIAS[name]
     doc = Document()
 
     # Set margins
-    sections = doc.sections
-    for section in sections:
-        section.top_margin = Cm(2)
-        section.bottom_margin = Cm(2)
-        section.left_margin = Cm(2.5)
-        section.right_margin = Cm(2.5)
+    top, bottom, left, right = MARGENES_CM
+    for section in doc.sections:
+        section.top_margin = Cm(top)
+        section.bottom_margin = Cm(bottom)
+        section.left_margin = Cm(left)
+        section.right_margin = Cm(right)
 
     # Header
     create_header_table(doc)
 
     # Title
-    add_title(doc, 'CONSTANCIA DE CANCELACION')
+    add_title(doc, layout['titulo'])
 
     # Intro
     add_constancia_intro(doc)
 
-    # Clause 1 - Client info
-    p1 = doc.add_paragraph()
-    p1.add_run('1. ').bold = True
-    p1.add_run('Que el(la) Sr(a). ')
-    run = p1.add_run('{cliente_nombre}')
-    run.bold = True
-    p1.add_run(', identificado(a) con DNI N° ')
-    run = p1.add_run('{cliente_dni}')
-    run.bold = True
-    p1.add_run(', ha CANCELADO en su totalidad el siguiente bien inmueble:')
-
-    doc.add_paragraph()
-
-    # Clause 2 - Property info
-    p2 = doc.add_paragraph()
-    p2.add_run('2. ').bold = True
-    p2.add_run('Local comercial ')
-    run = p2.add_run('{local_codigo}')
-    run.bold = True
-    p2.add_run(' ({local_rubro}) con un area de ')
-    run = p2.add_run('{local_area} m²')
-    run.bold = True
-    p2.add_run(', ubicado en el proyecto ')
-    run = p2.add_run('{proyecto_nombre}')
-    run.bold = True
-    p2.add_run('.')
-
-    doc.add_paragraph()
-
-    # Clause 3 - Sale info
-    p3 = doc.add_paragraph()
-    p3.add_run('3. ').bold = True
-    p3.add_run('Monto total cancelado: ')
-    run = p3.add_run('US$ {monto_total_usd}')
-    run.bold = True
-    p3.add_run(' ({monto_total_usd_letras}).')
-
-    doc.add_paragraph()
-
-    # Clause 4 - Payment history
-    p4 = doc.add_paragraph()
-    p4.add_run('4. ').bold = True
-    p4.add_run('Historial de pagos realizados:')
-
-    doc.add_paragraph()
-
-    # FOR loop for payment history using docx-templates syntax: FOR...IN...END-FOR
-    p_for = doc.add_paragraph()
-    p_for.add_run('{FOR deposito IN depositos}')
-
-    p_item = doc.add_paragraph()
-    p_item.style = 'List Bullet'
-    p_item.add_run('{$deposito.fecha} - {$deposito.tipo} - US$ {$deposito.monto} - Op. {$deposito.numero_operacion}')
-
-    p_end = doc.add_paragraph()
-    p_end.add_run('{END-FOR deposito}')
-
-    doc.add_paragraph()
-
-    # Clause 5 - Certification
-    p5 = doc.add_paragraph()
-    p5.add_run('5. ').bold = True
-    p5.add_run('Se certifica que el cliente ha cumplido con el pago total del bien inmueble, quedando ')
-    run = p5.add_run('LIBRE DE CUALQUIER OBLIGACION DE PAGO PENDIENTE')
-    run.bold = True
-    p5.add_run('.')
-
-    doc.add_paragraph()
-
-    # Clause 6 - Notes
-    p6 = doc.add_paragraph()
-    p6.add_run('6. ').bold = True
-    p6.add_run('Se emite la presente constancia a solicitud del interesado para los fines que estime conveniente.')
+    # Clauses, lists and tables, separated by a blank paragraph
+    number = 0
+    for i, block in enumerate(layout['bloques']):
+        if i:
+            doc.add_paragraph()
+        if block['tipo'] == 'clausula':
+            number += 1
+            add_clause(doc, number, block['runs'])
+        elif block['tipo'] == 'lista':
+            add_list_loop(doc, block)
+        elif block['tipo'] == 'tabla':
+            add_label_table(doc, block['filas'])
+        elif block['tipo'] == 'tabla_lista':
+            add_row_loop_table(doc, block)
+        else:
+            raise ValueError(f"Unknown block type: {block['tipo']}")
 
     # Signature
     add_signature_area(doc)
@@ -404,30 +240,96 @@ def create_constancia_cancelacion():
     add_footer(doc)
 
     # Save
-    output_path = 'templates/constancias/constancia-cancelacion.docx'
-    doc.save(output_path)
-    print(f'Template generado: {output_path}')
-    return output_path
+    output_path = f'{TEMPLATES_DIR}/constancia-{name}.docx'
+    content = reproducible_docx(doc)
+    digest = hashlib.sha256(content).hexdigest()
+    if file_sha256(output_path) == digest:
+        print(f'Template sin cambios: {output_path}')
+    else:
+        with open(output_path, 'wb') as f:
+            f.write(content)
+        print(f'Template generado: {output_path}')
+    return output_path, {'sha256': digest, 'bytes': len(content)}
+
+def reproducible_docx(doc):
+    """Save the document and repack it with fixed timestamps, entry order and attributes"""
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    output = io.BytesIO()
+    with zipfile.ZipFile(buffer) as source, zipfile.ZipFile(output, 'w') as target:
+        names = sorted(source.namelist(), key=lambda n: (n != ZIP_FIRST_ENTRY, n))
+        for name in names:
+            info = zipfile.ZipInfo(name, date_time=ZIP_DATE_TIME)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.create_system = 3
+            info.external_attr = 0o644 << 16
+            target.writestr(info, source.read(name), compresslevel=6)
+    return output.getvalue()
+
+def file_sha256(path):
+    """sha256 of a file, or None if it does not exist"""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def write_manifest(entries):
+    """Merge the built entries into manifest.json, rehashing templates not rebuilt this run"""
+    manifest = {}
+    for name in CONSTANCIAS:
+        file_name = f'constancia-{name}.docx'
+        path = os.path.join(TEMPLATES_DIR, file_name)
+        if file_name in entries:
+            manifest[file_name] = entries[file_name]
+        elif os.path.exists(path):
+            manifest[file_name] = {'sha256': file_sha256(path), 'bytes': os.path.getsize(path)}
+    text = json.dumps(manifest, indent=2, sort_keys=True) + '\n'
+    if not os.path.exists(MANIFEST_PATH) or open(MANIFEST_PATH, encoding='utf-8').read() != text:
+        with open(MANIFEST_PATH, 'w', encoding='utf-8') as f:
+            f.write(text)
+    return manifest
+
+def create_constancia_separacion():
+    """Create template for Constancia de Separacion"""
+    return create_constancia('separacion')
+
+def create_constancia_abono():
+    """Create template for Constancia de Abono"""
+    return create_constancia('abono')
+
+def create_constancia_cancelacion():
+    """Create template for Constancia de Cancelacion"""
+    return create_constancia('cancelacion')
 
 def main():
+    parser = argparse.ArgumentParser(description='Generate the constancia .docx templates')
+    parser.add_argument('templates', nargs='*', metavar='template',
+                        help=f"Templates to rebuild ({', '.join(CONSTANCIAS)}); default: all")
+    args = parser.parse_args()
+    unknown = sorted(set(args.templates) - set(CONSTANCIAS))
+    if unknown:
+        parser.error(f"unknown template(s): {', '.join(unknown)}")
+
     # Change to project root
     script_dir = os.path.dirname(os.path.abspath(__file__))
     project_root = os.path.dirname(script_dir)
     os.chdir(project_root)
 
     # Create output directory
-    os.makedirs('templates/constancias', exist_ok=True)
+    os.makedirs(TEMPLATES_DIR, exist_ok=True)
 
     print('Generando templates de constancias...')
     print('=' * 50)
 
-    # Generate all templates
-    create_constancia_separacion()
-    create_constancia_abono()
-    create_constancia_cancelacion()
+    # Generate the selected templates (all by default)
+    entries = {}
+    for name in args.templates or CONSTANCIAS:
+        output_path, entry = create_constancia(name)
+        entries[os.path.basename(output_path)] = entry
+    write_manifest(entries)
 
     print('=' * 50)
-    print('Templates generados exitosamente!')
+    print(f'Templates generados exitosamente! (manifest: {MANIFEST_PATH})')
     print('\nVariables disponibles:')
     print('- Comunes: empresa_nombre, empresa_ruc, empresa_direccion')
     print('- Cliente: cliente_nombre, cliente_dni')
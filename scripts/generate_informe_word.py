@@ -1,49 +1,166 @@
 #!/usr/bin/env python3
 """
 Generate professional Word document for project compliance report
+
+The platform metrics and the report date are computed from a local snapshot
+of the dashboard data (see informe_metricas.py), so the informe can be
+regenerated on a schedule instead of being edited by hand. The lead funnel,
+sales per project and vendedor ranking charts come from informe_graficos.py
+(requires matplotlib; skip them with --sin-graficos): they are rendered in
+parallel and cached by a hash of their data, so a regeneration only redraws
+the charts whose data changed.
+
+Usage: python scripts/generate_informe_word.py --snapshot snapshot.db
+       python scripts/generate_informe_word.py --snapshot exports/2025-01/ --output informe.docx
 """
 from docx import Document
-from docx.shared import Inches, Pt, RGBColor
+from docx.shared import Emu, Inches, Pt, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.table import WD_TABLE_ALIGNMENT
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
+from docx.oxml.ns import nsdecls
+from docx.oxml import parse_xml
+from docx.table import Table
 from datetime import datetime
+from xml.sax.saxutils import escape
+import argparse
+import re
+import time
+
+from informe_metricas import calcular_metricas
+
+MESES = ['Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio', 'Julio', 'Agosto',
+         'Septiembre', 'Octubre', 'Noviembre', 'Diciembre']
+
+OUTPUT_PATH = 'docs/INFORME_CUMPLIMIENTO_PAQUETE_ITERRUPTIVO.docx'
+
+# Cells containing these words are written bold and green
+HIGHLIGHT_WORDS = ('COMPLETADO', 'SUPERADO', 'CUMPLIDO')
 
-def set_cell_shading(cell, color):
-    """Set cell background color"""
-    shading_elm = OxmlElement('w:shd')
-    shading_elm.set(qn('w:fill'), color)
-    cell._tc.get_or_add_tcPr().append(shading_elm)
+# Run properties of the header cells and of the highlighted cells
+HEADER_RPR = '<w:rPr><w:b/><w:color w:val="FFFFFF"/></w:rPr>'
+HIGHLIGHT_RPR = '<w:rPr><w:b/><w:color w:val="008000"/></w:rPr>'
+
+RUN_BREAK_RE = re.compile(r'([\t\r\n])')
 
 def add_table_with_style(doc, headers, rows, header_color='1B967A'):
     """Add a styled table"""
-    table = doc.add_table(rows=1 + len(rows), cols=len(headers))
-    table.style = 'Table Grid'
-
-    # Header row
-    header_row = table.rows[0]
-    for i, header in enumerate(headers):
-        cell = header_row.cells[i]
-        cell.text = header
-        cell.paragraphs[0].runs[0].bold = True
-        cell.paragraphs[0].runs[0].font.color.rgb = RGBColor(255, 255, 255)
-        set_cell_shading(cell, header_color)
-
-    # Data rows
-    for row_idx, row_data in enumerate(rows):
-        row = table.rows[row_idx + 1]
-        for col_idx, cell_data in enumerate(row_data):
-            cell = row.cells[col_idx]
-            cell.text = str(cell_data)
-            # Color green for COMPLETADO/SUPERADO
-            if 'COMPLETADO' in str(cell_data) or 'SUPERADO' in str(cell_data) or 'CUMPLIDO' in str(cell_data):
-                cell.paragraphs[0].runs[0].font.color.rgb = RGBColor(0, 128, 0)
-                cell.paragraphs[0].runs[0].bold = True
-
-    return table
+    return add_table_rows(doc, headers, rows, header_color)
+
+def _run_xml(text, rpr=''):
+    """A w:r with the text, tabs and line breaks like python-docx's run.text setter"""
+    content = []
+    for piece in RUN_BREAK_RE.split(text):
+        if piece == '\t':
+            content.append('<w:tab/>')
+        elif piece == '\r' or piece == '\n':
+            content.append('<w:br/>')
+        elif piece:
+            space = ' xml:space="preserve"' if piece != piece.strip() else ''
+            content.append(f'<w:t{space}>{escape(piece)}</w:t>')
+    return f'<w:r>{rpr}{"".join(content)}</w:r>'
+
+def add_table_rows(doc, headers, rows, header_color='1B967A'):
+    """Add a styled table from an iterable of rows, writing its XML in one pass.
+
+    Same table as building it cell by cell with python-docx (Table Grid, shaded
+    header with white bold text, green bold COMPLETADO/SUPERADO/CUMPLIDO cells),
+    but the rows are emitted as WordprocessingML strings with precompiled run
+    properties and parsed once, so a 100k-row appendix takes seconds. Short
+    rows are padded with empty cells; a row longer than `headers` raises
+    ValueError, as it would not fit the table grid.
+    """
+    cols = len(headers)
+    section = doc.sections[-1]
+    width = (section.page_width or Inches(8.5)) - (section.left_margin or Inches(1)) - (section.right_margin or Inches(1))
+    col_twips = Emu(width // cols).twips if cols else 0
+    cell_start = f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{col_twips}"/></w:tcPr>'
+    header_start = (f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{col_twips}"/>'
+                    f'<w:shd w:fill="{header_color}"/></w:tcPr>')
+
+    xml = [
+        f'<w:tbl {nsdecls("w")}><w:tblPr>'
+        f'<w:tblStyle w:val="{doc.styles["Table Grid"].style_id}"/><w:tblW w:type="auto" w:w="0"/>'
+        '<w:tblLook w:firstColumn="1" w:firstRow="1" w:lastColumn="0" w:lastRow="0" w:noHBand="0" '
+        'w:noVBand="1" w:val="04A0"/></w:tblPr><w:tblGrid>',
+        f'<w:gridCol w:w="{col_twips}"/>' * cols,
+        '</w:tblGrid><w:tr>',
+    ]
+    xml.extend(f'{header_start}<w:p>{_run_xml(header, HEADER_RPR)}</w:p></w:tc>' for header in headers)
+    xml.append('</w:tr>')
+    for row_number, row_data in enumerate(rows, 1):
+        if len(row_data) > cols:
+            raise ValueError(f'Row {row_number} has {len(row_data)} cells, the table has {cols} columns')
+        xml.append('<w:tr>')
+        for cell_data in row_data:
+            text = str(cell_data)
+            # Color green for COMPLETADO/SUPERADO/CUMPLIDO
+            highlight = any(word in text for word in HIGHLIGHT_WORDS)
+            xml.append(f'{cell_start}<w:p>{_run_xml(text, HIGHLIGHT_RPR if highlight else "")}</w:p></w:tc>')
+        # Cells missing from a short row stay empty
+        xml.append(f'{cell_start}<w:p/></w:tc>' * (cols - len(row_data)))
+        xml.append('</w:tr>')
+    xml.append('</w:tbl>')
+
+    tbl = parse_xml(''.join(xml))
+    doc.element.body._insert_tbl(tbl)
+    return Table(tbl, doc._body)
+
+def fecha_informe(metricas):
+    """'Diciembre 2024' from the newest lead of the snapshot (today if there is none)"""
+    ultimo = metricas['ultimo_lead']
+    if ultimo:
+        year, month = int(ultimo[:4]), int(ultimo[5:7])
+    else:
+        today = datetime.now()
+        year, month = today.year, today.month
+    return f'{MESES[month - 1]} {year}'
+
+def metricas_rows_de(metricas, uptime):
+    """Rows of the METRICAS table; the ventas rows only when the snapshot has ventas"""
+    rows = [
+        ['Total Leads Capturados', f"{metricas['total_leads']:,}"],
+        ['Leads Victoria (IA)', f"{metricas['leads_victoria']:,}"],
+        ['Proyectos Activos', f"{metricas['proyectos_activos']:,}"],
+        ['Locales en Inventario', f"{metricas['locales']:,}"],
+        ['Locales Vendidos', f"{metricas['locales_vendidos']:,}"],
+        ['Usuarios del Sistema', f"{metricas['usuarios']:,}"],
+        ['Vendedores Activos', f"{metricas['vendedores_activos']:,}"],
+    ]
+    if metricas['ventas'] is not None:
+        rows.append(['Ventas Registradas', f"{metricas['ventas']:,}"])
+        rows.append(['Ventas Atribuidas a Victoria', f"{metricas['ventas_victoria']:,}"])
+    rows.append(['Uptime del Sistema', uptime])
+    return rows
 
 def main():
+    parser = argparse.ArgumentParser(description='Generate the compliance informe from a data snapshot')
+    parser.add_argument('--snapshot', required=True,
+                        help='SQLite file or directory of <tabla>.parquet / <tabla>.csv exports')
+    parser.add_argument('--output', default=OUTPUT_PATH, help=f'Output .docx path (default: {OUTPUT_PATH})')
+    parser.add_argument('--fecha', default=None, help="Report date (default: month of the newest lead, e.g. 'Diciembre 2024')")
+    parser.add_argument('--uptime', default='99.9%', help='Uptime to report, not in the snapshot (default: 99.9%%)')
+    parser.add_argument('--sin-graficos', action='store_true', help='Leave out the charts (no matplotlib needed)')
+    parser.add_argument('--cache-graficos', default=None, metavar='DIR',
+                        help='Chart cache directory (default: ~/.cache/informe-graficos)')
+    parser.add_argument('--workers', type=int, default=0, help='Chart render processes; 0 uses all cores (default: 0)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    metricas = calcular_metricas(args.snapshot)
+    print(f'Metricas calculadas en {time.perf_counter() - start:.2f}s ({metricas["total_leads"]:,} leads)')
+    fecha = args.fecha or fecha_informe(metricas)
+    proyectos = metricas['proyectos_activos']
+
+    graficos = []
+    if not args.sin_graficos:
+        from informe_graficos import DEFAULT_CACHE_DIR, graficos_informe, render_graficos
+        start = time.perf_counter()
+        graficos = graficos_informe(metricas)
+        paths, rendered = render_graficos(graficos, args.cache_graficos or DEFAULT_CACHE_DIR, args.workers)
+        graficos = list(zip(graficos, paths))
+        print(f'Graficos: {len(paths)} ({rendered} renderizados, {len(paths) - rendered} desde cache) '
+              f'en {time.perf_counter() - start:.2f}s')
+
     doc = Document()
 
     # Title
@@ -59,7 +176,7 @@ def main():
     info.add_run('Proyecto: ').bold = True
     info.add_run('WhatsApp Sales Automation - EcoPlaza\n')
     info.add_run('Fecha: ').bold = True
-    info.add_run(f'Diciembre 2024\n')
+    info.add_run(f'{fecha}\n')
     info.add_run('Elaborado por: ').bold = True
     info.add_run('ITERRUPTIVO')
 
@@ -126,7 +243,7 @@ def main():
         ['Dashboard de Insights', 'Metricas de rendimiento y KPIs en tiempo real'],
         ['Dashboard Ejecutivo', 'Reporteria gerencial con graficos avanzados'],
         ['Gestion de Locales', 'Sistema completo de inventario de locales comerciales'],
-        ['Control Multi-Proyecto', 'Soporte para 12 proyectos simultaneos'],
+        ['Control Multi-Proyecto', f'Soporte para {proyectos} proyectos simultaneos'],
         ['Sistema de Roles (RBAC)', 'Admin, Jefe Ventas, Vendedor, Caseta, Finanzas, Marketing, Coordinador'],
         ['Reporteria Avanzada', 'Exportacion Excel, reportes por vendedor y proyecto'],
         ['Sistema Repulse', 'Envio masivo de mensajes para reactivacion'],
@@ -140,18 +257,17 @@ def main():
     doc.add_paragraph()
     doc.add_heading('METRICAS DE LA PLATAFORMA EN PRODUCCION', level=1)
 
-    metricas_rows = [
-        ['Total Leads Capturados', '43,390'],
-        ['Leads Victoria (IA)', '2,519'],
-        ['Proyectos Activos', '12'],
-        ['Locales en Inventario', '3,559'],
-        ['Locales Vendidos', '147'],
-        ['Usuarios del Sistema', '77'],
-        ['Vendedores Activos', '61'],
-        ['Uptime del Sistema', '99.9%'],
-    ]
+    metricas_rows = metricas_rows_de(metricas, args.uptime)
     add_table_with_style(doc, ['Metrica', 'Valor'], metricas_rows, '1565C0')
 
+    # Graficos
+    if graficos:
+        doc.add_paragraph()
+        doc.add_heading('GRAFICOS DE GESTION', level=1)
+        for _, path in graficos:
+            doc.add_picture(path, width=Inches(6))
+            doc.paragraphs[-1].alignment = WD_ALIGN_PARAGRAPH.CENTER
+
     # Garantias
     doc.add_paragraph()
     doc.add_heading('GARANTIAS CUMPLIDAS', level=1)
@@ -185,11 +301,12 @@ def main():
 
     p2 = doc.add_paragraph(style='List Number')
     p2.add_run('Se ha entregado valor adicional significativo').bold = True
-    p2.add_run(' incluyendo sistema multi-proyecto (12 proyectos vs 1 propuesto), Dashboard Ejecutivo avanzado, Sistema Repulse, Gestion de locales, y API publica documentada.')
+    p2.add_run(f' incluyendo sistema multi-proyecto ({proyectos} proyectos vs 1 propuesto), Dashboard Ejecutivo avanzado, Sistema Repulse, Gestion de locales, y API publica documentada.')
 
     p3 = doc.add_paragraph(style='List Number')
     p3.add_run('La plataforma esta en produccion activa').bold = True
-    p3.add_run(' con +43,000 leads capturados y 77 usuarios operando diariamente.')
+    leads_redondeados = metricas['total_leads'] // 1000 * 1000 or metricas['total_leads']
+    p3.add_run(f" con +{leads_redondeados:,} leads capturados y {metricas['usuarios']} usuarios operando diariamente.")
 
     p4 = doc.add_paragraph(style='List Number')
     p4.add_run('El sistema ha superado las expectativas').bold = True
@@ -207,7 +324,7 @@ def main():
     footer.add_run('www.iterruptivo.com')
 
     # Save
-    output_path = 'docs/INFORME_CUMPLIMIENTO_PAQUETE_ITERRUPTIVO.docx'
+    output_path = args.output
     doc.save(output_path)
     print(f'Documento generado: {output_path}')
 
@@ -0,0 +1,494 @@
+#!/usr/bin/env python3
+"""
+Generador de archivos grandes para probar la ruta de subida
+===========================================================
+El dashboard acepta subidas de hasta 2 GB (ver lib/utils/reunion-file-validator.ts).
+Este script escribe archivos grandes y validos del tamano exacto pedido:
+
+- pdf:   PDF multipagina de escaneos JPEG (DNI frente/reverso y vouchers)
+- video: clip MP4 (H.264) o WebM (VP9) con bitrate constante (requiere ffmpeg)
+- zip:   ZIP con los escaneos JPEG como entradas (zip64, sin compresion)
+
+Todo se escribe por partes: cada pagina, entrada o frame se genera, se
+escribe y se descarta, asi la memoria no crece con el tamano objetivo. El
+sha256 y los bytes se calculan mientras se escribe (el video se hashea al
+terminar, leyendo por bloques) y quedan en un manifest JSONL junto a los
+archivos.
+
+PDF y ZIP terminan en el byte pedido: las paginas o entradas se agregan
+mientras entran y el resto se completa con un stream de relleno (PDF) o una
+entrada almacenada de relleno mas el comentario del archivo (ZIP). El video
+queda cerca del objetivo segun el bitrate.
+
+Uso: python generate_large_payloads.py --tipo pdf zip --size-mb 100 2048 2049
+     (2048 MiB queda justo en el limite de 2 GB, que se acepta; 2049 lo supera)
+     python generate_large_payloads.py --tipo video --size-mb 500 --video-format webm
+"""
+
+from array import array
+from itertools import count, islice
+import argparse
+import hashlib
+import io
+import os
+import random
+import shutil
+import subprocess
+import sys
+import time
+import zipfile
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from dni_layouts import get_font
+from dni_manifest import ManifestWriter
+from dni_sampler import MuestreadorIdentidades
+from generate_synthetic_dni import render_dni_pair
+
+OUTPUT_DIR = os.path.join(os.path.dirname(__file__), '..', 'docs', 'test-assets', 'large')
+
+# Limite de subida del dashboard (2 GB)
+LIMITE_SUBIDA = 2 * 1024 * 1024 * 1024
+
+# Bloque de lectura/escritura para hashear y copiar
+TAMANO_BLOQUE = 1024 * 1024
+
+# Pagina A4 escaneada a 150 dpi y su tamano en puntos PDF
+PAGINA_PX = (1240, 1754)
+PAGINA_PT = (595, 842)
+
+# Campos de ruido de papel precalculados (se reusan desplazados)
+CAMPOS_RUIDO = 4
+
+# Cotas de lo que agrega cada pagina PDF (objetos sin el JPEG) y cada entrada
+# ZIP (cabecera local zip64, data descriptor y entrada del directorio central)
+BYTES_PAGINA_PDF = 1024
+BYTES_ENTRADA_ZIP = 256
+
+# Data descriptor de una entrada zip64 escrita como flujo (firma, crc y dos Q)
+DESCRIPTOR_ZIP64 = 24
+
+VIDEO_FORMATOS = {
+    'mp4': ['-c:v', 'libx264', '-preset', 'veryfast', '-x264-params', 'nal-hrd=cbr',
+            '-movflags', '+faststart'],
+    'webm': ['-c:v', 'libvpx-vp9', '-deadline', 'realtime', '-cpu-used', '8'],
+}
+
+BANCOS = ["BCP", "INTERBANK", "BBVA", "SCOTIABANK", "BANBIF"]
+
+
+class SalidaConHash:
+    """Archivo de salida que calcula sha256 y cuenta bytes mientras se escribe.
+
+    No expone tell/seek, asi zipfile lo trata como flujo y escribe cada
+    entrada una sola vez (con data descriptor) sin volver atras.
+    """
+
+    def __init__(self, ruta):
+        self._archivo = open(ruta, 'wb')
+        self.sha256 = hashlib.sha256()
+        self.bytes = 0
+
+    def write(self, datos):
+        self._archivo.write(datos)
+        self.sha256.update(datos)
+        self.bytes += len(datos)
+        return len(datos)
+
+    def flush(self):
+        self._archivo.flush()
+
+    def close(self):
+        self._archivo.close()
+
+
+def _escribir_ceros(salida, cantidad):
+    for i in range(0, cantidad, TAMANO_BLOQUE):
+        salida.write(bytes(min(TAMANO_BLOQUE, cantidad - i)))
+
+
+def _con_digitos(total):
+    """(n, holgura) con n + len(str(n)) + holgura == total y holgura 0 o 1.
+
+    Sirve para campos que escriben su propio largo en decimal: al cruzar una
+    potencia de 10 hay un total que ningun n alcanza y sobra un byte.
+    """
+    n = total - len(str(total))
+    return n, total - n - len(str(n))
+
+
+def hash_archivo(ruta):
+    """(sha256, bytes) de un archivo leyendo por bloques"""
+    digest = hashlib.sha256()
+    total = 0
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(TAMANO_BLOQUE), b''):
+            digest.update(bloque)
+            total += len(bloque)
+    return digest.hexdigest(), total
+
+
+# ---------------------------------------------------------------------------
+# Escaneos (paginas JPEG)
+# ---------------------------------------------------------------------------
+
+def render_voucher(data, rng):
+    """Constancia de deposito bancario ficticia a nombre de la identidad"""
+    img = Image.new('RGB', (620, 900), 'white')
+    draw = ImageDraw.Draw(img)
+    banco = rng.choice(BANCOS)
+    draw.rectangle([0, 0, 620, 110], fill=(0, 51, 102))
+    draw.text((30, 30), banco, fill='white', font=get_font(44, 'negrita'))
+    draw.text((30, 150), "CONSTANCIA DE DEPOSITO", fill='black', font=get_font(30, 'negrita'))
+    lineas = [
+        ("Nro. operacion", f"{rng.randint(0, 99999999):08d}"),
+        ("Fecha", f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2025 "
+                  f"{rng.randint(8, 20):02d}:{rng.randint(0, 59):02d}"),
+        ("Cuenta", f"{rng.randint(100, 999)}-{rng.randint(1000000, 9999999)}-0-{rng.randint(10, 99)}"),
+        ("Titular", f"{data['nombres']} {data['apellido_paterno']}"),
+        ("DNI", data['dni']),
+        ("Monto", f"S/ {rng.randint(500, 50000):,}.{rng.randint(0, 99):02d}"),
+    ]
+    y = 230
+    for etiqueta, valor in lineas:
+        draw.text((30, y), etiqueta, fill=(90, 90, 90), font=get_font(20))
+        draw.text((30, y + 28), valor, fill='black', font=get_font(26, 'mono'))
+        y += 90
+    draw.line([30, y + 10, 590, y + 10], fill=(150, 150, 150), width=2)
+    draw.text((30, y + 30), "Conserve este comprobante", fill=(90, 90, 90), font=get_font(18))
+    return img
+
+
+class Escaner:
+    """Genera paginas A4 'escaneadas' en JPEG, una a la vez.
+
+    Las paginas alternan un DNI (frente y reverso) y un voucher; el ruido de
+    papel sale de unos pocos campos precalculados desplazados al azar, asi el
+    costo por pagina es una composicion y una codificacion JPEG.
+    """
+
+    def __init__(self, seed, quality=85):
+        self.rng = random.Random(f"{seed}:escaner")
+        self.quality = quality
+        self.identidades = MuestreadorIdentidades(seed).muestrear(sys.maxsize)
+        ruido_rng = np.random.default_rng([seed, 3])
+        ancho, alto = PAGINA_PX
+        self._ruido = ruido_rng.normal(0, 6, size=(CAMPOS_RUIDO, alto, ancho, 1)).astype(np.int16)
+
+    def pagina(self, numero):
+        """Devuelve (bytes JPEG, tipo) de la pagina `numero`"""
+        index, data = next(self.identidades)
+        pagina = Image.new('RGB', PAGINA_PX, (246, 245, 240))
+        if numero % 2 == 0:
+            tipo = 'dni'
+            _, caras, _ = render_dni_pair(index, data=data)
+            for i, img in enumerate(caras.values()):
+                img = img.rotate(self.rng.uniform(-2, 2), expand=True, fillcolor=(246, 245, 240))
+                pagina.paste(img, (190 + self.rng.randint(-20, 20), 180 + i * 760 + self.rng.randint(-20, 20)))
+        else:
+            tipo = 'voucher'
+            img = render_voucher(data, self.rng)
+            img = img.rotate(self.rng.uniform(-3, 3), expand=True, fillcolor=(246, 245, 240))
+            pagina.paste(img, (310 + self.rng.randint(-40, 40), 300 + self.rng.randint(-40, 40)))
+
+        ruido = np.roll(self._ruido[numero % CAMPOS_RUIDO], self.rng.randrange(PAGINA_PX[1]), axis=0)
+        arreglo = np.clip(np.asarray(pagina, dtype=np.int16) + ruido, 0, 255).astype(np.uint8)
+        buffer = io.BytesIO()
+        Image.fromarray(arreglo).save(buffer, 'JPEG', quality=self.quality)
+        return buffer.getvalue(), tipo
+
+
+# ---------------------------------------------------------------------------
+# PDF
+# ---------------------------------------------------------------------------
+
+class EscritorPDF:
+    """Escribe un PDF pagina a pagina sin retener las imagenes.
+
+    Cada pagina son tres objetos (imagen JPEG con /DCTDecode, contenido y
+    pagina); solo se guardan los offsets de cada objeto para la tabla xref y
+    el arbol de paginas (objeto 2) se escribe al final. close(objetivo)
+    agrega antes un stream de relleno sin referencias para terminar justo en
+    `objetivo` bytes.
+    """
+
+    def __init__(self, salida):
+        self.salida = salida
+        self.offsets = array('Q', [0, 0, 0])  # objeto 0 (libre), 1 (catalogo), 2 (paginas)
+        self.paginas = 0
+        self._escribir(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        self._objeto(1, b'<< /Type /Catalog /Pages 2 0 R >>')
+
+    def _escribir(self, datos):
+        self.salida.write(datos)
+
+    def _objeto(self, numero, cuerpo, stream=None):
+        self.offsets[numero] = self.salida.bytes
+        self._escribir(f'{numero} 0 obj\n'.encode() + cuerpo)
+        if stream is not None:
+            self._escribir(b'\nstream\n')
+            self._escribir(stream)
+            self._escribir(b'\nendstream')
+        self._escribir(b'\nendobj\n')
+
+    def agregar_pagina(self, jpeg, ancho_px, alto_px):
+        imagen, contenido, pagina = (len(self.offsets) + i for i in range(3))
+        self.offsets.extend([0, 0, 0])
+        ancho, alto = PAGINA_PT
+        self._objeto(imagen, (f'<< /Type /XObject /Subtype /Image /Width {ancho_px} /Height {alto_px} '
+                              f'/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /DCTDecode '
+                              f'/Length {len(jpeg)} >>').encode(), jpeg)
+        dibujo = f'q {ancho} 0 0 {alto} 0 0 cm /Im0 Do Q'.encode()
+        self._objeto(contenido, f'<< /Length {len(dibujo)} >>'.encode(), dibujo)
+        self._objeto(pagina, (f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {ancho} {alto}] '
+                              f'/Resources << /XObject << /Im0 {imagen} 0 R >> >> '
+                              f'/Contents {contenido} 0 R >>').encode())
+        self.paginas += 1
+
+    def reserva(self, jpeg):
+        """Cota de lo que crece el archivo si `jpeg` se agrega como pagina y luego se cierra"""
+        return (len(jpeg) + BYTES_PAGINA_PDF + 16 * (self.paginas + 1)
+                + 20 * (len(self.offsets) + 4) + 512)
+
+    def close(self, objetivo=None):
+        relleno = None
+        if objetivo is not None:
+            relleno = len(self.offsets)
+            self.offsets.append(0)
+        total = len(self.offsets)
+        kids = ' '.join(f'{5 + 3 * i} 0 R' for i in range(self.paginas))
+        paginas = f'<< /Type /Pages /Kids [{kids}] /Count {self.paginas} >>'.encode()
+        holgura = 0
+        if relleno is not None:
+            # objetivo = inicio_xref + xref + trailer, y el trailer lleva inicio_xref en decimal
+            cola = (len(f'xref\n0 {total}\n') + 20 * total
+                    + len(f'trailer\n<< /Size {total} /Root 1 0 R >>\nstartxref\n\n%%EOF\n'))
+            inicio_xref, holgura = _con_digitos(objetivo - cola)
+            # el relleno termina donde empieza el objeto 2
+            fijo = len(f'{relleno} 0 obj\n<< /Length  >>\nstream\n\nendstream\nendobj\n')
+            disponible = inicio_xref - len(f'2 0 obj\n\nendobj\n') - len(paginas) - self.salida.bytes - fijo
+            if disponible < 1:
+                raise ValueError(f"{objetivo} bytes no alcanzan para el PDF ({self.paginas} paginas)")
+            largo, espacio = _con_digitos(disponible)
+            self.offsets[relleno] = self.salida.bytes
+            self._escribir(f'{relleno} 0 obj\n<< /Length {largo}{" " * espacio} >>\nstream\n'.encode())
+            _escribir_ceros(self.salida, largo)
+            self._escribir(b'\nendstream\nendobj\n')
+        self._objeto(2, paginas)
+        inicio_xref = self.salida.bytes
+        self._escribir(f'xref\n0 {total}\n0000000000 65535 f \n'.encode())
+        for i in range(1, total, 4096):
+            self._escribir(''.join(f'{o:010d} 00000 n \n' for o in self.offsets[i:i + 4096]).encode())
+        self._escribir(f'trailer\n<< /Size {total} /Root 1 0 R{" " * holgura} >>\n'
+                       f'startxref\n{inicio_xref}\n%%EOF\n'.encode())
+
+
+def generar_pdf(ruta, objetivo, seed, quality):
+    salida = SalidaConHash(ruta)
+    pdf = EscritorPDF(salida)
+    escaner = Escaner(seed, quality)
+    tipos = {'dni': 0, 'voucher': 0}
+    for numero in count():
+        jpeg, tipo = escaner.pagina(numero)
+        if salida.bytes + pdf.reserva(jpeg) > objetivo:
+            break
+        pdf.agregar_pagina(jpeg, *PAGINA_PX)
+        tipos[tipo] += 1
+    relleno = objetivo - salida.bytes
+    pdf.close(objetivo)
+    salida.close()
+    return salida, {'paginas': pdf.paginas, 'paginas_por_tipo': tipos, 'relleno_bytes': relleno,
+                    'jpeg_quality': quality}
+
+
+# ---------------------------------------------------------------------------
+# ZIP
+# ---------------------------------------------------------------------------
+
+def _cierre_zip(entradas, inicio_directorio):
+    """Bytes del directorio central y registros finales que escribe zipfile (sin comentario).
+
+    Replica ZipFile._write_end_record para entradas almacenadas de menos de
+    2 GB: el offset de cabecera va en un extra zip64 cuando supera
+    ZIP64_LIMIT, igual que los registros zip64 de fin de archivo.
+    """
+    directorio = sum(46 + len(info.filename.encode())
+                     + (12 if info.header_offset > zipfile.ZIP64_LIMIT else 0) for info in entradas)
+    zip64 = (len(entradas) > zipfile.ZIP_FILECOUNT_LIMIT or inicio_directorio > zipfile.ZIP64_LIMIT
+             or directorio > zipfile.ZIP64_LIMIT)
+    return directorio + (56 + 20 if zip64 else 0) + 22
+
+
+def generar_zip(ruta, objetivo, seed, quality):
+    salida = SalidaConHash(ruta)
+    escaner = Escaner(seed, quality)
+    entradas = 0
+    with zipfile.ZipFile(salida, 'w', compression=zipfile.ZIP_STORED) as zf:
+        for numero in count():
+            jpeg, tipo = escaner.pagina(numero)
+            # la pagina, su entrada y la de relleno, mas el directorio de todas
+            if salida.bytes + len(jpeg) + BYTES_ENTRADA_ZIP * (entradas + 3) + 56 + 20 + 22 > objetivo:
+                break
+            info = zipfile.ZipInfo(f'escaneos/{numero + 1:06d}-{tipo}.jpg', date_time=(2025, 1, 1, 0, 0, 0))
+            with zf.open(info, 'w', force_zip64=True) as entrada:
+                for i in range(0, len(jpeg), TAMANO_BLOQUE):
+                    entrada.write(jpeg[i:i + TAMANO_BLOQUE])
+            entradas += 1
+
+        # Relleno: entrada almacenada hasta casi el objetivo y el comentario del
+        # archivo para los bytes de los registros zip64 que aparecen o no segun
+        # donde caiga el directorio central
+        relleno = objetivo - salida.bytes
+        info = zipfile.ZipInfo('relleno.bin', date_time=(2025, 1, 1, 0, 0, 0))
+        with zf.open(info, 'w', force_zip64=True) as entrada:
+            datos = salida.bytes
+            lista = zf.infolist() + [info]
+            largo = objetivo - datos - DESCRIPTOR_ZIP64 - _cierre_zip(lista, datos)
+            inicio = datos + largo + DESCRIPTOR_ZIP64
+            largo -= max(0, inicio + _cierre_zip(lista, inicio) - objetivo)
+            if largo < 0:
+                raise ValueError(f"{objetivo} bytes no alcanzan para el ZIP ({entradas} entradas)")
+            _escribir_ceros(entrada, largo)
+        inicio = datos + largo + DESCRIPTOR_ZIP64
+        zf.comment = b' ' * (objetivo - inicio - _cierre_zip(lista, inicio))
+    salida.close()
+    return salida, {'entradas': entradas, 'relleno_bytes': relleno, 'jpeg_quality': quality}
+
+
+# ---------------------------------------------------------------------------
+# Video
+# ---------------------------------------------------------------------------
+
+def frames_video(seed, ancho, alto, fps):
+    """Frames RGB: tarjetas DNI que se desplazan sobre un fondo con ruido de sensor"""
+    rng = np.random.default_rng([seed, 4])
+    identidades = MuestreadorIdentidades(seed).muestrear(sys.maxsize)
+    fondo = np.empty((alto, ancho, 3), dtype=np.uint8)
+    fondo[:] = (70, 60, 50)
+    ruido = rng.integers(-12, 13, size=(CAMPOS_RUIDO, alto, ancho, 3), dtype=np.int16)
+    escala = min(ancho / 2, alto / 1.6) / 856
+
+    tarjetas = []
+    for numero in count():
+        if numero % (fps * 4) == 0:
+            index, data = next(identidades)
+            _, caras, _ = render_dni_pair(index, data=data)
+            tarjetas = [np.asarray(img.resize((int(img.width * escala), int(img.height * escala))))
+                        for img in caras.values()]
+        tarjeta = tarjetas[(numero // (fps * 2)) % 2]
+        h, w = tarjeta.shape[:2]
+        t = numero / fps
+        x = int((ancho - w) / 2 * (1 + 0.8 * np.sin(t * 0.7)))
+        y = int((alto - h) / 2 * (1 + 0.8 * np.cos(t * 0.5)))
+        frame = fondo.copy()
+        frame[y:y + h, x:x + w] = tarjeta
+        frame = np.clip(frame + ruido[numero % CAMPOS_RUIDO], 0, 255).astype(np.uint8)
+        yield frame.tobytes()
+
+
+def generar_video(ruta, objetivo, seed, formato, bitrate_kbps, ancho, alto, fps):
+    ffmpeg = shutil.which('ffmpeg')
+    if ffmpeg is None:
+        raise SystemExit("El tipo video requiere ffmpeg en el PATH")
+    bitrate = bitrate_kbps * 1000
+    duracion = objetivo * 8 / bitrate
+    total_frames = max(1, int(duracion * fps))
+    comando = [ffmpeg, '-y', '-loglevel', 'error',
+               '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f'{ancho}x{alto}', '-r', str(fps), '-i', '-',
+               *VIDEO_FORMATOS[formato],
+               '-b:v', str(bitrate), '-minrate', str(bitrate), '-maxrate', str(bitrate),
+               '-bufsize', str(bitrate), '-pix_fmt', 'yuv420p', '-an', ruta]
+    proceso = subprocess.Popen(comando, stdin=subprocess.PIPE)
+    try:
+        for frame in islice(frames_video(seed, ancho, alto, fps), total_frames):
+            proceso.stdin.write(frame)
+    finally:
+        proceso.stdin.close()
+        codigo = proceso.wait()
+    if codigo != 0:
+        raise SystemExit(f"ffmpeg termino con codigo {codigo}")
+    sha256, total = hash_archivo(ruta)
+    detalle = {'formato': formato, 'frames': total_frames, 'fps': fps, 'resolucion': [ancho, alto],
+               'duracion_s': round(total_frames / fps, 3), 'bitrate_kbps': bitrate_kbps}
+    return sha256, total, detalle
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Genera archivos grandes para probar subidas')
+    parser.add_argument('--tipo', nargs='+', choices=['pdf', 'video', 'zip'], default=['pdf'],
+                        help='Tipos de archivo a generar (default: pdf)')
+    parser.add_argument('--size-mb', type=float, nargs='+', default=[100],
+                        help='Tamanos objetivo en MiB, exactos para pdf y zip; '
+                             'un archivo por tipo y tamano (default: 100)')
+    parser.add_argument('--seed', type=int, default=None, help='Semilla para resultados reproducibles')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR,
+                        help='Directorio de salida (default: docs/test-assets/large)')
+    parser.add_argument('--quality', type=int, default=85, help='Calidad JPEG de los escaneos (default: 85)')
+    parser.add_argument('--video-format', choices=sorted(VIDEO_FORMATOS), default='mp4')
+    parser.add_argument('--video-bitrate-kbps', type=int, default=8000,
+                        help='Bitrate constante del video; fija la duracion (default: 8000)')
+    parser.add_argument('--video-size', default='1280x720', help='Resolucion del video (default: 1280x720)')
+    parser.add_argument('--fps', type=int, default=25)
+    parser.add_argument('--manifest', default=None,
+                        help='Ruta del manifest JSONL (default: <output-dir>/manifest.jsonl)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+    ancho, alto = (int(v) for v in args.video_size.lower().split('x'))
+    os.makedirs(args.output_dir, exist_ok=True)
+    ruta_manifest = args.manifest or os.path.join(args.output_dir, 'manifest.jsonl')
+    manifest = ManifestWriter(ruta_manifest)
+
+    print("=" * 60)
+    print("GENERADOR DE ARCHIVOS GRANDES PARA PRUEBAS DE SUBIDA")
+    print("=" * 60)
+    print(f"Tipos: {', '.join(args.tipo)} | Tamanos: {', '.join(f'{s:g}' for s in args.size_mb)} MiB"
+          f" | Seed: {seed}")
+
+    for tipo in args.tipo:
+        for size_mb in args.size_mb:
+            objetivo = int(size_mb * 1024 * 1024)
+            extension = args.video_format if tipo == 'video' else tipo
+            nombre = f'payload-{tipo}-{size_mb:g}mb.{extension}'
+            ruta = os.path.join(args.output_dir, nombre)
+            inicio = time.perf_counter()
+            if tipo == 'video':
+                sha256, total, detalle = generar_video(ruta, objetivo, seed, args.video_format,
+                                                       args.video_bitrate_kbps, ancho, alto, args.fps)
+            else:
+                generar = generar_pdf if tipo == 'pdf' else generar_zip
+                salida, detalle = generar(ruta, objetivo, seed, args.quality)
+                sha256, total = salida.sha256.hexdigest(), salida.bytes
+            elapsed = time.perf_counter() - inicio
+
+            manifest.write({
+                'archivo': nombre,
+                'tipo': tipo,
+                'bytes': total,
+                'sha256': sha256,
+                'objetivo_bytes': objetivo,
+                'supera_limite': total > LIMITE_SUBIDA,
+                'seed': seed,
+                'detalle': detalle,
+                'segundos': round(elapsed, 2),
+            })
+            print(f"  {nombre}: {total:,} bytes en {elapsed:.1f}s ({total / elapsed / 2 ** 20:.1f} MiB/s)"
+                  + (" [supera 2 GB]" if total > LIMITE_SUBIDA else ""))
+    manifest.close()
+
+    print("=" * 60)
+    print(f"Ubicacion: {args.output_dir}")
+    print(f"Manifest: {ruta_manifest}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,257 +6,170 @@ Crea imagenes de DNI (frente y reverso) con datos ficticios
 para testing del OCR con GPT-4 Vision.
 
 Uso: python generate_synthetic_dni.py
+     python generate_synthetic_dni.py --count 50000 --workers 8 --seed 42
+
+Con --output-mode tar las imagenes se empaquetan en shards tar de tamano fijo,
+cada uno con un indice de offsets (ver dni_shards.py).
+
+Con --format se elige PNG (--png-compress-level), JPEG o WebP (--quality) o
+RGB crudo (por defecto PNG, o JPEG con --augment); la codificacion y
+escritura corren en un pool acotado de hilos por worker (--encode-threads).
+
+Con --augment los renders pasan por una etapa de aumentacion por lotes en
+NumPy (perspectiva, rotacion, blur, ruido, glare y recompresion JPEG) que
+imita fotos de celular; los parametros de cada cara quedan en el manifest
+(ver dni_augment.py). Con salida JPEG la recompresion sorteada es la misma
+escritura del archivo.
+
+Cada par se escribe al vuelo en un manifest JSONL (opcionalmente Parquet) con
+sus datos, archivos u offsets en shards y la caja en pixeles de cada campo
+dibujado, para medir la precision del OCR campo por campo (ver dni_manifest.py).
+
+El codigo de barras del reverso es un Code128 real que codifica el numero de
+DNI (ver dni_barcode.py). Requiere Pillow y NumPy.
+
+El diseno de la tarjeta sale de un layout declarativo compilado una vez por
+worker (--layout clasico|electronico, ver dni_layouts.py).
+
+Cada registro del manifest lleva un hash de (version del generador, layout,
+seed, indice, encoder, aumentacion); al re-ejecutar en modo files se saltan
+los pares cuyo hash coincide y cuyos archivos existen (--force regenera todo).
+
+Las identidades se sortean por bloques columnares con NumPy en el proceso
+principal, con DNI unicos en la corrida y su digito de verificacion (ver
+dni_sampler.py); la ubicacion sale de un sorteo alias ponderado por
+poblacion sobre la tabla de ubigeos (ver dni_ubigeo.py, --ubigeo-csv). Un
+mismo (seed, indice) produce los mismos bytes sin importar los workers.
 """
 
-from PIL import Image, ImageDraw, ImageFont
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import islice
+import argparse
 import os
 import random
-from datetime import datetime, timedelta
+import sys
+import time
+from datetime import datetime
+
+import dni_augment
+import dni_barcode
+import dni_encoders
+import dni_layouts
+import dni_sampler
+import dni_ubigeo
+from dni_augment import aplicar_homografia, aumentar_lote, muestrear_parametros, recomprimir_jpeg, rng_aumentacion
+from dni_encoders import FORMATOS, Encoder, EscritorAsincrono
+from dni_layouts import LAYOUTS, plan_layout
+from dni_manifest import ManifestPrevio, ManifestWriter, hash_muestra, version_generador
+from dni_sampler import (
+    APELLIDOS,
+    CALLES,
+    FECHA_REFERENCIA,
+    NOMBRES_FEMENINOS,
+    NOMBRES_MASCULINOS,
+    MuestreadorIdentidades,
+    digito_verificacion,
+)
+from dni_shards import ShardWriter
+from dni_ubigeo import cargar_tabla
 
 # Configuracion
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), '..', 'docs', 'test-assets', 'dni')
 
-# Datos ficticios para generar DNIs variados
-NOMBRES_MASCULINOS = [
-    "CARLOS ALBERTO", "JOSE LUIS", "MIGUEL ANGEL", "JUAN PABLO",
-    "ROBERTO CARLOS", "PEDRO ANTONIO"
-]
-
-NOMBRES_FEMENINOS = [
-    "MARIA ELENA", "ANA LUCIA", "ROSA MARIA", "CARMEN JULIA",
-    "LUCIA FERNANDA", "PATRICIA ISABEL"
-]
-
-APELLIDOS = [
-    "GARCIA", "RODRIGUEZ", "MARTINEZ", "LOPEZ", "GONZALEZ",
-    "HERNANDEZ", "PEREZ", "SANCHEZ", "RAMIREZ", "TORRES",
-    "FLORES", "RIVERA", "MORALES", "ORTIZ", "CHAVEZ",
-    "CASTILLO", "VASQUEZ", "ROJAS", "MENDOZA", "SILVA"
-]
-
-DEPARTAMENTOS = ["LIMA", "AREQUIPA", "CUSCO", "LA LIBERTAD", "PIURA", "CALLAO"]
-PROVINCIAS = {
-    "LIMA": ["LIMA", "HUARAL", "CANTA"],
-    "AREQUIPA": ["AREQUIPA", "CAMANA", "ISLAY"],
-    "CUSCO": ["CUSCO", "URUBAMBA", "CALCA"],
-    "LA LIBERTAD": ["TRUJILLO", "ASCOPE", "PACASMAYO"],
-    "PIURA": ["PIURA", "SULLANA", "TALARA"],
-    "CALLAO": ["CALLAO"]
-}
-
-DISTRITOS = {
-    "LIMA": ["MIRAFLORES", "SAN ISIDRO", "SURCO", "LA MOLINA", "SAN BORJA", "LINCE"],
-    "AREQUIPA": ["CAYMA", "YANAHUARA", "CERRO COLORADO", "SACHACA"],
-    "CUSCO": ["WANCHAQ", "SAN SEBASTIAN", "SANTIAGO"],
-    "TRUJILLO": ["TRUJILLO", "VICTOR LARCO", "HUANCHACO"],
-    "PIURA": ["PIURA", "CASTILLA", "CATACAOS"],
-    "CALLAO": ["CALLAO", "BELLAVISTA", "LA PERLA", "LA PUNTA"]
-}
-
-CALLES = ["AV. LARCO", "JR. PUNO", "CALLE LOS OLIVOS", "AV. AREQUIPA",
-          "JR. CUSCO", "AV. BRASIL", "CALLE LIMA", "JR. TACNA",
-          "AV. JAVIER PRADO", "CALLE SAN MARTIN"]
-
-def generate_dni_number():
+# Pares que se envian a cada worker por tarea (amortiza el costo de IPC)
+LOTE_POR_TAREA = 32
+
+# Maximo de pares impresos en detalle y en el resumen final
+RESUMEN_MAX = 20
+
+# Codigo que determina los bytes de cada imagen (entra en el hash de cada muestra)
+MODULOS_RENDER = [__file__, dni_augment.__file__, dni_barcode.__file__,
+                  dni_encoders.__file__, dni_layouts.__file__, dni_sampler.__file__,
+                  dni_ubigeo.__file__]
+
+def derivar_rng(seed, index):
+    """Crea el RNG propio de un indice a partir de la semilla global"""
+    if seed is None:
+        return random.Random()
+    return random.Random(f"{seed}:{index}")
+
+def generate_dni_number(rng):
     """Genera numero de DNI aleatorio de 8 digitos"""
-    return str(random.randint(10000000, 99999999))
+    return str(rng.randint(10000000, 99999999))
 
-def generate_birth_date():
+def generate_birth_date(rng):
     """Genera fecha de nacimiento aleatoria (18-70 anos)"""
-    today = datetime.now()
-    age = random.randint(18, 70)
-    birth_year = today.year - age
-    birth_month = random.randint(1, 12)
-    birth_day = random.randint(1, 28)
+    age = rng.randint(18, 70)
+    birth_year = FECHA_REFERENCIA.year - age
+    birth_month = rng.randint(1, 12)
+    birth_day = rng.randint(1, 28)
     return datetime(birth_year, birth_month, birth_day)
 
-def generate_address():
+def generate_address(rng):
     """Genera direccion aleatoria"""
-    calle = random.choice(CALLES)
-    numero = random.randint(100, 2000)
+    calle = rng.choice(CALLES)
+    numero = rng.randint(100, 2000)
     return f"{calle} {numero}"
 
-def get_font(size=20):
-    """Obtiene fuente, usa default si no hay fuentes del sistema"""
-    try:
-        # Intenta usar Arial o una fuente similar
-        return ImageFont.truetype("arial.ttf", size)
-    except:
-        try:
-            return ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", size)
-        except:
-            return ImageFont.load_default()
-
-def create_dni_frente(data, filename):
-    """Crea imagen del frente del DNI"""
-    # Dimensiones del DNI (tarjeta ID3)
-    width, height = 856, 540
-
-    # Crear imagen con fondo azul claro
-    img = Image.new('RGB', (width, height), color=(240, 248, 255))
-    draw = ImageDraw.Draw(img)
-
-    # Fuentes
-    font_title = get_font(24)
-    font_label = get_font(14)
-    font_data = get_font(18)
-    font_dni = get_font(32)
-
-    # Header
-    draw.rectangle([(0, 0), (width, 80)], fill=(0, 51, 102))
-    draw.text((width//2, 20), "REPUBLICA DEL PERU", fill='white', font=font_title, anchor='mt')
-    draw.text((width//2, 50), "DOCUMENTO NACIONAL DE IDENTIDAD", fill='white', font=font_label, anchor='mt')
-
-    # Foto placeholder (rectangulo gris)
-    photo_x, photo_y = 40, 100
-    photo_w, photo_h = 180, 220
-    draw.rectangle([(photo_x, photo_y), (photo_x + photo_w, photo_y + photo_h)],
-                   fill=(200, 200, 200), outline=(100, 100, 100), width=2)
-    draw.text((photo_x + photo_w//2, photo_y + photo_h//2), "FOTO",
-              fill=(100, 100, 100), font=font_title, anchor='mm')
-
-    # Datos personales
-    data_x = 250
-    y = 100
-    line_height = 45
-
-    # DNI (grande y destacado)
-    draw.rectangle([(data_x, y), (width - 40, y + 50)], fill=(255, 255, 220), outline=(0, 51, 102))
-    draw.text((data_x + 10, y + 5), "DNI", fill=(0, 51, 102), font=font_label)
-    draw.text((data_x + 60, y + 8), data['dni'], fill=(0, 51, 102), font=font_dni)
-
-    y += 60
-
-    # Apellido Paterno
-    draw.text((data_x, y), "APELLIDO PATERNO", fill=(100, 100, 100), font=font_label)
-    draw.text((data_x, y + 15), data['apellido_paterno'], fill=(0, 0, 0), font=font_data)
-    y += line_height
-
-    # Apellido Materno
-    draw.text((data_x, y), "APELLIDO MATERNO", fill=(100, 100, 100), font=font_label)
-    draw.text((data_x, y + 15), data['apellido_materno'], fill=(0, 0, 0), font=font_data)
-    y += line_height
-
-    # Nombres
-    draw.text((data_x, y), "NOMBRES", fill=(100, 100, 100), font=font_label)
-    draw.text((data_x, y + 15), data['nombres'], fill=(0, 0, 0), font=font_data)
-    y += line_height
-
-    # Fecha de nacimiento
-    draw.text((data_x, y), "FECHA DE NACIMIENTO", fill=(100, 100, 100), font=font_label)
-    draw.text((data_x, y + 15), data['fecha_nacimiento'], fill=(0, 0, 0), font=font_data)
-    y += line_height
-
-    # Sexo
-    draw.text((data_x, y), "SEXO", fill=(100, 100, 100), font=font_label)
-    draw.text((data_x, y + 15), data['sexo'], fill=(0, 0, 0), font=font_data)
-
-    # Footer
-    draw.rectangle([(0, height - 40), (width, height)], fill=(0, 51, 102))
-    draw.text((width//2, height - 20), "REGISTRO NACIONAL DE IDENTIFICACION Y ESTADO CIVIL",
-              fill='white', font=font_label, anchor='mm')
+def create_dni_frente(data, filename=None, verbose=True, cajas=None, layout='clasico'):
+    """Crea imagen del frente del DNI con el plan compilado del layout.
+
+    Si se indica `filename` la guarda como PNG; siempre devuelve la imagen.
+    Si se pasa un dict en `cajas`, se llena con la caja de cada campo dibujado.
+    """
+    img = plan_layout(layout)['frente'].render(data, cajas)
 
     # Guardar
-    img.save(filename, 'PNG', quality=95)
-    print(f"  Creado: {os.path.basename(filename)}")
-
-def create_dni_reverso(data, filename):
-    """Crea imagen del reverso del DNI"""
-    width, height = 856, 540
-
-    # Crear imagen con fondo crema
-    img = Image.new('RGB', (width, height), color=(255, 253, 245))
-    draw = ImageDraw.Draw(img)
-
-    # Fuentes
-    font_title = get_font(20)
-    font_label = get_font(12)
-    font_data = get_font(16)
-
-    # Header
-    draw.rectangle([(0, 0), (width, 50)], fill=(0, 51, 102))
-    draw.text((width//2, 25), "DIRECCION DOMICILIARIA", fill='white', font=font_title, anchor='mm')
-
-    y = 70
-    line_height = 55
-    margin = 40
-
-    # Ubigeo
-    draw.text((margin, y), "UBIGEO", fill=(100, 100, 100), font=font_label)
-    draw.text((margin, y + 15), data['ubigeo'], fill=(0, 0, 0), font=font_data)
-    y += line_height
-
-    # Departamento
-    draw.text((margin, y), "DEPARTAMENTO", fill=(100, 100, 100), font=font_label)
-    draw.text((margin, y + 15), data['departamento'], fill=(0, 0, 0), font=font_data)
-    y += line_height
-
-    # Provincia
-    draw.text((margin, y), "PROVINCIA", fill=(100, 100, 100), font=font_label)
-    draw.text((margin, y + 15), data['provincia'], fill=(0, 0, 0), font=font_data)
-    y += line_height
-
-    # Distrito
-    draw.text((margin, y), "DISTRITO", fill=(100, 100, 100), font=font_label)
-    draw.text((margin, y + 15), data['distrito'], fill=(0, 0, 0), font=font_data)
-    y += line_height
-
-    # Direccion
-    draw.text((margin, y), "DIRECCION", fill=(100, 100, 100), font=font_label)
-    draw.text((margin, y + 15), data['direccion'], fill=(0, 0, 0), font=font_data)
-    y += line_height + 20
-
-    # Codigo de barras simulado
-    barcode_y = y
-    barcode_height = 60
-    draw.rectangle([(margin, barcode_y), (width - margin, barcode_y + barcode_height)],
-                   fill='white', outline=(0, 0, 0))
-
-    # Simular barras
-    x = margin + 10
-    while x < width - margin - 10:
-        bar_width = random.randint(1, 4)
-        if random.random() > 0.5:
-            draw.rectangle([(x, barcode_y + 5), (x + bar_width, barcode_y + barcode_height - 5)],
-                          fill='black')
-        x += bar_width + random.randint(1, 3)
-
-    # Footer
-    draw.rectangle([(0, height - 40), (width, height)], fill=(0, 51, 102))
-    draw.text((width//2, height - 20), "RENIEC", fill='white', font=font_title, anchor='mm')
+    if filename:
+        img.save(filename, 'PNG')
+        if verbose:
+            print(f"  Creado: {os.path.basename(filename)}")
+    return img
+
+def create_dni_reverso(data, filename=None, verbose=True, cajas=None, layout='clasico'):
+    """Crea imagen del reverso del DNI con el plan compilado del layout.
+
+    Si se indica `filename` la guarda como PNG; siempre devuelve la imagen.
+    Si se pasa un dict en `cajas`, se llena con la caja de cada campo dibujado.
+    """
+    img = plan_layout(layout)['reverso'].render(data, cajas)
 
     # Guardar
-    img.save(filename, 'PNG', quality=95)
-    print(f"  Creado: {os.path.basename(filename)}")
+    if filename:
+        img.save(filename, 'PNG')
+        if verbose:
+            print(f"  Creado: {os.path.basename(filename)}")
+    return img
 
-def generate_synthetic_dni_pair(index):
-    """Genera un par de DNI (frente y reverso) con datos aleatorios"""
+def generar_datos_dni(rng):
+    """Genera los datos ficticios de una persona usando el RNG del indice.
+
+    Camino escalar para pares sueltos; las corridas usan MuestreadorIdentidades.
+    """
     # Determinar sexo
-    sexo = random.choice(['M', 'F'])
+    sexo = rng.choice(['M', 'F'])
 
     # Generar datos
     if sexo == 'M':
-        nombres = random.choice(NOMBRES_MASCULINOS)
+        nombres = rng.choice(NOMBRES_MASCULINOS)
     else:
-        nombres = random.choice(NOMBRES_FEMENINOS)
-
-    apellido_paterno = random.choice(APELLIDOS)
-    apellido_materno = random.choice([a for a in APELLIDOS if a != apellido_paterno])
+        nombres = rng.choice(NOMBRES_FEMENINOS)
 
-    departamento = random.choice(DEPARTAMENTOS)
-    provincia = random.choice(PROVINCIAS.get(departamento, [departamento]))
+    apellido_paterno = rng.choice(APELLIDOS)
+    apellido_materno = rng.choice([a for a in APELLIDOS if a != apellido_paterno])
 
-    # Para distritos, buscar en el diccionario
-    distrito_key = provincia if provincia in DISTRITOS else departamento
-    distrito = random.choice(DISTRITOS.get(distrito_key, ["CENTRO"]))
+    # Ubicacion consistente, ponderada por poblacion
+    tabla = cargar_tabla()
+    ubigeo, departamento, provincia, distrito = tabla.fila(tabla.muestrear_uno(rng))
 
-    birth_date = generate_birth_date()
-
-    # Generar ubigeo (6 digitos)
-    ubigeo = f"{random.randint(10, 25)}{random.randint(1, 99):02d}{random.randint(1, 99):02d}"
+    birth_date = generate_birth_date(rng)
 
+    dni = generate_dni_number(rng)
     data = {
-        'dni': generate_dni_number(),
+        'dni': dni,
+        'digito_verificacion': str(digito_verificacion(int(dni))),
         'nombres': nombres,
         'apellido_paterno': apellido_paterno,
         'apellido_materno': apellido_materno,
@@ -265,48 +178,363 @@ def generate_synthetic_dni_pair(index):
         'departamento': departamento,
         'provincia': provincia,
         'distrito': distrito,
-        'direccion': generate_address(),
+        'direccion': generate_address(rng),
         'ubigeo': ubigeo
     }
+    return data
 
-    # Crear archivos
-    frente_file = os.path.join(OUTPUT_DIR, f'dni-sintetico-{index:02d}-frente.png')
-    reverso_file = os.path.join(OUTPUT_DIR, f'dni-sintetico-{index:02d}-reverso.png')
+def nombre_archivo(index, cara, extension='.png'):
+    """Nombre de archivo (o de miembro del tar) para una cara del DNI"""
+    return f'dni-sintetico-{index:02d}-{cara}{extension}'
+
+def render_dni_pair(index, seed=None, layout='clasico', reutilizar=False, data=None):
+    """Genera datos e imagenes de un par en memoria con el layout indicado.
+
+    Devuelve (data, {'frente': img, 'reverso': img}, {'frente': cajas, 'reverso': cajas}).
+    Si se pasa `data` (p. ej. de MuestreadorIdentidades) no se sortean datos.
+    Con `reutilizar` las imagenes son lienzos del pool del layout y deben
+    devolverse con `liberar_lienzo` cuando ya no se usen.
+    """
+    if data is None:
+        data = generar_datos_dni(derivar_rng(seed, index))
+    cajas = {'frente': {}, 'reverso': {}}
+    if reutilizar:
+        plan = plan_layout(layout)
+        caras = {cara: plan[cara].render_en_lienzo(data, cajas[cara]) for cara in ('frente', 'reverso')}
+        return data, caras, cajas
+    caras = {
+        'frente': create_dni_frente(data, cajas=cajas['frente'], layout=layout),
+        'reverso': create_dni_reverso(data, cajas=cajas['reverso'], layout=layout),
+    }
+    return data, caras, cajas
+
+def liberar_lienzo(layout, cara, img):
+    """Devuelve al pool de su cara un lienzo obtenido con render_dni_pair(reutilizar=True)"""
+    plan_layout(layout)[cara].liberar(img)
 
+def _imprimir_par(index, data, nombres):
     print(f"\nGenerando DNI #{index}: {data['nombres']} {data['apellido_paterno']}")
     print(f"  DNI: {data['dni']} | Sexo: {data['sexo']} | Nac: {data['fecha_nacimiento']}")
     print(f"  Ubicacion: {data['distrito']}, {data['provincia']}, {data['departamento']}")
+    for nombre in nombres:
+        print(f"  Creado: {nombre}")
 
-    create_dni_frente(data, frente_file)
-    create_dni_reverso(data, reverso_file)
+def generate_synthetic_dni_pair(index, seed=None, output_dir=OUTPUT_DIR, verbose=True, encoder=None,
+                                layout='clasico'):
+    """Genera un par de DNI (frente y reverso) con datos aleatorios"""
+    encoder = encoder or Encoder()
+    data, caras, _ = render_dni_pair(index, seed, layout)
 
+    # Crear archivos
+    nombres = []
+    for cara, img in caras.items():
+        nombre = nombre_archivo(index, cara, encoder.extension)
+        encoder.save(img, os.path.join(output_dir, nombre))
+        nombres.append(nombre)
+
+    if verbose:
+        _imprimir_par(index, data, nombres)
     return data
 
-def main():
+@dataclass
+class OpcionesGeneracion:
+    """Configuracion compartida por los workers de una corrida"""
+    seed: int = None
+    output_dir: str = OUTPUT_DIR
+    modo: str = 'files'
+    layout: str = 'clasico'
+    ubigeo_csv: str = None
+    encoder: Encoder = field(default_factory=Encoder)
+    hilos_encoder: int = 2
+    aumentar: bool = False
+    lote_aumentacion: int = 8
+    verbose: bool = False
+
+# Pool de codificacion propio de cada proceso worker (se crea al primer uso)
+_ESCRITOR = None
+
+def _escritor(hilos):
+    global _ESCRITOR
+    if _ESCRITOR is None:
+        _ESCRITOR = EscritorAsincrono(hilos)
+    return _ESCRITOR
+
+def _cajas_en_foto(cajas, h):
+    """Lleva las cajas del render a la foto aumentada (caja envolvente de las esquinas)"""
+    resultado = {}
+    for campo, (x0, y0, x1, y1) in cajas.items():
+        puntos = aplicar_homografia(h, [(x0, y0), (x1, y0), (x1, y1), (x0, y1)])
+        resultado[campo] = [round(float(v), 1) for v in (*puntos.min(axis=0), *puntos.max(axis=0))]
+    return resultado
+
+def _aumentar_renders(renders, opciones):
+    """Aplica la aumentacion por lotes a todas las caras renderizadas.
+
+    Reemplaza las imagenes en `caras` (los lienzos originales vuelven al pool)
+    y registra en la muestra los parametros de cada cara (incluida la
+    homografia aplicada) y las cajas ya transformadas. La recompresion JPEG
+    queda pendiente: la hace el pool de codificacion (ver _codificar_aumentada)
+    o, si la salida es JPEG, es la propia escritura.
+    """
+    pendientes = [(muestra, caras, cara) for muestra, caras in renders for cara in caras]
+    for desde in range(0, len(pendientes), opciones.lote_aumentacion):
+        grupo = pendientes[desde:desde + opciones.lote_aumentacion]
+        params = [muestrear_parametros(rng_aumentacion(opciones.seed, muestra['indice'], cara),
+                                       *caras[cara].size)
+                  for muestra, caras, cara in grupo]
+        imagenes, homografias = aumentar_lote([caras[cara] for _, caras, cara in grupo], params)
+        for (muestra, caras, cara), img, h, p in zip(grupo, imagenes, homografias, params):
+            liberar_lienzo(opciones.layout, cara, caras[cara])
+            caras[cara] = img
+            p['homografia'] = (h / h[2, 2]).round(8).ravel().tolist()
+            muestra.setdefault('aumentacion', {})[cara] = p
+            muestra.setdefault('cajas_foto', {})[cara] = _cajas_en_foto(muestra['cajas'][cara], h)
+
+def _codificar_aumentada(codificar, img, quality, *args):
+    """Recompresion JPEG de la foto aumentada y su codificacion final, en un hilo del pool"""
+    return codificar(recomprimir_jpeg(img, quality), *args)
+
+def _generar_lote(pares, opciones):
+    """Genera un lote de pares [(indice, data), ...] dentro de un worker.
+
+    El renderizado ocurre en este hilo sobre lienzos reutilizados y la
+    codificacion/escritura (y la recompresion JPEG de las fotos aumentadas,
+    que con salida JPEG se escribe directo con la calidad sorteada) se delega
+    al pool acotado de hilos, que devuelve cada lienzo al pool al terminar.
+    Se renderiza de a un par (o de a un lote de aumentacion), asi los lienzos
+    vivos no crecen con el lote.
+
+    Devuelve [(muestra, registros), ...] donde `muestra` es el registro del
+    manifest (data, archivos, cajas y, si aplica, aumentacion). En modo
+    'files' las imagenes ya quedaron en disco y `registros` va vacio; en
+    modo 'tar' trae los (cara, nombre, bytes) a empaquetar.
+    """
+    escritor = _escritor(opciones.hilos_encoder)
+    encoder = opciones.encoder
+
+    pares_por_grupo = max(1, opciones.lote_aumentacion // 2) if opciones.aumentar else 1
+
+    pendientes = []
+    for desde in range(0, len(pares), pares_por_grupo):
+        renders = []
+        for index, data in pares[desde:desde + pares_por_grupo]:
+            data, caras, cajas = render_dni_pair(index, opciones.seed, opciones.layout, reutilizar=True,
+                                                 data=data)
+            renders.append(({'indice': index, 'data': data, 'cajas': cajas}, caras))
+        if opciones.aumentar:
+            _aumentar_renders(renders, opciones)
+
+        for muestra, caras in renders:
+            futuros = []
+            for cara, img in caras.items():
+                nombre = nombre_archivo(muestra['indice'], cara, encoder.extension)
+                salida = encoder
+                if opciones.aumentar and encoder.formato == 'jpeg':
+                    # Una sola pasada JPEG: la escritura con la calidad sorteada es la recompresion
+                    salida = Encoder('jpeg', quality=muestra['aumentacion'][cara]['jpeg_quality'])
+                if opciones.modo == 'tar':
+                    codificar, destino = salida.encode, ()
+                else:
+                    codificar, destino = salida.save, (os.path.join(opciones.output_dir, nombre),)
+                if opciones.aumentar and salida is encoder:
+                    quality = muestra['aumentacion'][cara]['jpeg_quality']
+                    futuro = escritor.submit(_codificar_aumentada, codificar, img, quality, *destino)
+                else:
+                    futuro = escritor.submit(codificar, img, *destino)
+                if not opciones.aumentar:
+                    futuro.add_done_callback(
+                        lambda _, cara=cara, img=img: liberar_lienzo(opciones.layout, cara, img))
+                futuros.append((cara, nombre, futuro))
+            muestra['archivos'] = {cara: nombre for cara, nombre, _ in futuros}
+            pendientes.append((muestra, futuros))
+
+    resultados = []
+    for muestra, futuros in pendientes:
+        registros = [(cara, nombre, futuro.result()) for cara, nombre, futuro in futuros]
+        if opciones.verbose:
+            _imprimir_par(muestra['indice'], muestra['data'], muestra['archivos'].values())
+        resultados.append((muestra, registros if opciones.modo == 'tar' else []))
+    return resultados
+
+def _lotes(pares, tamano):
+    """Parte el iterable de pares (indice, data) en listas de `tamano`"""
+    pares = iter(pares)
+    while lote := list(islice(pares, tamano)):
+        yield lote
+
+def hash_indice(version, opciones, index):
+    """Hash de todo lo que determina los bytes del par `index` en esta corrida"""
+    return hash_muestra(version=version, layout=opciones.layout, seed=opciones.seed, indice=index,
+                        encoder=opciones.encoder.settings(), aumentar=opciones.aumentar,
+                        ubigeo=cargar_tabla(opciones.ubigeo_csv).huella)
+
+def _par_en_disco(output_dir, index, extension):
+    return all(os.path.exists(os.path.join(output_dir, nombre_archivo(index, cara, extension)))
+               for cara in ('frente', 'reverso'))
+
+def generar_en_paralelo(pares, workers, opciones):
+    """Reparte los pares (indice, data) en un pool de procesos y los entrega en orden.
+
+    Mantiene como maximo `workers * 4` lotes en vuelo para que la memoria no
+    crezca con el tamano del corpus.
+    """
+    lotes = _lotes(pares, LOTE_POR_TAREA)
+    if workers <= 1:
+        for lote in lotes:
+            yield from _generar_lote(lote, opciones)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        en_vuelo = deque()
+        for lote in lotes:
+            en_vuelo.append(executor.submit(_generar_lote, lote, opciones))
+            if len(en_vuelo) >= workers * 4:
+                yield from en_vuelo.popleft().result()
+        while en_vuelo:
+            yield from en_vuelo.popleft().result()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Generador de DNI sinteticos para pruebas de OCR')
+    parser.add_argument('--count', type=int, default=6,
+                        help='Cantidad de pares frente/reverso a generar (default: 6)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Procesos en paralelo; 0 usa todos los nucleos (default: 1)')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Semilla global; si se omite se elige una al azar y se imprime')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR,
+                        help='Directorio de salida (default: docs/test-assets/dni)')
+    parser.add_argument('--output-mode', choices=['files', 'tar'], default='files',
+                        help="'files' escribe un PNG por cara; 'tar' empaqueta en shards con indice")
+    parser.add_argument('--shard-size-mb', type=int, default=1024,
+                        help='Tamano maximo de cada shard tar en MiB (default: 1024)')
+    parser.add_argument('--layout', choices=sorted(LAYOUTS), default='clasico',
+                        help="Diseno de tarjeta: 'clasico' o 'electronico' (DNIe con MRZ) (default: clasico)")
+    parser.add_argument('--ubigeo-csv', default=None,
+                        help='Reemplaza la tabla de ubigeos (ubigeo, departamento, provincia, distrito, poblacion); '
+                             'default: la incluida con los 1893 distritos INEI (dni_ubigeo.csv)')
+    parser.add_argument('--format', choices=sorted(FORMATOS), default=None,
+                        help='Formato de salida de las imagenes (default: png, o jpeg con --augment)')
+    parser.add_argument('--png-compress-level', type=int, default=6, choices=range(10),
+                        metavar='0-9', help='Nivel de compresion zlib para PNG (default: 6)')
+    parser.add_argument('--quality', type=int, default=90,
+                        help='Calidad para JPEG/WebP (default: 90; con --augment y JPEG cada cara usa '
+                             'la calidad de recompresion sorteada)')
+    parser.add_argument('--encode-threads', type=int, default=2,
+                        help='Hilos de codificacion/escritura por worker (default: 2)')
+    parser.add_argument('--augment', action='store_true',
+                        help='Aplica aumentacion foto-realista (perspectiva, blur, ruido, glare, JPEG)')
+    parser.add_argument('--augment-batch', type=int, default=8,
+                        help='Imagenes por lote de aumentacion NumPy (default: 8)')
+    parser.add_argument('--manifest', default=None,
+                        help='Ruta del manifest JSONL (default: <output-dir>/manifest.jsonl)')
+    parser.add_argument('--parquet', action='store_true',
+                        help='Escribe tambien el manifest en Parquet (requiere pyarrow)')
+    parser.add_argument('--force', action='store_true',
+                        help='Regenera todo aunque el hash del manifest previo coincida (modo files)')
+    args = parser.parse_args(argv)
+    if args.format is None:
+        args.format = 'jpeg' if args.augment else 'png'
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    workers = args.workers or os.cpu_count() or 1
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+    verbose = args.count <= RESUMEN_MAX and args.output_mode == 'files'
+
     print("=" * 60)
     print("GENERADOR DE DNI SINTETICOS PARA PRUEBAS")
     print("=" * 60)
+    print(f"Pares: {args.count} | Workers: {workers} | Seed: {seed} | Formato: {args.format}"
+          f" | Layout: {args.layout}")
 
     # Crear directorio si no existe
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
-
-    # Generar 6 pares de DNI
-    all_data = []
-    for i in range(1, 7):
-        data = generate_synthetic_dni_pair(i)
-        all_data.append(data)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    shards = None
+    if args.output_mode == 'tar':
+        shards = ShardWriter(args.output_dir, 'dni-sintetico', args.shard_size_mb * 1024 * 1024)
+
+    opciones = OpcionesGeneracion(
+        seed=seed,
+        output_dir=args.output_dir,
+        modo=args.output_mode,
+        layout=args.layout,
+        ubigeo_csv=args.ubigeo_csv,
+        encoder=Encoder(args.format, compress_level=args.png_compress_level, quality=args.quality),
+        hilos_encoder=args.encode_threads,
+        aumentar=args.augment,
+        lote_aumentacion=args.augment_batch,
+        verbose=verbose,
+    )
+
+    # Regeneracion incremental: se saltan los pares cuyo hash coincide con el
+    # manifest previo y cuyos archivos siguen en disco (los shards tar se
+    # reescriben siempre)
+    ruta_manifest = args.manifest or os.path.join(args.output_dir, 'manifest.jsonl')
+    ruta_parquet = os.path.splitext(ruta_manifest)[0] + '.parquet' if args.parquet else None
+    version = version_generador(MODULOS_RENDER)
+    indices = range(1, args.count + 1)
+    vigentes = set()
+    previo = None
+    if args.output_mode == 'files' and not args.force:
+        previo = ManifestPrevio(ruta_manifest)
+        for index in indices:
+            if (previo.hash(index) == hash_indice(version, opciones, index)
+                    and _par_en_disco(args.output_dir, index, opciones.encoder.extension)):
+                vigentes.add(index)
+    # Las identidades se sortean en este proceso, en orden y para todos los
+    # indices (tambien los vigentes), asi la unicidad de DNI no depende de que se salte
+    muestreador = MuestreadorIdentidades(seed, tabla_ubigeo=cargar_tabla(args.ubigeo_csv))
+    pendientes = ((index, data) for index, data in muestreador.muestrear(args.count) if index not in vigentes)
+    generados = args.count - len(vigentes)
+    if vigentes:
+        print(f"Incremental: {len(vigentes)} pares sin cambios, {generados} por generar")
+    manifest = ManifestWriter(ruta_manifest, ruta_parquet)
+
+    resumen = []
+    total = 0
+    inicio = time.perf_counter()
+    resultados = generar_en_paralelo(pendientes, workers, opciones)
+    for index in indices:
+        total += 1
+        if index in vigentes:
+            muestra = previo.registro(index)
+        else:
+            muestra, registros = next(resultados)
+            for cara, nombre, contenido in registros:
+                muestra.setdefault('shards', {})[cara] = shards.add(nombre, contenido)
+            muestra['seed'] = seed
+            muestra['hash'] = hash_indice(version, opciones, index)
+        manifest.write(muestra)
+        if len(resumen) < RESUMEN_MAX:
+            resumen.append(muestra['data'])
+        if not verbose and total % 1000 == 0:
+            elapsed = time.perf_counter() - inicio
+            print(f"  {total}/{args.count} pares ({total / elapsed:.1f} pares/s)", file=sys.stderr)
+    elapsed = time.perf_counter() - inicio
+    manifest.close()
+    if previo is not None:
+        previo.close()
+    if shards is not None:
+        shards.close()
 
     print("\n" + "=" * 60)
-    print(f"COMPLETADO: {len(all_data)} pares de DNI generados")
-    print(f"Ubicacion: {OUTPUT_DIR}")
+    print(f"COMPLETADO: {total} pares de DNI ({generados} generados) en {elapsed:.1f}s")
+    print(f"Ubicacion: {args.output_dir}")
+    if shards is not None:
+        print(f"Shards tar: {len(shards.shards)} (indice de offsets en *.idx.jsonl)")
+    print(f"Manifest: {ruta_manifest}" + (f" + {ruta_parquet}" if ruta_parquet else ""))
     print("=" * 60)
 
     # Mostrar resumen
     print("\nRESUMEN DE DNIs GENERADOS:")
     print("-" * 60)
-    for i, d in enumerate(all_data, 1):
+    for i, d in enumerate(resumen, 1):
         print(f"{i}. {d['dni']} - {d['nombres']} {d['apellido_paterno']} {d['apellido_materno']}")
         print(f"   Sexo: {d['sexo']} | {d['distrito']}, {d['departamento']}")
+    if total > len(resumen):
+        print(f"... y {total - len(resumen)} pares mas")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Charts for the compliance informe, rendered headlessly with a disk cache (requires matplotlib).
+
+graficos_informe() turns the metrics of informe_metricas.py into chart
+specs (lead funnel, sold locales per project, vendedor ranking). Each spec
+is plain data: kind, title, labels and values. Its cache key is the sha256
+of the spec together with ESTILO and CACHE_VERSION, so a chart is rendered
+again only when its own data or the shared style changes.
+
+render_graficos() looks every chart up in the cache directory
+(<sha256>.png) and renders only the missing ones, in a process pool with
+matplotlib's Agg backend. Regenerating an informe where a few series moved
+re-renders just those charts.
+
+Usage: python informe_graficos.py snapshot.db --output-dir graficos/
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import io
+import json
+import os
+import time
+
+from informe_metricas import calcular_metricas
+
+try:
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib.figure import Figure
+    from matplotlib.ticker import FuncFormatter
+except ImportError:
+    raise SystemExit('Informe charts require matplotlib: pip install matplotlib')
+
+# Bump when render_grafico() changes in a way the spec and style do not capture
+CACHE_VERSION = 1
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'informe-graficos')
+
+# Shared style of the informe charts (colors of the informe tables)
+ESTILO = {
+    'ancho_in': 6.5,
+    'alto_in': 3.6,
+    'dpi': 150,
+    'fuente': 'DejaVu Sans',
+    'colores': ['#1B967A', '#1565C0', '#2E7D32', '#F9A825', '#C62828'],
+    'texto': '#333333',
+}
+
+# Bars in the vendedor ranking
+TOP_VENDEDORES = 10
+
+
+def graficos_informe(metricas):
+    """Chart specs for the informe; charts without data are left out"""
+    graficos = [{
+        'clave': 'embudo_leads',
+        'tipo': 'embudo',
+        'titulo': 'Embudo de leads',
+        'etiquetas': ['Leads capturados', 'Leads Victoria (IA)', 'Asistieron al proyecto', 'Locales vendidos'],
+        'valores': [metricas['total_leads'], metricas['leads_victoria'], metricas['leads_asistieron'],
+                    metricas['locales_vendidos']],
+    }]
+    if metricas['vendidos_por_proyecto']:
+        graficos.append({
+            'clave': 'ventas_por_proyecto',
+            'tipo': 'barras',
+            'titulo': 'Locales vendidos por proyecto',
+            'etiquetas': list(metricas['vendidos_por_proyecto']),
+            'valores': list(metricas['vendidos_por_proyecto'].values()),
+        })
+    if metricas['vendidos_por_vendedor']:
+        ranking = list(metricas['vendidos_por_vendedor'].items())[:TOP_VENDEDORES]
+        graficos.append({
+            'clave': 'ranking_vendedores',
+            'tipo': 'ranking',
+            'titulo': f'Top {len(ranking)} vendedores por locales vendidos',
+            'etiquetas': [nombre for nombre, _ in ranking],
+            'valores': [n for _, n in ranking],
+        })
+    return graficos
+
+
+def grafico_hash(grafico):
+    """Cache key of a chart: its data, the shared style and the renderer version"""
+    payload = json.dumps({'grafico': grafico, 'estilo': ESTILO, 'version': CACHE_VERSION},
+                         sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def render_grafico(grafico):
+    """PNG bytes of one chart, drawn with the Agg backend"""
+    matplotlib.rcParams['font.family'] = ESTILO['fuente']
+    colores = ESTILO['colores']
+    figure = Figure(figsize=(ESTILO['ancho_in'], ESTILO['alto_in']), dpi=ESTILO['dpi'])
+    ax = figure.add_subplot()
+    etiquetas, valores = grafico['etiquetas'], grafico['valores']
+
+    if grafico['tipo'] == 'embudo':
+        # Centered bars, widest at the top
+        posiciones = range(len(valores) - 1, -1, -1)
+        maximo = max(valores) or 1
+        ax.barh(list(posiciones), valores, left=[(maximo - v) / 2 for v in valores],
+                color=[colores[i % len(colores)] for i in range(len(valores))], height=0.7)
+        for y, valor in zip(posiciones, valores):
+            # Inside the bar when it fits, else beside it
+            if valor > maximo * 0.2:
+                ax.text(maximo / 2, y, f'{valor:,}', ha='center', va='center', fontsize=9,
+                        color='white', fontweight='bold')
+            else:
+                ax.text((maximo + valor) / 2, y, f' {valor:,}', ha='left', va='center', fontsize=9,
+                        color=ESTILO['texto'], fontweight='bold')
+        ax.set_yticks(list(posiciones), etiquetas, fontsize=8)
+        ax.set_xlim(0, maximo)
+        ax.tick_params(axis='y', length=0)
+        ax.xaxis.set_visible(False)
+        for spine in ax.spines.values():
+            spine.set_visible(False)
+    elif grafico['tipo'] == 'ranking':
+        posiciones = range(len(valores) - 1, -1, -1)
+        ax.barh(list(posiciones), valores, color=colores[1], height=0.7)
+        ax.set_yticks(list(posiciones), etiquetas, fontsize=8)
+        for y, valor in zip(posiciones, valores):
+            ax.text(valor, y, f' {valor:,}', va='center', fontsize=8, color=ESTILO['texto'])
+        ax.xaxis.set_major_formatter(FuncFormatter(lambda v, _: f'{v:,.0f}'))
+        ax.spines[['top', 'right']].set_visible(False)
+    else:
+        ax.bar(range(len(valores)), valores, color=colores[0])
+        ax.set_xticks(range(len(valores)), etiquetas, rotation=35, ha='right', fontsize=8)
+        ax.yaxis.set_major_formatter(FuncFormatter(lambda v, _: f'{v:,.0f}'))
+        ax.spines[['top', 'right']].set_visible(False)
+
+    ax.set_title(grafico['titulo'], fontsize=11, fontweight='bold', color=ESTILO['texto'])
+    figure.tight_layout()
+    output = io.BytesIO()
+    # No timestamps or software tags, so the same spec gives the same bytes
+    figure.savefig(output, format='png', metadata={'Software': None})
+    return output.getvalue()
+
+
+def render_graficos(graficos, cache_dir=DEFAULT_CACHE_DIR, workers=0):
+    """PNG paths of the charts, in order, rendering only those not in the cache.
+
+    Returns (paths, rendered) where rendered is the number of charts drawn
+    in this call; workers=0 uses one process per missing chart, up to the
+    number of cores.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    paths = [os.path.join(cache_dir, f'{grafico_hash(g)}.png') for g in graficos]
+    pendientes = [(g, path) for g, path in zip(graficos, paths) if not os.path.exists(path)]
+    if not pendientes:
+        return paths, 0
+
+    workers = min(workers or os.cpu_count() or 1, len(pendientes))
+    if workers <= 1:
+        imagenes = map(render_grafico, [g for g, _ in pendientes])
+        _guardar(pendientes, imagenes)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            _guardar(pendientes, executor.map(render_grafico, [g for g, _ in pendientes]))
+    return paths, len(pendientes)
+
+
+def _guardar(pendientes, imagenes):
+    for (_, path), png in zip(pendientes, imagenes):
+        temporary = f'{path}.{os.getpid()}.tmp'
+        with open(temporary, 'wb') as f:
+            f.write(png)
+        os.replace(temporary, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render the informe charts from a data snapshot')
+    parser.add_argument('snapshot', help='SQLite file or directory of <tabla>.parquet / <tabla>.csv exports')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f'Chart cache directory (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--workers', type=int, default=0, help='Render processes; 0 uses all cores (default: 0)')
+    parser.add_argument('--output-dir', default=None, help='Also copy the charts here as <clave>.png')
+    args = parser.parse_args()
+
+    graficos = graficos_informe(calcular_metricas(args.snapshot))
+    start = time.perf_counter()
+    paths, rendered = render_graficos(graficos, args.cache_dir, args.workers)
+    print(f'Graficos: {len(paths)} ({rendered} renderizados, {len(paths) - rendered} desde cache) '
+          f'en {time.perf_counter() - start:.2f}s')
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+        for grafico, path in zip(graficos, paths):
+            target = os.path.join(args.output_dir, f"{grafico['clave']}.png")
+            with open(path, 'rb') as source, open(target, 'wb') as f:
+                f.write(source.read())
+            print(f'Grafico generado: {target}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Platform metrics for the compliance informe, computed from a local snapshot.
+
+A snapshot is either a SQLite file or a directory of exports, one file per
+table (<tabla>.parquet or <tabla>.csv), with the Supabase table and column
+names:
+
+    leads       estado, utm, created_at, asistio
+    locales     estado, proyecto_id, vendedor_cerro_venta_id
+    usuarios    rol, activo
+    ventas      match_type, monto_venta      (optional; ventas_externas also accepted)
+    proyectos   id, nombre, activo           (optional; else distinct locales.proyecto_id)
+    vendedores  id, nombre                   (optional; names for the vendedor ranking)
+
+Besides the totals, the sold locales (ROJO) are counted per project and per
+vendedor_cerro_venta_id for the charts of informe_graficos.py, labelled with
+the proyectos and vendedores names when those tables are present.
+
+Only these columns are read and every table is aggregated as a stream, so
+memory does not grow with the snapshot:
+
+- SQLite: one aggregate query per table, run inside the engine.
+- Parquet: record batches of the needed columns, aggregated with
+  pyarrow.compute (requires pyarrow).
+- CSV: the same batches through pyarrow's streaming CSV reader when pyarrow
+  is installed, else the csv module row by row.
+
+A Victoria lead follows esLeadVictoria() of lib/actions-atribucion-fichas.ts:
+a bot conversation estado, or a utm with "facebook_form" or "victoria", or a
+numeric Meta id.
+
+Usage: python informe_metricas.py snapshot.db
+       python informe_metricas.py exports/2025-01/ --json
+"""
+import argparse
+from collections import Counter
+import csv
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+
+# Estados set by the bot during the conversation (VICTORIA_ESTADOS in lib/actions-atribucion-fichas.ts)
+VICTORIA_ESTADOS = ('en_conversacion', 'lead_completo', 'lead_incompleto', 'conversacion_abandonada')
+
+# Roles counted as active sellers
+VENDEDOR_ROLES = ('vendedor', 'vendedor_caseta')
+
+# A sold local is in ROJO
+ESTADO_VENDIDO = 'rojo'
+
+COLUMNAS = {
+    'leads': ('estado', 'utm', 'created_at', 'asistio'),
+    'locales': ('estado', 'proyecto_id', 'vendedor_cerro_venta_id'),
+    'usuarios': ('rol', 'activo'),
+    'ventas': ('match_type', 'monto_venta'),
+    'proyectos': ('id', 'nombre', 'activo'),
+    'vendedores': ('id', 'nombre'),
+}
+OPCIONALES = ('ventas', 'proyectos', 'vendedores')
+
+# Alternative table names, as exported from Supabase
+ALIAS = {'ventas': ('ventas', 'ventas_externas')}
+
+# Rows per record batch for Parquet and CSV
+BATCH_ROWS = 65536
+
+NUMERIC_UTM_RE = re.compile(r'^\d+$')
+TRUE_VALUES = ('true', 't', '1', 'yes')
+
+
+def es_lead_victoria(utm, estado):
+    """Same rule as esLeadVictoria() of lib/actions-atribucion-fichas.ts"""
+    if estado and estado in VICTORIA_ESTADOS:
+        return True
+    if not utm:
+        return False
+    utm_lower = utm.lower()
+    return 'facebook_form' in utm_lower or 'victoria' in utm_lower or bool(NUMERIC_UTM_RE.match(utm))
+
+
+def _metricas_vacias():
+    return {
+        'total_leads': 0, 'leads_victoria': 0, 'leads_asistieron': 0, 'ultimo_lead': None,
+        'locales': 0, 'locales_vendidos': 0, 'proyectos_activos': 0,
+        'usuarios': 0, 'vendedores_activos': 0,
+        'ventas': None, 'ventas_victoria': None, 'monto_ventas': None,
+        'vendidos_por_proyecto': {}, 'vendidos_por_vendedor': {},
+    }
+
+
+def _con_nombres(conteo, nombres):
+    """{label: count} sorted by count, with ids replaced by their names when known"""
+    etiquetas = Counter()
+    for key, n in conteo.items():
+        if key is None or key == '':
+            continue
+        etiquetas[nombres.get(str(key)) or str(key)] += n
+    return dict(sorted(etiquetas.items(), key=lambda item: (-item[1], item[0])))
+
+
+def _max(current, value):
+    if value is None or value == '':
+        return current
+    value = str(value)
+    return value if current is None or value > current else current
+
+
+# SQLite
+
+def _sqlite_tabla(connection, tabla):
+    names = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view')")}
+    for name in ALIAS.get(tabla, (tabla,)):
+        if name in names:
+            return name
+    return None
+
+
+def metricas_sqlite(path):
+    """Metrics of a SQLite snapshot, each table aggregated by one query"""
+    connection = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    try:
+        tablas = {}
+        for tabla in COLUMNAS:
+            tablas[tabla] = _sqlite_tabla(connection, tabla)
+            if tablas[tabla] is None and tabla not in OPCIONALES:
+                raise ValueError(f'{path}: missing table {tabla}')
+
+        victoria_estados = ', '.join('?' * len(VICTORIA_ESTADOS))
+        metricas = _metricas_vacias()
+        row = connection.execute(f"""
+            SELECT COUNT(*),
+                   COALESCE(SUM(estado IN ({victoria_estados})
+                                OR instr(lower(utm), 'facebook_form') > 0
+                                OR instr(lower(utm), 'victoria') > 0
+                                OR (utm <> '' AND utm NOT GLOB '*[^0-9]*')), 0),
+                   MAX(created_at),
+                   COALESCE(SUM(lower(CAST(asistio AS TEXT)) IN ('true', 't', '1', 'yes')), 0)
+            FROM "{tablas['leads']}" """, VICTORIA_ESTADOS).fetchone()
+        metricas['total_leads'], metricas['leads_victoria'] = row[0], row[1]
+        metricas['ultimo_lead'] = _max(None, row[2])
+        metricas['leads_asistieron'] = row[3]
+
+        row = connection.execute(f"""
+            SELECT COUNT(*), COALESCE(SUM(estado = ?), 0), COUNT(DISTINCT proyecto_id)
+            FROM "{tablas['locales']}" """, (ESTADO_VENDIDO,)).fetchone()
+        metricas['locales'], metricas['locales_vendidos'], metricas['proyectos_activos'] = row
+        por_proyecto, por_vendedor = (dict(connection.execute(f"""
+            SELECT {column}, COUNT(*) FROM "{tablas['locales']}" WHERE estado = ? GROUP BY {column}""",
+            (ESTADO_VENDIDO,)).fetchall()) for column in ('proyecto_id', 'vendedor_cerro_venta_id'))
+
+        active = "lower(CAST(activo AS TEXT)) IN ('true', 't', '1', 'yes')"
+        roles = ', '.join('?' * len(VENDEDOR_ROLES))
+        row = connection.execute(f"""
+            SELECT COALESCE(SUM({active}), 0), COALESCE(SUM({active} AND rol IN ({roles})), 0)
+            FROM "{tablas['usuarios']}" """, VENDEDOR_ROLES).fetchone()
+        metricas['usuarios'], metricas['vendedores_activos'] = row
+
+        nombres = {}
+        for tabla in ('proyectos', 'vendedores'):
+            nombres[tabla] = {}
+            if tablas[tabla]:
+                nombres[tabla] = {str(key): name for key, name in connection.execute(
+                    f'SELECT id, nombre FROM "{tablas[tabla]}"')}
+        metricas['vendidos_por_proyecto'] = _con_nombres(por_proyecto, nombres['proyectos'])
+        metricas['vendidos_por_vendedor'] = _con_nombres(por_vendedor, nombres['vendedores'])
+
+        if tablas['proyectos']:
+            metricas['proyectos_activos'] = connection.execute(
+                f'SELECT COALESCE(SUM({active}), 0) FROM "{tablas["proyectos"]}"').fetchone()[0]
+        if tablas['ventas']:
+            row = connection.execute(f"""
+                SELECT COUNT(*), COALESCE(SUM(match_type = 'victoria'), 0), COALESCE(SUM(monto_venta), 0)
+                FROM "{tablas['ventas']}" """).fetchone()
+            metricas['ventas'], metricas['ventas_victoria'] = row[0], row[1]
+            metricas['monto_ventas'] = round(float(row[2]), 2)
+        return metricas
+    finally:
+        connection.close()
+
+
+# Parquet and CSV exports
+
+def _archivo(directorio, tabla):
+    for name in ALIAS.get(tabla, (tabla,)):
+        for extension in ('.parquet', '.csv'):
+            path = os.path.join(directorio, name + extension)
+            if os.path.exists(path):
+                return path
+    return None
+
+
+def _arrow():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _arrow_batches(path, columnas):
+    """Record batches with only `columnas`, read as a stream"""
+    import pyarrow as pa
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        parquet = pq.ParquetFile(path)
+        missing = set(columnas) - set(parquet.schema_arrow.names)
+        if missing:
+            raise ValueError(f"{path}: missing columns {', '.join(sorted(missing))}")
+        yield from parquet.iter_batches(batch_size=BATCH_ROWS, columns=list(columnas))
+        return
+    import pyarrow.csv as pacsv
+    with open(path, 'rb') as f:
+        header = next(csv.reader([f.readline().decode('utf-8-sig')]))
+    missing = set(columnas) - set(header)
+    if missing:
+        raise ValueError(f"{path}: missing columns {', '.join(sorted(missing))}")
+    reader = pacsv.open_csv(
+        path,
+        read_options=pacsv.ReadOptions(block_size=1 << 22),
+        convert_options=pacsv.ConvertOptions(include_columns=list(columnas),
+                                             column_types={c: pa.string() for c in columnas},
+                                             strings_can_be_null=True),
+    )
+    yield from reader
+
+
+def _arrow_true(column):
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    if pa.types.is_boolean(column.type):
+        return pc.fill_null(column, False)
+    text = pc.utf8_lower(pc.cast(column, pa.string()))
+    return pc.fill_null(pc.is_in(text, value_set=pa.array(TRUE_VALUES)), False)
+
+
+def _arrow_count(mask):
+    import pyarrow.compute as pc
+    return pc.sum(pc.cast(mask, 'int64')).as_py() or 0
+
+
+def _arrow_tabla(metricas, tabla, batch):
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    if tabla == 'leads':
+        estado = batch.column('estado')
+        utm = pc.cast(batch.column('utm'), pa.string())
+        utm_lower = pc.utf8_lower(utm)
+        victoria = pc.or_kleene(
+            pc.is_in(pc.cast(estado, pa.string()), value_set=pa.array(VICTORIA_ESTADOS)),
+            pc.or_kleene(pc.or_kleene(pc.match_substring(utm_lower, 'facebook_form'),
+                                      pc.match_substring(utm_lower, 'victoria')),
+                         pc.match_substring_regex(utm, NUMERIC_UTM_RE.pattern)))
+        metricas['total_leads'] += batch.num_rows
+        metricas['leads_victoria'] += _arrow_count(pc.fill_null(victoria, False))
+        metricas['ultimo_lead'] = _max(metricas['ultimo_lead'], pc.max(batch.column('created_at')).as_py())
+        metricas['leads_asistieron'] += _arrow_count(_arrow_true(batch.column('asistio')))
+    elif tabla == 'locales':
+        vendido = pc.fill_null(pc.equal(pc.cast(batch.column('estado'), pa.string()), ESTADO_VENDIDO), False)
+        metricas['locales'] += batch.num_rows
+        metricas['locales_vendidos'] += _arrow_count(vendido)
+        metricas['_proyectos'].update(pc.unique(batch.column('proyecto_id')).to_pylist())
+        vendidos = batch.filter(vendido)
+        for column, conteo in (('proyecto_id', '_por_proyecto'), ('vendedor_cerro_venta_id', '_por_vendedor')):
+            for entry in pc.value_counts(vendidos.column(column)).to_pylist():
+                metricas[conteo][entry['values']] += entry['counts']
+    elif tabla == 'usuarios':
+        activo = _arrow_true(batch.column('activo'))
+        vendedor = pc.fill_null(pc.is_in(pc.cast(batch.column('rol'), pa.string()),
+                                         value_set=pa.array(VENDEDOR_ROLES)), False)
+        metricas['usuarios'] += _arrow_count(activo)
+        metricas['vendedores_activos'] += _arrow_count(pc.and_(activo, vendedor))
+    elif tabla == 'ventas':
+        metricas['ventas'] += batch.num_rows
+        metricas['ventas_victoria'] += _arrow_count(
+            pc.fill_null(pc.equal(pc.cast(batch.column('match_type'), pa.string()), 'victoria'), False))
+        monto = pc.sum(pc.cast(batch.column('monto_venta'), pa.float64())).as_py()
+        metricas['monto_ventas'] += monto or 0
+    elif tabla == 'proyectos':
+        metricas['proyectos_activos'] += _arrow_count(_arrow_true(batch.column('activo')))
+        metricas['_nombres_proyectos'].update(_arrow_nombres(batch))
+    else:
+        metricas['_nombres_vendedores'].update(_arrow_nombres(batch))
+
+
+def _arrow_nombres(batch):
+    return {str(key): name for key, name in zip(batch.column('id').to_pylist(), batch.column('nombre').to_pylist())}
+
+
+def _csv_tabla(metricas, tabla, path):
+    """Row-by-row aggregation with the csv module (no pyarrow)"""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        missing = set(COLUMNAS[tabla]) - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f"{path}: missing columns {', '.join(sorted(missing))}")
+        if tabla == 'leads':
+            total = victoria = asistieron = 0
+            ultimo = metricas['ultimo_lead']
+            for row in reader:
+                total += 1
+                if es_lead_victoria(row['utm'], row['estado']):
+                    victoria += 1
+                if row['asistio'].lower() in TRUE_VALUES:
+                    asistieron += 1
+                if row['created_at'] and (ultimo is None or row['created_at'] > ultimo):
+                    ultimo = row['created_at']
+            metricas['total_leads'] += total
+            metricas['leads_victoria'] += victoria
+            metricas['leads_asistieron'] += asistieron
+            metricas['ultimo_lead'] = ultimo
+        elif tabla == 'locales':
+            for row in reader:
+                metricas['locales'] += 1
+                if row['proyecto_id']:
+                    metricas['_proyectos'].add(row['proyecto_id'])
+                if row['estado'] == ESTADO_VENDIDO:
+                    metricas['locales_vendidos'] += 1
+                    metricas['_por_proyecto'][row['proyecto_id'] or None] += 1
+                    metricas['_por_vendedor'][row['vendedor_cerro_venta_id'] or None] += 1
+        elif tabla == 'usuarios':
+            for row in reader:
+                if row['activo'].lower() in TRUE_VALUES:
+                    metricas['usuarios'] += 1
+                    metricas['vendedores_activos'] += row['rol'] in VENDEDOR_ROLES
+        elif tabla == 'ventas':
+            for row in reader:
+                metricas['ventas'] += 1
+                metricas['ventas_victoria'] += row['match_type'] == 'victoria'
+                metricas['monto_ventas'] += float(row['monto_venta'] or 0)
+        elif tabla == 'proyectos':
+            for row in reader:
+                metricas['proyectos_activos'] += row['activo'].lower() in TRUE_VALUES
+                metricas['_nombres_proyectos'][row['id']] = row['nombre']
+        else:
+            metricas['_nombres_vendedores'].update((row['id'], row['nombre']) for row in reader)
+
+
+def metricas_directorio(directorio):
+    """Metrics of a directory of Parquet/CSV exports, streamed table by table"""
+    arrow = _arrow()
+    metricas = _metricas_vacias()
+    metricas.update(_proyectos=set(), _por_proyecto=Counter(), _por_vendedor=Counter(),
+                    _nombres_proyectos={}, _nombres_vendedores={})
+    archivos = {tabla: _archivo(directorio, tabla) for tabla in COLUMNAS}
+    for tabla, path in archivos.items():
+        if path is None:
+            if tabla not in OPCIONALES:
+                raise ValueError(f'{directorio}: missing {tabla}.parquet or {tabla}.csv')
+            continue
+        if tabla == 'ventas':
+            metricas.update(ventas=0, ventas_victoria=0, monto_ventas=0.0)
+        if arrow:
+            for batch in _arrow_batches(path, COLUMNAS[tabla]):
+                _arrow_tabla(metricas, tabla, batch)
+        elif path.endswith('.parquet'):
+            raise SystemExit('Reading Parquet snapshots requires pyarrow: pip install pyarrow')
+        else:
+            _csv_tabla(metricas, tabla, path)
+    proyectos = metricas.pop('_proyectos')
+    metricas['vendidos_por_proyecto'] = _con_nombres(metricas.pop('_por_proyecto'), metricas.pop('_nombres_proyectos'))
+    metricas['vendidos_por_vendedor'] = _con_nombres(metricas.pop('_por_vendedor'), metricas.pop('_nombres_vendedores'))
+    proyectos.discard(None)
+    if archivos['proyectos'] is None:
+        metricas['proyectos_activos'] = len(proyectos)
+    if metricas['monto_ventas'] is not None:
+        metricas['monto_ventas'] = round(metricas['monto_ventas'], 2)
+    return metricas
+
+
+def calcular_metricas(snapshot):
+    """Metrics of a snapshot: a SQLite file or a directory of Parquet/CSV exports"""
+    if os.path.isdir(snapshot):
+        return metricas_directorio(snapshot)
+    return metricas_sqlite(snapshot)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compute the informe metrics from a data snapshot')
+    parser.add_argument('snapshot', help='SQLite file or directory of <tabla>.parquet / <tabla>.csv exports')
+    parser.add_argument('--json', action='store_true', help='Print the metrics as JSON')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    metricas = calcular_metricas(args.snapshot)
+    elapsed = time.perf_counter() - start
+    if args.json:
+        print(json.dumps(metricas, indent=2, ensure_ascii=False))
+    else:
+        for key, value in metricas.items():
+            print(f'{key:20} {value}')
+    print(f'Metricas calculadas en {elapsed:.2f}s', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
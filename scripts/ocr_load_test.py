@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga del OCR de DNI con pares sinteticos
+===================================================
+Reproduce pares frente/reverso generados por generate_synthetic_dni.py contra
+un endpoint HTTP con la forma de /api/ocr/extract (ver lib/actions-ocr.ts):
+
+    POST {"image": <base64>, "type": "dni" | "dni_reverso", "mimeType": "image/png"}
+    ->   {"success": true, "data": {...}, "type": "dni"}
+
+Dos subcomandos, solo con la libreria estandar (asyncio):
+
+- `serve`: servidor local que imita al endpoint. Reconoce cada imagen por su
+  sha256 contra el manifest del corpus y responde con el ground truth, con
+  latencia inyectable (lognormal), tasa de errores y tasa de campos
+  corruptos. Asi se dimensiona sin llamar a OpenAI.
+- `run`: driver de carga en lazo abierto. Lanza pares a una tasa objetivo
+  (constante o Poisson) con concurrencia y timeout acotados y reporta en JSON
+  percentiles de latencia (desde que el pedido obtiene conexion, sin la cola
+  local, y desde el instante planificado, con ella), errores por tipo y
+  precision por campo contra el manifest.
+
+Uso: python ocr_load_test.py serve --manifest docs/test-assets/dni/manifest.jsonl --latency-ms 900
+     python ocr_load_test.py run --url http://127.0.0.1:8765/api/ocr/extract --rate 10 --pairs 500
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import itertools
+import json
+import math
+import os
+import random
+import statistics
+import sys
+import time
+from urllib.parse import urlsplit
+
+from dni_manifest import leer_manifest
+from dni_shards import leer_registro
+
+MANIFEST_DEFAULT = os.path.join(os.path.dirname(__file__), '..', 'docs', 'test-assets', 'dni', 'manifest.jsonl')
+
+MIME_TYPES = {'.png': 'image/png', '.jpg': 'image/jpeg', '.webp': 'image/webp'}
+
+# Tipo de documento del endpoint para cada cara
+TIPOS = {'frente': 'dni', 'reverso': 'dni_reverso'}
+
+# Campo de la respuesta del OCR -> clave en data del manifest
+CAMPOS_OCR = {
+    'dni': {
+        'numero_dni': 'dni',
+        'nombres': 'nombres',
+        'apellido_paterno': 'apellido_paterno',
+        'apellido_materno': 'apellido_materno',
+        'fecha_nacimiento': 'fecha_nacimiento',
+        'sexo': 'sexo',
+    },
+    'dni_reverso': {
+        'departamento': 'departamento',
+        'provincia': 'provincia',
+        'distrito': 'distrito',
+        'direccion': 'direccion',
+        'ubigeo': 'ubigeo',
+    },
+}
+
+
+# --- Corpus ------------------------------------------------------------------
+
+def leer_imagen(directorio, registro, cara):
+    """Bytes de una cara del registro, desde archivo suelto o desde su shard tar"""
+    if 'shards' in registro:
+        entrada = registro['shards'][cara]
+        return leer_registro(os.path.join(directorio, entrada['shard']), entrada)
+    with open(os.path.join(directorio, registro['archivos'][cara]), 'rb') as f:
+        return f.read()
+
+
+def _mime(registro, cara):
+    extension = os.path.splitext(registro['archivos'][cara])[1].lower()
+    if extension not in MIME_TYPES:
+        raise SystemExit(f"Formato {extension} no soportado por el endpoint (use png, jpeg o webp)")
+    return MIME_TYPES[extension]
+
+
+def normalizar(campo, valor):
+    """Normaliza un valor para comparar OCR contra ground truth"""
+    if valor is None:
+        return ''
+    texto = ' '.join(str(valor).upper().split())
+    if campo == 'fecha_nacimiento':
+        # ground truth DD/MM/YYYY; el OCR devuelve YYYY-MM-DD (o DD-MM-YYYY)
+        partes = texto.replace('-', '/').split('/')
+        if len(partes) == 3 and len(partes[0]) == 4:
+            partes.reverse()
+        texto = '/'.join(partes)
+    return texto
+
+
+def respuesta_ocr(tipo, data):
+    """Payload `data` que devolveria el endpoint real para una cara"""
+    respuesta = {campo: data[clave] for campo, clave in CAMPOS_OCR[tipo].items()}
+    if tipo == 'dni':
+        dia, mes, anio = data['fecha_nacimiento'].split('/')
+        respuesta['fecha_nacimiento'] = f"{anio}-{mes}-{dia}"
+    respuesta['confianza'] = 95
+    return respuesta
+
+
+# --- HTTP minimo sobre asyncio -----------------------------------------------
+
+async def _leer_mensaje(reader):
+    """Lee primera linea, cabeceras y cuerpo (Content-Length o chunked) de un mensaje HTTP/1.1"""
+    primera = await reader.readline()
+    if not primera:
+        raise ConnectionResetError("conexion cerrada")
+    cabeceras = {}
+    while True:
+        linea = await reader.readline()
+        if linea in (b'\r\n', b'\n', b''):
+            break
+        nombre, _, valor = linea.decode('latin-1').partition(':')
+        cabeceras[nombre.strip().lower()] = valor.strip()
+
+    if cabeceras.get('transfer-encoding', '').lower() == 'chunked':
+        partes = []
+        while True:
+            tamano = int((await reader.readline()).split(b';')[0], 16)
+            if tamano == 0:
+                await reader.readline()
+                break
+            partes.append(await reader.readexactly(tamano))
+            await reader.readline()
+        cuerpo = b''.join(partes)
+    else:
+        cuerpo = await reader.readexactly(int(cabeceras.get('content-length', 0)))
+    return primera.decode('latin-1').strip(), cabeceras, cuerpo
+
+
+class ClienteHTTP:
+    """Pool de conexiones keep-alive a un solo host para POST de JSON"""
+
+    def __init__(self, url, conexiones):
+        partes = urlsplit(url)
+        self.host = partes.hostname
+        self.port = partes.port or (443 if partes.scheme == 'https' else 80)
+        self.ssl = partes.scheme == 'https'
+        self.path = (partes.path or '/') + (f'?{partes.query}' if partes.query else '')
+        self._libres = []
+        self._cupos = asyncio.Semaphore(conexiones)
+
+    async def post_json(self, payload, timeout=None):
+        """POST de `payload`; devuelve (status, json, instante en que se obtuvo conexion)
+
+        La espera por un cupo de conexion no cuenta: `timeout` y el instante
+        devuelto (time.perf_counter) arrancan recien con el cupo tomado.
+        """
+        cuerpo = json.dumps(payload).encode()
+        pedido = (f"POST {self.path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+                  f"Content-Type: application/json\r\nContent-Length: {len(cuerpo)}\r\n"
+                  f"Connection: keep-alive\r\n\r\n").encode() + cuerpo
+        async with self._cupos:
+            enviado = time.perf_counter()
+            estado, respuesta = await asyncio.wait_for(self._enviar(pedido), timeout)
+        return int(estado.split()[1]), json.loads(respuesta) if respuesta else {}, enviado
+
+    async def _enviar(self, pedido):
+        reader, writer = self._libres.pop() if self._libres else await asyncio.open_connection(
+            self.host, self.port, ssl=self.ssl or None)
+        try:
+            writer.write(pedido)
+            await writer.drain()
+            estado, cabeceras, respuesta = await _leer_mensaje(reader)
+        except BaseException:
+            writer.close()
+            raise
+        if cabeceras.get('connection', '').lower() == 'close':
+            writer.close()
+        else:
+            self._libres.append((reader, writer))
+        return estado, respuesta
+
+    async def close(self):
+        for _, writer in self._libres:
+            writer.close()
+        self._libres = []
+
+
+# --- Servidor stand-in -------------------------------------------------------
+
+class ServidorOCR:
+    """Imita /api/ocr/extract respondiendo con el ground truth del manifest"""
+
+    def __init__(self, manifest, latencia_ms, sigma, tasa_error, tasa_campo_erroneo, seed=None):
+        directorio = os.path.dirname(os.path.abspath(manifest))
+        self.verdad = {}
+        for registro in leer_manifest(manifest):
+            for cara in ('frente', 'reverso'):
+                digest = hashlib.sha256(leer_imagen(directorio, registro, cara)).hexdigest()
+                self.verdad[digest] = (TIPOS[cara], registro['data'])
+        self.latencia_ms = latencia_ms
+        self.sigma = sigma
+        self.tasa_error = tasa_error
+        self.tasa_campo_erroneo = tasa_campo_erroneo
+        self.rng = random.Random(seed)
+
+    async def responder(self, cuerpo):
+        """Devuelve (status, payload) para un pedido ya parseado"""
+        if self.latencia_ms > 0:
+            await asyncio.sleep(self.rng.lognormvariate(math.log(self.latencia_ms), self.sigma) / 1000)
+        if self.rng.random() < self.tasa_error:
+            return 500, {'success': False, 'error': 'Error de OpenAI: 429 - Rate limit reached (simulado)'}
+
+        imagen = base64.b64decode(cuerpo.get('image', ''))
+        encontrado = self.verdad.get(hashlib.sha256(imagen).hexdigest())
+        if encontrado is None or encontrado[0] != cuerpo.get('type'):
+            return 500, {'success': False, 'error': 'La imagen no corresponde a un documento valido'}
+
+        tipo, data = encontrado
+        respuesta = respuesta_ocr(tipo, data)
+        for campo in CAMPOS_OCR[tipo]:
+            if self.rng.random() < self.tasa_campo_erroneo:
+                respuesta[campo] = 'N/A'
+        return 200, {'success': True, 'data': respuesta, 'type': tipo}
+
+    async def atender(self, reader, writer):
+        try:
+            while True:
+                try:
+                    _, cabeceras, cuerpo = await _leer_mensaje(reader)
+                except (ConnectionResetError, asyncio.IncompleteReadError):
+                    break
+                try:
+                    estado, payload = await self.responder(json.loads(cuerpo))
+                except ValueError:
+                    estado, payload = 400, {'success': False, 'error': 'JSON invalido'}
+                datos = json.dumps(payload).encode()
+                writer.write((f"HTTP/1.1 {estado} {'OK' if estado == 200 else 'Error'}\r\n"
+                              f"Content-Type: application/json\r\nContent-Length: {len(datos)}\r\n"
+                              f"Connection: keep-alive\r\n\r\n").encode() + datos)
+                await writer.drain()
+                if cabeceras.get('connection', '').lower() == 'close':
+                    break
+        finally:
+            writer.close()
+
+
+async def servir(args):
+    servidor = ServidorOCR(args.manifest, args.latency_ms, args.latency_sigma, args.error_rate,
+                           args.field_error_rate, args.seed)
+    server = await asyncio.start_server(servidor.atender, args.host, args.port)
+    print(f"Stand-in OCR en http://{args.host}:{args.port}/api/ocr/extract "
+          f"({len(servidor.verdad)} imagenes conocidas, latencia mediana {args.latency_ms} ms)")
+    async with server:
+        await server.serve_forever()
+
+
+# --- Driver de carga ---------------------------------------------------------
+
+def _percentiles(valores):
+    if not valores:
+        return None
+    if len(valores) == 1:
+        return {'p50': round(valores[0], 2), 'p95': round(valores[0], 2), 'p99': round(valores[0], 2),
+                'max': round(valores[0], 2)}
+    cortes = statistics.quantiles(valores, n=100, method='inclusive')
+    return {'p50': round(cortes[49], 2), 'p95': round(cortes[94], 2), 'p99': round(cortes[98], 2),
+            'max': round(max(valores), 2)}
+
+
+class Metricas:
+    def __init__(self):
+        self.latencias = []
+        self.latencias_corregidas = []
+        self.errores = {}
+        self.exitos = 0
+        self.aciertos = {}
+        self.totales = {}
+
+    def error(self, tipo):
+        self.errores[tipo] = self.errores.get(tipo, 0) + 1
+
+    def comparar(self, tipo, data, respuesta):
+        for campo, clave in CAMPOS_OCR[tipo].items():
+            self.totales[campo] = self.totales.get(campo, 0) + 1
+            if normalizar(campo, respuesta.get(campo)) == normalizar(campo, data[clave]):
+                self.aciertos[campo] = self.aciertos.get(campo, 0) + 1
+
+    def resumen(self, duracion, planificados):
+        completados = self.exitos + sum(self.errores.values())
+        return {
+            'pedidos': planificados,
+            'completados': completados,
+            'exitos': self.exitos,
+            'errores': dict(sorted(self.errores.items())),
+            'duracion_s': round(duracion, 2),
+            'pedidos_por_segundo': round(completados / duracion, 2) if duracion else None,
+            'latencia_ms': _percentiles(self.latencias),
+            'latencia_corregida_ms': _percentiles(self.latencias_corregidas),
+            'precision_campos': {campo: round(self.aciertos.get(campo, 0) / total, 4)
+                                 for campo, total in self.totales.items()},
+        }
+
+
+async def _pedido(cliente, args, metricas, registro, cara, directorio, planificado):
+    tipo = TIPOS[cara]
+    imagen = await asyncio.to_thread(leer_imagen, directorio, registro, cara)
+    payload = {'image': base64.b64encode(imagen).decode(), 'type': tipo, 'mimeType': _mime(registro, cara)}
+    try:
+        estado, respuesta, enviado = await cliente.post_json(payload, args.timeout)
+    except asyncio.TimeoutError:
+        metricas.error('timeout')
+        return
+    except (OSError, asyncio.IncompleteReadError, ValueError) as exc:
+        metricas.error(type(exc).__name__)
+        return
+    fin = time.perf_counter()
+    metricas.latencias.append((fin - enviado) * 1000)
+    metricas.latencias_corregidas.append((fin - planificado) * 1000)
+    if estado != 200 or not respuesta.get('success'):
+        metricas.error(f'http_{estado}')
+        return
+    metricas.exitos += 1
+    metricas.comparar(tipo, registro['data'], respuesta.get('data') or {})
+
+
+async def conducir(args):
+    directorio = os.path.dirname(os.path.abspath(args.manifest))
+    registros = itertools.cycle(leer_manifest(args.manifest))
+    cliente = ClienteHTTP(args.url, args.concurrency)
+    metricas = Metricas()
+    rng = random.Random(args.seed)
+
+    inicio = time.perf_counter()
+    planificado = inicio
+    tareas = set()
+    for n in range(args.pairs):
+        registro = next(registros)
+        espera = planificado - time.perf_counter()
+        if espera > 0:
+            await asyncio.sleep(espera)
+        for cara in TIPOS:
+            tarea = asyncio.create_task(
+                _pedido(cliente, args, metricas, registro, cara, directorio, planificado))
+            tareas.add(tarea)
+            tarea.add_done_callback(tareas.discard)
+        planificado += rng.expovariate(args.rate) if args.poisson else 1 / args.rate
+        if args.progress and (n + 1) % args.progress == 0:
+            print(f"  {n + 1}/{args.pairs} pares lanzados, {len(tareas)} pedidos en vuelo", file=sys.stderr)
+    if tareas:
+        await asyncio.gather(*tareas)
+    duracion = time.perf_counter() - inicio
+    await cliente.close()
+
+    resultado = {
+        'config': {'url': args.url, 'pares': args.pairs, 'tasa_pares_s': args.rate, 'poisson': args.poisson,
+                   'concurrencia': args.concurrency, 'timeout_s': args.timeout},
+        **metricas.resumen(duracion, 2 * args.pairs),
+    }
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(texto + '\n')
+    print(texto)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Prueba de carga del OCR de DNI con pares sinteticos')
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    serve = sub.add_parser('serve', help='Servidor stand-in que responde con el ground truth')
+    serve.add_argument('--manifest', default=MANIFEST_DEFAULT, help='Manifest del corpus generado')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--latency-ms', type=float, default=800,
+                       help='Latencia mediana inyectada en ms (default: 800)')
+    serve.add_argument('--latency-sigma', type=float, default=0.35,
+                       help='Sigma de la lognormal de latencia (default: 0.35)')
+    serve.add_argument('--error-rate', type=float, default=0.0,
+                       help='Fraccion de pedidos que responden 500 (default: 0)')
+    serve.add_argument('--field-error-rate', type=float, default=0.0,
+                       help='Probabilidad de devolver N/A en cada campo (default: 0)')
+    serve.add_argument('--seed', type=int, default=None)
+
+    run = sub.add_parser('run', help='Driver de carga contra un endpoint OCR')
+    run.add_argument('--url', default='http://127.0.0.1:8765/api/ocr/extract')
+    run.add_argument('--manifest', default=MANIFEST_DEFAULT, help='Manifest del corpus a reproducir')
+    run.add_argument('--pairs', type=int, default=100, help='Pares frente/reverso a enviar (default: 100)')
+    run.add_argument('--rate', type=float, default=5.0, help='Pares por segundo objetivo (default: 5)')
+    run.add_argument('--poisson', action='store_true', help='Llegadas Poisson en lugar de tasa constante')
+    run.add_argument('--concurrency', type=int, default=32,
+                     help='Pedidos HTTP simultaneos maximos (default: 32)')
+    run.add_argument('--timeout', type=float, default=60.0, help='Timeout por pedido en s, desde que obtiene conexion (default: 60)')
+    run.add_argument('--seed', type=int, default=None, help='Semilla de las llegadas Poisson')
+    run.add_argument('--progress', type=int, default=0, help='Imprime avance cada N pares')
+    run.add_argument('--output', default=None, help='Escribe tambien el JSON en esta ruta')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        asyncio.run(servir(args) if args.comando == 'serve' else conducir(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,584 @@
+#!/usr/bin/env python3
+"""
+Precompiled renderer for the constancia .docx templates.
+
+Each template is compiled once: the `{...}` commands of word/document.xml
+(docx-templates syntax with cmdDelimiter ['{', '}'], as used by
+lib/actions-constancias.ts) are located with a regex and the XML is split
+into literal segments, field nodes and FOR/END-FOR loop nodes. Rendering a
+document is then a walk over that small tree that splices escaped values
+between the precompiled segments - no XML parsing and no python-docx object
+model per document.
+
+Supported commands:
+    {campo}, {a.b}                 top-level data fields
+    {$item.campo}                  fields of the current loop item
+    {FOR item IN lista} ... {END-FOR item}
+
+A FOR/END-FOR command that is alone in its paragraph (or table row) repeats
+the whole paragraphs (or rows) in between and the command paragraphs
+themselves are dropped; otherwise the loop repeats the inline XML between the
+two commands, like docx-templates does.
+
+The empty spacer paragraphs are removed at compile time, matching the
+removeEmptyParagraphs() post-processing of the server action.
+
+With `logo_url` in the payload (a path or URL of the project logo), the run
+holding the LOGO command becomes an inline picture of the logo as prepared by
+constancias_logo.py (requires Pillow): one word/media/logo.png part whose ZIP
+record is built once per logo and reused by every document of that project.
+Without it the run is left empty, like docx-templates does when the server
+action has no logo for the project.
+
+Only word/document.xml changes between constancias, so the other ZIP entries
+of the template are kept as their compressed bytes and copied as-is into each
+output. Templates are loaded from templates/constancias/ once per process and
+reloaded when the file's mtime and sha256 change (TemplateCache).
+
+Usage: python render_constancias.py separacion --data payload.json --output constancia.docx
+       python render_constancias.py abono --logo logo-proyecto.png --output constancia.docx
+       python render_constancias.py cancelacion --bench 2000
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import struct
+import sys
+import time
+import zipfile
+import zlib
+from xml.sax.saxutils import escape
+
+from constancias_layout import CONSTANCIAS, LOGO
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'templates', 'constancias')
+
+TEMPLATES = {name: f'constancia-{name}.docx' for name in CONSTANCIAS}
+
+DOCUMENT_PART = 'word/document.xml'
+RELS_PART = 'word/_rels/document.xml.rels'
+CONTENT_TYPES_PART = '[Content_Types].xml'
+
+# Shared media part of the project logo and its relationship id
+LOGO_PART = 'word/media/logo.png'
+LOGO_REL_ID = 'rIdLogo'
+LOGO_RELATIONSHIP = (f'<Relationship Id="{LOGO_REL_ID}" '
+                     'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/image" '
+                     'Target="media/logo.png"/>')
+PNG_DEFAULT = '<Default Extension="png" ContentType="image/png"/>'
+
+# Internal command standing for the logo run; '#' cannot start a template field
+LOGO_COMMAND = '#logo'
+
+LOGO_DRAWING = (
+    '<w:r><w:drawing><wp:inline distT="0" distB="0" distL="0" distR="0">'
+    '<wp:extent cx="{cx}" cy="{cy}"/><wp:docPr id="1" name="Logo"/>'
+    '<a:graphic xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main">'
+    '<a:graphicData uri="http://schemas.openxmlformats.org/drawingml/2006/picture">'
+    '<pic:pic xmlns:pic="http://schemas.openxmlformats.org/drawingml/2006/picture">'
+    '<pic:nvPicPr><pic:cNvPr id="0" name="logo.png"/><pic:cNvPicPr/></pic:nvPicPr>'
+    '<pic:blipFill><a:blip r:embed="' + LOGO_REL_ID + '"/><a:stretch><a:fillRect/></a:stretch></pic:blipFill>'
+    '<pic:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>'
+    '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom></pic:spPr>'
+    '</pic:pic></a:graphicData></a:graphic></wp:inline></w:drawing></w:r>'
+)
+
+# Compression level for the rendered document part
+DEFLATE_LEVEL = 6
+ZIP64_LIMIT = 0xFFFFFFFF
+
+# A command, possibly split across runs by Word: '{', text and tags, '}'
+SPLIT_COMMAND_RE = re.compile(r'\{(?:[^{}<]|<[^>]*>)*?\}')
+COMMAND_RE = re.compile(r'\{([^{}<>]+)\}')
+TEXT_RE = re.compile(r'<w:t(?: [^>]*)?>([^<]*)</w:t>')
+FOR_RE = re.compile(r'FOR\s+(\w+)\s+IN\s+(\$?[\w.]+)$')
+END_FOR_RE = re.compile(r'END-FOR\s+(\w+)$')
+FIELD_RE = re.compile(r'\$?\w+(?:\.\w+)*$')
+
+# The three patterns of removeEmptyParagraphs() in lib/actions-constancias.ts, with
+# the tag name anchored so <w:pStyle/>, <w:pgSz/> or <w:pgMar/> are not taken as paragraphs
+EMPTY_PARAGRAPH_RES = [
+    re.compile(r'<w:p(?: [^>]*)?/>'),
+    re.compile(r'<w:p(?: [^>]*)?>(?:(?!<w:r[ >])[\s\S])*?</w:p>'),
+    re.compile(r'<w:p(?: [^>]*)?>(?:\s*<w:pPr>[\s\S]*?</w:pPr>)?\s*<w:r(?: [^>]*)?>\s*<w:t(?: [^>]*)?>\s*</w:t>\s*</w:r>\s*</w:p>'),
+]
+
+LINE_BREAK = '</w:t><w:br/><w:t xml:space="preserve">'
+
+
+class Field:
+    """A `{campo}` or `{$item.campo}` command"""
+    __slots__ = ('local', 'head', 'rest', 'source')
+
+    def __init__(self, expression):
+        self.source = expression
+        self.local = expression.startswith('$')
+        path = expression.lstrip('$').split('.')
+        self.head, self.rest = path[0], path[1:]
+
+    def value(self, data, scope):
+        try:
+            value = (scope if self.local else data)[self.head]
+            for key in self.rest:
+                value = value[key]
+        except (KeyError, TypeError):
+            raise KeyError(f'Missing value for {{{self.source}}}') from None
+        return value
+
+    def render(self, data, scope, out):
+        value = self.value(data, scope)
+        if value is None:
+            return
+        if value is True or value is False:
+            text = 'true' if value else 'false'
+        else:
+            text = escape(str(value))
+        if '\n' in text:
+            text = text.replace('\n', LINE_BREAK)
+        out.append(text)
+
+
+class Loop:
+    """A `{FOR item IN lista}` ... `{END-FOR item}` block"""
+    __slots__ = ('var', 'items', 'body')
+
+    def __init__(self, var, items):
+        self.var = var
+        self.items = Field(items)
+        self.body = []
+
+    def render(self, data, scope, out):
+        items = self.items.value(data, scope) or ()
+        inner = dict(scope)
+        for item in items:
+            inner[self.var] = item
+            _render_nodes(self.body, data, inner, out)
+
+
+class LogoSlot:
+    """The run of the LOGO command: the logo drawing if one is given, else the run without text"""
+    __slots__ = ('empty',)
+
+    def __init__(self, empty):
+        self.empty = empty
+
+    def render(self, data, scope, out):
+        out.append(scope.get(LOGO_COMMAND) or self.empty)
+
+
+def _render_nodes(nodes, data, scope, out):
+    for node in nodes:
+        if node.__class__ is str:
+            out.append(node)
+        else:
+            node.render(data, scope, out)
+
+
+def merge_split_commands(xml):
+    """Move the text of commands split across runs into their first run.
+
+    Word often splits `{cliente_nombre}` into several <w:r>; the tags found
+    inside the braces are kept, just moved after the rebuilt command, so the
+    XML stays well formed.
+    """
+    def merge(match):
+        chunk = match.group(0)
+        if '<' not in chunk:
+            return chunk
+        tags = re.findall(r'<[^>]*>', chunk)
+        return re.sub(r'<[^>]*>', '', chunk) + ''.join(tags)
+    return SPLIT_COMMAND_RE.sub(merge, xml)
+
+
+def remove_empty_paragraphs(xml):
+    for pattern in EMPTY_PARAGRAPH_RES:
+        xml = pattern.sub('', xml)
+    return xml
+
+
+def _enclosing(xml, start, end, tag):
+    """(start, end) of the innermost <tag> element around [start, end), or None"""
+    opening = max(xml.rfind(f'<{tag}>', 0, start), xml.rfind(f'<{tag} ', 0, start))
+    if opening < 0 or xml.find(f'</{tag}>', opening, start) >= 0:
+        return None
+    closing = xml.find(f'</{tag}>', end)
+    if closing < 0:
+        return None
+    return opening, closing + len(f'</{tag}>')
+
+
+def _block_span(xml, start, end, command):
+    """Span that a loop command occupies: its row or paragraph if it is alone in it"""
+    for tag in ('w:tr', 'w:p'):
+        span = _enclosing(xml, start, end, tag)
+        if span and ''.join(TEXT_RE.findall(xml[span[0]:span[1]])).strip() == command:
+            return span
+    return start, end
+
+
+class CompiledTemplate:
+    """word/document.xml compiled into literal segments, fields and loops"""
+
+    def __init__(self, xml, drop_empty_paragraphs=True):
+        xml = merge_split_commands(xml)
+        if drop_empty_paragraphs:
+            xml = remove_empty_paragraphs(xml)
+        # Substituted values may start or end with spaces
+        xml = xml.replace('<w:t>', '<w:t xml:space="preserve">')
+        self._logo_run = None
+        position = xml.find(f'>{escape(LOGO)}</w:t>')
+        span = _enclosing(xml, position, position, 'w:r') if position >= 0 else None
+        if span:
+            self._logo_run = xml[span[0]:span[1]].replace(f'>{escape(LOGO)}</w:t>', '></w:t>')
+            xml = f'{xml[:span[0]]}{{{LOGO_COMMAND}}}{xml[span[1]:]}'
+        self.has_logo = self._logo_run is not None
+        self.nodes = self._compile(xml)
+        self.fields = sorted({f.source for f in self._walk(self.nodes)})
+
+    def _compile(self, xml):
+        root = []
+        stack = [(None, root)]
+        position = 0
+        for match in COMMAND_RE.finditer(xml):
+            if match.start() < position:
+                continue  # inside a paragraph already taken by a loop command
+            command = match.group(1).strip()
+            for_match = FOR_RE.match(command)
+            end_match = END_FOR_RE.match(command)
+            if for_match or end_match:
+                start, end = _block_span(xml, match.start(), match.end(), match.group(0))
+            else:
+                start, end = match.span()
+            nodes = stack[-1][1]
+            if start > position:
+                nodes.append(xml[position:start])
+            position = end
+
+            if for_match:
+                loop = Loop(for_match.group(1), for_match.group(2))
+                nodes.append(loop)
+                stack.append((loop.var, loop.body))
+            elif end_match:
+                if stack[-1][0] != end_match.group(1):
+                    raise ValueError(f'Unexpected {{{command}}}')
+                stack.pop()
+            elif command == LOGO_COMMAND and self._logo_run is not None:
+                nodes.append(LogoSlot(self._logo_run))
+            elif FIELD_RE.match(command):
+                nodes.append(Field(command))
+            else:
+                raise ValueError(f'Unsupported command {{{command}}}')
+        if len(stack) > 1:
+            raise ValueError(f'Missing {{END-FOR {stack[-1][0]}}}')
+        root.append(xml[position:])
+        return root
+
+    def _walk(self, nodes):
+        for node in nodes:
+            if isinstance(node, Field):
+                yield node
+            elif isinstance(node, Loop):
+                yield from self._walk(node.body)
+
+    def render_xml(self, data, logo=None):
+        """Return the filled word/document.xml as UTF-8 bytes, with `logo` (a
+        constancias_logo.Logo) in place of the LOGO command if given"""
+        out = []
+        scope = {LOGO_COMMAND: logo_drawing(logo)} if logo is not None else {}
+        _render_nodes(self.nodes, data, scope, out)
+        return ''.join(out).encode('utf-8')
+
+
+def logo_drawing(logo):
+    """Inline picture run of the logo, sized to fit the header box"""
+    return LOGO_DRAWING.format(cx=logo.width_emu, cy=logo.height_emu)
+
+
+class CachedPart:
+    """A ZIP entry of the template kept as its already-compressed bytes"""
+    __slots__ = ('name', 'method', 'flags', 'dos_time', 'dos_date', 'crc', 'compressed_size',
+                 'size', 'external_attr', 'data')
+
+    def __init__(self, info, data, crc=None, size=None, flags=0):
+        self.name = info.filename.encode('utf-8')
+        self.method = zipfile.ZIP_DEFLATED if crc is not None else info.compress_type
+        self.flags = flags
+        self.dos_time, self.dos_date = _dos_datetime(info.date_time)
+        self.crc = info.CRC if crc is None else crc
+        self.compressed_size = len(data)
+        self.size = info.file_size if size is None else size
+        self.external_attr = info.external_attr
+        self.data = data
+
+    def local_header(self):
+        return struct.pack('<4s5H3L2H', b'PK\x03\x04', 20, self.flags, self.method, self.dos_time,
+                           self.dos_date, self.crc, self.compressed_size, self.size,
+                           len(self.name), 0) + self.name
+
+    def central_header(self, offset):
+        return struct.pack('<4s6H3L5H2L', b'PK\x01\x02', 20, 20, self.flags, self.method,
+                           self.dos_time, self.dos_date, self.crc, self.compressed_size, self.size,
+                           len(self.name), 0, 0, 0, 0, self.external_attr, offset) + self.name
+
+
+def _dos_datetime(date_time):
+    year, month, day, hour, minute, second = date_time
+    return (hour << 11) | (minute << 5) | (second // 2), ((year - 1980) << 9) | (month << 5) | day
+
+
+def _deflated_part(info, content):
+    """(part, record) of `content` deflated under the name and metadata of `info`"""
+    compressor = zlib.compressobj(DEFLATE_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS)
+    compressed = compressor.compress(content) + compressor.flush()
+    part = CachedPart(info, compressed, zlib.crc32(content), len(content))
+    return part, part.local_header() + compressed
+
+
+# ZIP records of the prepared logos by their sha256, shared by all templates
+_LOGO_RECORDS = {}
+
+
+def _logo_record(logo, date_time):
+    """(part, record) of word/media/logo.png, stored (PNG is already compressed), built once per logo"""
+    entry = _LOGO_RECORDS.get(logo.sha256)
+    if entry is None:
+        info = zipfile.ZipInfo(LOGO_PART, date_time=date_time)
+        info.external_attr = 0o644 << 16
+        info.CRC = zlib.crc32(logo.png)
+        info.file_size = len(logo.png)
+        part = CachedPart(info, logo.png)
+        entry = _LOGO_RECORDS[logo.sha256] = (part, part.local_header() + logo.png)
+    return entry
+
+
+def _read_raw(handle, info):
+    """Compressed bytes of an entry, read straight from its local record"""
+    handle.seek(info.header_offset)
+    header = handle.read(30)
+    if header[:4] != b'PK\x03\x04':
+        raise zipfile.BadZipFile(f'Bad local header for {info.filename}')
+    name_length, extra_length = struct.unpack('<2H', header[26:30])
+    handle.seek(name_length + extra_length, os.SEEK_CUR)
+    return handle.read(info.compress_size)
+
+
+class DocxTemplate:
+    """A .docx template: its compiled document part plus the other parts as raw ZIP records.
+
+    The unchanged parts (styles, settings, numbering, fonts, thumbnail...)
+    keep their compressed bytes and precomputed local headers; a render only
+    deflates the new word/document.xml and writes the central directory. The
+    relationships and content types that a logo needs are prepared once, on
+    the first render with a logo.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.parts = []
+        self._logo_parts = None
+        with open(path, 'rb') as handle, zipfile.ZipFile(handle) as zf:
+            self._logo_sources = {name: (zf.getinfo(name), zf.read(name).decode('utf-8'))
+                                  for name in (RELS_PART, CONTENT_TYPES_PART)}
+            for info in zf.infolist():
+                if info.file_size > ZIP64_LIMIT or info.compress_size > ZIP64_LIMIT:
+                    raise ValueError(f'{path}: {info.filename} needs zip64, not supported')
+                if info.filename == DOCUMENT_PART:
+                    self.document = CompiledTemplate(zf.read(info).decode('utf-8'))
+                    self.parts.append(None)
+                    self._document_info = info
+                    continue
+                # Bit 3 (data descriptor) is dropped: the local header carries the sizes
+                part = CachedPart(info, _read_raw(handle, info), flags=info.flag_bits & 0x800)
+                self.parts.append((part, part.local_header() + part.data))
+
+    def _parts_with_logo(self):
+        """The cached parts with the logo relationship and the PNG content type added"""
+        if self._logo_parts is None:
+            info, rels = self._logo_sources[RELS_PART]
+            replacements = {RELS_PART: _deflated_part(
+                info, rels.replace('</Relationships>', LOGO_RELATIONSHIP + '</Relationships>').encode('utf-8'))}
+            info, types = self._logo_sources[CONTENT_TYPES_PART]
+            if 'Extension="png"' not in types:
+                replacements[CONTENT_TYPES_PART] = _deflated_part(
+                    info, types.replace('<Default ', PNG_DEFAULT + '<Default ', 1).encode('utf-8'))
+            self._logo_parts = [replacements.get(entry[0].name.decode('utf-8'), entry) if entry else None
+                                for entry in self.parts]
+        return self._logo_parts
+
+    def _logo(self, data):
+        """Prepared logo of the payload's logo_url, or None"""
+        location = data.get('logo_url')
+        if not location or not self.document.has_logo:
+            return None
+        from constancias_logo import load_logo
+        return load_logo(location)
+
+    def render_chunks(self, data):
+        """The filled .docx as a list of byte chunks (cached records + new document part)"""
+        logo = self._logo(data)
+        parts = self.parts
+        if logo is not None:
+            parts = self._parts_with_logo() + [_logo_record(logo, self._document_info.date_time)]
+        chunks = []
+        central = []
+        offset = 0
+        for entry in parts:
+            part, record = entry or _deflated_part(self._document_info, self.document.render_xml(data, logo))
+            chunks.append(record)
+            central.append(part.central_header(offset))
+            offset += len(record)
+        directory = b''.join(central)
+        chunks.append(directory)
+        chunks.append(struct.pack('<4s4H2LH', b'PK\x05\x06', 0, 0, len(central), len(central),
+                                  len(directory), offset, 0))
+        return chunks
+
+    def render(self, data, output=None):
+        """Write the filled .docx to `output` (path or file object); return bytes if omitted"""
+        chunks = self.render_chunks(data)
+        if output is None:
+            return b''.join(chunks)
+        if isinstance(output, (str, os.PathLike)):
+            with open(output, 'wb') as f:
+                f.writelines(chunks)
+        else:
+            output.writelines(chunks)
+
+
+class TemplateCache:
+    """Compiled templates by path, loaded once and reloaded only when the file changes.
+
+    Each get() stats the file; if mtime or size moved, the file is hashed and
+    the template is recompiled only if its sha256 differs from the cached one.
+    """
+
+    def __init__(self):
+        self._entries = {}
+
+    def get(self, path):
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == key:
+            return entry[2]
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        if entry is not None and entry[1] == digest:
+            template = entry[2]
+        else:
+            template = DocxTemplate(path)
+        self._entries[path] = (key, digest, template)
+        return template
+
+    def invalidate(self, path=None):
+        if path is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(os.path.abspath(path), None)
+
+
+_CACHE = TemplateCache()
+
+
+def load_template(name):
+    """Compiled constancia template by name (separacion, abono, ...), cached per process"""
+    return _CACHE.get(os.path.join(TEMPLATES_DIR, TEMPLATES[name]))
+
+
+def sample_data(name, depositos=2):
+    """Example payload with the fields that lib/actions-constancias.ts sends"""
+    data = {
+        'razon_social': 'ECO PLAZA INMOBILIARIA S.A.C.',
+        'ruc': '20601234567',
+        'direccion_empresa': 'Av. Javier Prado Este 1234, San Isidro, Lima',
+        'cliente_nombre': 'MARIA ELENA GARCIA TORRES',
+        'cliente_dni': '07714994',
+        'tiene_conyuge': False,
+        'conyuge_nombre': '',
+        'conyuge_dni': '',
+        'local_codigo': 'A-101',
+        'local_rubro': 'Abarrotes',
+        'local_area': '12.50',
+        'local_nivel': '1',
+        'proyecto_nombre': 'Centro Comercial Eco Plaza',
+        'fecha_emision': '15 de enero de 2025',
+        'firma_nombre': 'JUAN PEREZ RAMIREZ',
+        'firma_cargo': 'Gerente General',
+    }
+    base = name.split('-')[0]
+    if base == 'separacion':
+        data.update({
+            'monto_usd': '1000.00', 'monto_usd_letras': 'MIL CON 00/100 DOLARES AMERICANOS',
+            'monto_pen': '3800.00', 'monto_pen_letras': 'TRES MIL OCHOCIENTOS CON 00/100 SOLES',
+            'tipo_cambio': '3.80', 'tipo_cambio_letras': 'TRES CON 80/100',
+            'plazo_dias': '5', 'fecha_vencimiento': '20 de enero de 2025',
+            'depositos': [{'fecha': '10 de enero de 2025', 'monto': '500.00',
+                           'monto_letras': 'QUINIENTOS CON 00/100 DOLARES AMERICANOS',
+                           'moneda': 'US$', 'numero_operacion': f'{1000 + i:08d}'}
+                          for i in range(depositos)],
+        })
+    elif base == 'abono':
+        data.update({
+            'monto_usd': '2500.00', 'monto_usd_letras': 'DOS MIL QUINIENTOS CON 00/100 DOLARES AMERICANOS',
+            'fecha_deposito': '12 de enero de 2025', 'numero_operacion': '00451287',
+        })
+    else:
+        data.update({
+            'monto_total_usd': '45000.00',
+            'monto_total_usd_letras': 'CUARENTA Y CINCO MIL CON 00/100 DOLARES AMERICANOS',
+            'depositos': [{'tipo': 'Separación' if i == 0 else f'Cuota {i}', 'fecha': '10 de enero de 2025',
+                           'monto': '1500.00', 'numero_operacion': f'{2000 + i:08d}'}
+                          for i in range(depositos)],
+        })
+    if 'depositos' in data:
+        data['total_depositos'] = f"{sum(float(d['monto']) for d in data['depositos']):.2f}"
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render constancias from the precompiled templates')
+    parser.add_argument('template', choices=sorted(TEMPLATES))
+    parser.add_argument('--data', help='JSON file with the template data (default: sample data)')
+    parser.add_argument('--output', help='Output .docx path')
+    parser.add_argument('--logo', help='Path or URL of the project logo (sets logo_url; requires Pillow)')
+    parser.add_argument('--bench', type=int, default=0, metavar='N',
+                        help='Render N documents in memory and report documents per second')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    template = load_template(args.template)
+    compile_ms = (time.perf_counter() - start) * 1000
+    if args.data:
+        with open(args.data, encoding='utf-8') as f:
+            data = json.load(f)
+    else:
+        data = sample_data(args.template)
+    if args.logo:
+        data['logo_url'] = args.logo
+
+    if args.output:
+        template.render(data, args.output)
+        print(f'Constancia generada: {args.output}')
+
+    if args.bench:
+        start = time.perf_counter()
+        for _ in range(args.bench):
+            template.document.render_xml(data)
+        xml_elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        size = 0
+        for _ in range(args.bench):
+            size = len(template.render(data))
+        elapsed = time.perf_counter() - start
+        print(f'Template: {args.template} (compilado en {compile_ms:.1f} ms, {len(template.document.fields)} campos)')
+        print(f'document.xml: {args.bench / xml_elapsed:,.0f} docs/s')
+        print(f'.docx completo: {args.bench / elapsed:,.0f} docs/s ({size:,} bytes por documento)')
+    elif not args.output:
+        sys.stdout.buffer.write(template.document.render_xml(data))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,15 @@
 #!/usr/bin/env node
 /**
  * Script para subir templates de constancias a Supabase Storage
- * Ejecutar: node scripts/upload-constancias-templates.js
+ * Ejecutar: node scripts/upload-constancias-templates.js [--force]
+ *
+ * Solo sube los templates cuyo sha256 (templates/constancias/manifest.json,
+ * generado por generate_constancias_templates.py) difiere del manifest.json
+ * que quedo en el bucket tras la ultima subida. --force sube todos.
  */
 
 const { createClient } = require('@supabase/supabase-js');
+const crypto = require('crypto');
 const fs = require('fs');
 const path = require('path');
 
@@ -38,6 +43,33 @@ const supabase = createClient(supabaseUrl, supabaseServiceKey);
 
 const BUCKET_NAME = 'constancias-templates';
 const TEMPLATES_DIR = path.join(__dirname, '..', 'templates', 'constancias');
+const MANIFEST_NAME = 'manifest.json';
+const FORCE = process.argv.includes('--force');
+
+function sha256(buffer) {
+  return crypto.createHash('sha256').update(buffer).digest('hex');
+}
+
+function readLocalManifest() {
+  const manifestPath = path.join(TEMPLATES_DIR, MANIFEST_NAME);
+  if (!fs.existsSync(manifestPath)) {
+    console.error(`Error: falta ${manifestPath}. Ejecuta python scripts/generate_constancias_templates.py`);
+    process.exit(1);
+  }
+  return JSON.parse(fs.readFileSync(manifestPath, 'utf8'));
+}
+
+async function readRemoteManifest() {
+  const { data, error } = await supabase.storage.from(BUCKET_NAME).download(MANIFEST_NAME);
+  if (error || !data) {
+    return {};
+  }
+  try {
+    return JSON.parse(await data.text());
+  } catch {
+    return {};
+  }
+}
 
 async function ensureBucketExists() {
   console.log(`\nVerificando bucket "${BUCKET_NAME}"...`);
@@ -70,16 +102,7 @@ async function ensureBucketExists() {
   return true;
 }
 
-async function uploadTemplate(fileName) {
-  const filePath = path.join(TEMPLATES_DIR, fileName);
-
-  if (!fs.existsSync(filePath)) {
-    console.error(`  ✗ Archivo no encontrado: ${filePath}`);
-    return false;
-  }
-
-  const fileBuffer = fs.readFileSync(filePath);
-
+async function uploadTemplate(fileName, fileBuffer) {
   console.log(`  Subiendo ${fileName}...`);
 
   const { error } = await supabase.storage
@@ -110,27 +133,64 @@ async function main() {
     process.exit(1);
   }
 
-  // Templates a subir
-  const templates = [
-    'constancia-separacion.docx',
-    'constancia-abono.docx',
-    'constancia-cancelacion.docx',
-  ];
+  // Templates a subir: los del manifest local cuyo hash no coincide con el del bucket
+  const localManifest = readLocalManifest();
+  const remoteManifest = FORCE ? {} : await readRemoteManifest();
+  const templates = Object.keys(localManifest);
 
   console.log('\nSubiendo templates...');
 
   let successCount = 0;
+  let skippedCount = 0;
+  let failed = false;
+  const uploadedManifest = { ...remoteManifest };
   for (const template of templates) {
-    const success = await uploadTemplate(template);
-    if (success) successCount++;
+    const filePath = path.join(TEMPLATES_DIR, template);
+    if (!fs.existsSync(filePath)) {
+      console.error(`  ✗ Archivo no encontrado: ${filePath}`);
+      failed = true;
+      continue;
+    }
+    const fileBuffer = fs.readFileSync(filePath);
+    const hash = sha256(fileBuffer);
+    if (hash !== localManifest[template].sha256) {
+      console.error(`  ✗ ${template} no coincide con manifest.json; vuelve a generar los templates`);
+      failed = true;
+      continue;
+    }
+    if (remoteManifest[template] && remoteManifest[template].sha256 === hash) {
+      console.log(`  = ${template} sin cambios`);
+      skippedCount++;
+      continue;
+    }
+    if (await uploadTemplate(template, fileBuffer)) {
+      successCount++;
+      uploadedManifest[template] = localManifest[template];
+    } else {
+      failed = true;
+    }
+  }
+
+  // El manifest del bucket refleja solo lo que realmente se subio
+  if (successCount > 0) {
+    const { error } = await supabase.storage
+      .from(BUCKET_NAME)
+      .upload(MANIFEST_NAME, JSON.stringify(uploadedManifest, null, 2), {
+        contentType: 'application/json',
+        upsert: true,
+      });
+    if (error) {
+      console.error(`  ✗ Error subiendo ${MANIFEST_NAME}:`, error.message);
+      failed = true;
+    }
   }
 
   console.log('\n' + '='.repeat(50));
-  console.log(`Resultado: ${successCount}/${templates.length} templates subidos`);
+  console.log(`Resultado: ${successCount} subidos, ${skippedCount} sin cambios, de ${templates.length} templates`);
   console.log('='.repeat(50));
 
-  if (successCount === templates.length) {
-    console.log('\n✓ Todos los templates subidos exitosamente!');
+  if (!failed) {
+    console.log('\n✓ Templates al dia en el bucket!');
     process.exit(0);
   } else {
     console.log('\n✗ Algunos templates fallaron. Revisa los errores arriba.');